@@ -0,0 +1,33 @@
+"""
+JSON encoding and decoding backed by orjson when it is installed.
+The backend is selected by the JSON_BACKEND setting and falls back to the standard library.
+"""
+import json
+from typing import Any, Callable, Optional
+
+from django.conf import settings
+
+try:
+    import orjson
+except ImportError:
+    # is_fast() guards every use of the module.
+    orjson = None  # type: ignore[assignment]
+
+
+def is_fast() -> bool:
+    return settings.JSON_BACKEND == "orjson" and orjson is not None
+
+
+def dumps(obj: Any, default: Optional[Callable[[Any], Any]] = None) -> bytes:
+    """Serialize to compact, non-ASCII-escaped UTF-8 JSON.
+    Datetimes are passed to `default` by both backends so that they are formatted the same way."""
+    if is_fast():
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        return orjson.dumps(obj, default=default, option=option)
+    return json.dumps(obj, default=default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def loads(data: bytes) -> Any:
+    if is_fast():
+        return orjson.loads(data)
+    return json.loads(data)
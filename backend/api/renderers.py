@@ -0,0 +1,18 @@
+from rest_framework import renderers
+
+from . import json_backend
+
+
+class JSONRenderer(renderers.JSONRenderer):
+    """Renders compact responses with the fast JSON backend.
+    Indented responses, e.g. the browsable API, keep the default renderer."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if indent is not None or not json_backend.is_fast():
+            return super().render(data, accepted_media_type, renderer_context)
+        ret = json_backend.dumps(data, default=self.encoder_class().default)
+        # Escape the separators that are valid in JSON but not in JavaScript, as the default renderer does.
+        return ret.replace("\u2028".encode(), b"\\u2028").replace("\u2029".encode(), b"\\u2029")
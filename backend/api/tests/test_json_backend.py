@@ -0,0 +1,54 @@
+import datetime
+import io
+import uuid
+
+from django.test import TestCase, override_settings
+from rest_framework import renderers
+from rest_framework.exceptions import ParseError
+
+from api import json_backend
+from api.parsers import JSONParser
+from api.renderers import JSONRenderer
+
+
+class TestJSONBackend(TestCase):
+    data = {"text": "日本語", "uuid": uuid.UUID(int=1), "labels": [1, 2.5, None, True]}
+
+    def test_orjson_and_stdlib_are_equivalent(self):
+        with override_settings(JSON_BACKEND="orjson"):
+            self.assertTrue(json_backend.is_fast())
+            fast = json_backend.dumps(self.data, default=str)
+        with override_settings(JSON_BACKEND="json"):
+            self.assertFalse(json_backend.is_fast())
+            slow = json_backend.dumps(self.data, default=str)
+        self.assertEqual(json_backend.loads(fast), json_backend.loads(slow))
+
+    def test_datetime_is_passed_to_default(self):
+        data = {"created_at": datetime.datetime(2022, 1, 1)}
+        self.assertEqual(json_backend.dumps(data, default=lambda obj: "date"), b'{"created_at":"date"}')
+
+
+class TestJSONRenderer(TestCase):
+    data = {
+        "text": "line\u2028separator",
+        "created_at": datetime.datetime(2022, 1, 1, 12, 30, 15, 123456, tzinfo=datetime.timezone.utc),
+        "uuid": uuid.UUID(int=1),
+    }
+
+    def test_render_same_as_default_renderer(self):
+        expected = renderers.JSONRenderer().render(self.data)
+        self.assertEqual(JSONRenderer().render(self.data), expected)
+
+    def test_render_indented(self):
+        rendered = JSONRenderer().render(self.data, "application/json; indent=4")
+        self.assertIn(b"\n    ", rendered)
+
+
+class TestJSONParser(TestCase):
+    def test_parse(self):
+        data = JSONParser().parse(io.BytesIO('{"text": "日本語"}'.encode("utf-8")))
+        self.assertEqual(data, {"text": "日本語"})
+
+    def test_parse_error(self):
+        with self.assertRaises(ParseError):
+            JSONParser().parse(io.BytesIO(b"{"))
@@ -0,0 +1,28 @@
+from celery.result import AsyncResult
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from users.tests.utils import make_user
+
+
+class TestTaskStatus(APITestCase):
+    def setUp(self):
+        self.user = make_user()
+        self.url = reverse(viewname="task_status", args=["task-id"])
+
+    def test_running_task_reports_progress(self):
+        AsyncResult("task-id").backend.store_result("task-id", {"records": 10}, "PROGRESS")
+        self.client.force_login(self.user)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(response.data["ready"])
+        self.assertEqual(response.data["progress"], {"records": 10})
+
+    def test_finished_task_has_no_progress(self):
+        AsyncResult("task-id").backend.store_result("task-id", {"error": []}, "SUCCESS")
+        self.client.force_login(self.user)
+        response = self.client.get(self.url)
+        self.assertTrue(response.data["ready"])
+        self.assertEqual(response.data["result"], {"error": []})
+        self.assertIsNone(response.data["progress"])
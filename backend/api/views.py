@@ -17,5 +17,7 @@ class TaskStatus(APIView):
                 "ready": ready,
                 "result": task.result if ready and not error else None,
                 "error": {"text": str(task.result)} if error else None,
+                # The counts reported by a running task, e.g. an import.
+                "progress": task.info if task.state == "PROGRESS" else None,
             }
         )
@@ -167,12 +167,20 @@ REST_FRAMEWORK = {
     "DEFAULT_FILTER_BACKENDS": ("django_filters.rest_framework.DjangoFilterBackend",),
     "SEARCH_PARAM": "q",
     "DEFAULT_RENDERER_CLASSES": (
-        "rest_framework.renderers.JSONRenderer",
+        "api.renderers.JSONRenderer",
         "rest_framework.renderers.BrowsableAPIRenderer",
         "rest_framework_xml.renderers.XMLRenderer",
     ),
+    "DEFAULT_PARSER_CLASSES": (
+        "api.parsers.JSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ),
 }
 
+# JSON library used by the API and the exports: "orjson" if it is installed, otherwise "json"
+JSON_BACKEND = env("JSON_BACKEND", "orjson")
+
 # Internationalization
 # https://docs.djangoproject.com/en/2.0/topics/i18n/
 LANGUAGE_CODE = "en-us"
@@ -236,8 +244,36 @@ if DEBUG:
     CSRF_TRUSTED_ORIGINS = ["http://127.0.0.1:3000", "http://0.0.0.0:3000", "http://localhost:3000"]
     CSRF_TRUSTED_ORIGINS += env.list("CSRF_TRUSTED_ORIGINS", [])
 
-# Batch size for importing data
+# Batch size for importing data. It's the size of the first batch, tuned within the bounds below while importing.
 IMPORT_BATCH_SIZE = env.int("IMPORT_BATCH_SIZE", 1000)
+IMPORT_BATCH_SIZE_MIN = env.int("IMPORT_BATCH_SIZE_MIN", 100)
+IMPORT_BATCH_SIZE_MAX = env.int("IMPORT_BATCH_SIZE_MAX", 10000)
+
+# Time in seconds an import batch should take to save, and the number of examples and labels it may insert at most
+IMPORT_BATCH_SECONDS = env.float("IMPORT_BATCH_SECONDS", 1.0)
+IMPORT_BATCH_MAX_ROWS = env.int("IMPORT_BATCH_MAX_ROWS", 100000)
+
+# Number of worker processes parsing the uploaded files of an import in parallel
+IMPORT_WORKERS = env.int("IMPORT_WORKERS", 1)
+
+# Size in bytes of the ranges a large line-based file is split into to be parsed by the workers. 0 disables it
+IMPORT_SPLIT_SIZE = env.int("IMPORT_SPLIT_SIZE", 32 * 1024 * 1024)
+
+# Whether to insert the imported examples and labels by COPY on PostgreSQL
+IMPORT_POSTGRES_COPY = env.bool("IMPORT_POSTGRES_COPY", False)
+
+# Number of examples formatted and written at once when exporting data
+EXPORT_CHUNK_SIZE = env.int("EXPORT_CHUNK_SIZE", 1000)
+
+# Number of worker processes exporting the members' files of a non-collaborative project
+EXPORT_WORKERS = env.int("EXPORT_WORKERS", 1)
+
+# zlib compression level (0-9) of the exported archive
+EXPORT_COMPRESSION_LEVEL = env.int("EXPORT_COMPRESSION_LEVEL", 6)
+
+# Seconds and total bytes of the exported archives kept for identical export requests (0 seconds disables the cache)
+EXPORT_CACHE_MAX_AGE = env.int("EXPORT_CACHE_MAX_AGE", 3600)
+EXPORT_CACHE_MAX_SIZE = env.int("EXPORT_CACHE_MAX_SIZE", 1024**3)
 
 # Necessary for email verification of new accounts
 EMAIL_USE_TLS = env.bool("EMAIL_USE_TLS", False)
@@ -1,11 +1,22 @@
+import io
 import os
-import shutil
+import tempfile
 import uuid
+import zipfile
+from contextlib import contextmanager
+from datetime import datetime
+from typing import IO, Iterator, List, Optional
 
+import django
+import pandas as pd
+from billiard.pool import Pool
 from celery import shared_task
 from celery.utils.log import get_task_logger
 from django.conf import settings
+from django.db import connections
+from django.db.models import QuerySet
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
 
 from .pipeline.dataset import Dataset
 from .pipeline.factories import (
@@ -15,57 +26,212 @@ from .pipeline.factories import (
     create_writer,
 )
 from .pipeline.services import ExportApplicationService
-from data_export.models import ExportedExample
+from data_export.models import (
+    DeletedExample,
+    ExportArtifact,
+    ExportCheckpoint,
+    ExportedExample,
+)
 from projects.models import Member, Project
 
 logger = get_task_logger(__name__)
 
 
-def create_collaborative_dataset(project: Project, dirpath: str, confirmed_only: bool, formatters, writer):
-    is_text_project = project.is_text_project
-    if confirmed_only:
-        examples = ExportedExample.objects.confirmed(project)
-    else:
+@contextmanager
+def open_entry(archive: zipfile.ZipFile, filename: str, binary=False) -> Iterator[IO]:
+    """Open a stream writing directly into a new entry of the archive."""
+    with archive.open(filename, mode="w", force_zip64=True) as entry:
+        if binary:
+            yield entry
+            return
+        with io.TextIOWrapper(entry, encoding="utf-8", newline="") as f:
+            yield f
+
+
+def move_into_archive(archive: zipfile.ZipFile, dirpath: str):
+    """Add the files in the directory to the archive, deleting each one as soon as it is stored."""
+    for filename in sorted(os.listdir(dirpath)):
+        filepath = os.path.join(dirpath, filename)
+        archive.write(filepath, arcname=filename)
+        os.remove(filepath)
+
+
+def select_examples(project: Project, confirmed_only: bool, since: Optional[datetime] = None) -> QuerySet:
+    """Select the examples to export. If `since` is given, only the ones changed after it."""
+    if since is None:
         examples = ExportedExample.objects.filter(project=project)
+    else:
+        examples = ExportedExample.objects.changed_since(project, since)
+    if confirmed_only:
+        examples = examples.exclude(states=None)
+    return examples
+
+
+def create_collaborative_dataset(
+    project: Project,
+    archive: zipfile.ZipFile,
+    confirmed_only: bool,
+    formatters,
+    writer,
+    since: Optional[datetime] = None,
+):
+    is_text_project = project.is_text_project
+    examples = select_examples(project, confirmed_only, since)
     labels = create_labels(project, examples)
     comments = create_comment(examples)
     dataset = Dataset(examples, labels, comments, is_text_project)
 
     service = ExportApplicationService(dataset, formatters, writer)
 
-    filepath = os.path.join(dirpath, f"all.{writer.extension}")
-    service.export(filepath)
+    with open_entry(archive, f"all.{writer.extension}", writer.binary) as f:
+        service.export(f)
 
 
-def create_individual_dataset(project: Project, dirpath: str, confirmed_only: bool, formatters, writer):
+def create_individual_dataset(
+    project: Project,
+    dirpath: str,
+    confirmed_only: bool,
+    formatters,
+    writer,
+    member_ids: Optional[List[int]] = None,
+    since: Optional[datetime] = None,
+):
     is_text_project = project.is_text_project
-    members = Member.objects.filter(project=project)
-    for member in members:
-        if confirmed_only:
-            examples = ExportedExample.objects.confirmed(project, user=member.user)
-        else:
-            examples = ExportedExample.objects.filter(project=project)
-        labels = create_labels(project, examples, member.user)
-        comments = create_comment(examples, member.user)
-        dataset = Dataset(examples, labels, comments, is_text_project)
+    members = Member.objects.filter(project=project).select_related("user")
+    users = None
+    if member_ids is not None:
+        members = members.filter(id__in=member_ids)
+        users = [member.user_id for member in members]
+    examples = select_examples(project, confirmed_only, since)
+    labels = create_labels(project, examples, users=users)
+    comments = create_comment(examples, users=users)
+    dataset = Dataset(examples, labels, comments, is_text_project)
+
+    service = ExportApplicationService(dataset, formatters, writer)
+
+    files = {member.user_id: os.path.join(dirpath, f"{member.username}.{writer.extension}") for member in members}
+    service.export_by_user(files, confirmed_only)
 
-        service = ExportApplicationService(dataset, formatters, writer)
 
-        filepath = os.path.join(dirpath, f"{member.username}.{writer.extension}")
-        service.export(filepath)
+def export_members(
+    project_id: int,
+    dirpath: str,
+    confirmed_only: bool,
+    file_format: str,
+    member_ids: List[int],
+    since: Optional[datetime] = None,
+):
+    project = Project.objects.get(pk=project_id)
+    formatters = create_formatter(project, file_format)
+    writer = create_writer(file_format, project)
+    create_individual_dataset(project, dirpath, confirmed_only, formatters, writer, member_ids, since)
+
+
+def create_individual_dataset_in_parallel(
+    project: Project,
+    dirpath: str,
+    confirmed_only: bool,
+    file_format: str,
+    workers: int,
+    since: Optional[datetime] = None,
+):
+    """Shard the members across a process pool. Each worker exports its own members in a single pass."""
+    member_ids = list(Member.objects.filter(project=project).order_by("id").values_list("id", flat=True))
+    shards = [shard for shard in (member_ids[i::workers] for i in range(workers)) if shard]
+    # The workers must open their own database connections instead of sharing the forked ones.
+    connections.close_all()
+    # The pool is billiard's, as a prefork Celery worker is a daemonic process,
+    # which the multiprocessing module doesn't allow to start children.
+    with Pool(processes=len(shards), initializer=django.setup) as pool:
+        results = [
+            pool.apply_async(export_members, (project.id, dirpath, confirmed_only, file_format, shard, since))
+            for shard in shards
+        ]
+        for result in results:
+            result.get()
+
+
+def create_tombstones(project: Project, archive: zipfile.ZipFile, writer, since: Optional[datetime] = None):
+    """Write the ids of the examples deleted after `since`."""
+    deleted = DeletedExample.objects.filter(project=project)
+    if since is not None:
+        deleted = deleted.filter(deleted_at__gt=since)
+    example_ids = list(deleted.order_by("example_id").values_list("example_id", flat=True).distinct())
+    with open_entry(archive, f"deleted.{writer.extension}", writer.binary) as f:
+        writer.write_chunks(f, [pd.DataFrame({"id": example_ids}, dtype="int64")])
 
 
 @shared_task(autoretry_for=(Exception,), retry_backoff=True, retry_jitter=True)
-def export_dataset(project_id, file_format: str, confirmed_only=False):
+def export_dataset(project_id, file_format: str, confirmed_only=False, incremental=False):
+    """Export the project into a zip file and return its path.
+
+    An incremental export contains only the examples changed since the previous incremental export
+    of the same format, along with the ids of the deleted examples in `deleted.<extension>`.
+    The first one exports every example.
+
+    A full export reuses the archive of an identical request made within `EXPORT_CACHE_MAX_AGE` seconds
+    if the content of the project has not changed since.
+    """
     project = get_object_or_404(Project, pk=project_id)
-    dirpath = os.path.join(settings.MEDIA_ROOT, str(uuid.uuid4()))
-    os.makedirs(dirpath, exist_ok=True)
+    use_cache = not incremental and settings.EXPORT_CACHE_MAX_AGE > 0
+    if use_cache:
+        # Computed before exporting, so that changes made meanwhile invalidate the new archive.
+        version = ExportArtifact.objects.content_version(project)
+        artifact = ExportArtifact.objects.find(
+            project, file_format, confirmed_only, version, max_age=settings.EXPORT_CACHE_MAX_AGE
+        )
+        if artifact is not None:
+            return artifact.path
+    since = None
+    if incremental:
+        checkpoint = (
+            ExportCheckpoint.objects.filter(project=project, file_format=file_format, confirmed_only=confirmed_only)
+            .order_by("-exported_at")
+            .first()
+        )
+        since = checkpoint.exported_at if checkpoint else None
+    # Anything changed while exporting is exported again next time rather than missed.
+    started_at = timezone.now()
+    os.makedirs(settings.MEDIA_ROOT, exist_ok=True)
+    zip_file = os.path.join(settings.MEDIA_ROOT, f"{uuid.uuid4()}.zip")
     formatters = create_formatter(project, file_format)
     writer = create_writer(file_format, project)
-    if project.collaborative_annotation:
-        create_collaborative_dataset(project, dirpath, confirmed_only, formatters, writer)
-    else:
-        create_individual_dataset(project, dirpath, confirmed_only, formatters, writer)
-    zip_file = shutil.make_archive(dirpath, "zip", dirpath)
-    shutil.rmtree(dirpath)
+    try:
+        with zipfile.ZipFile(
+            zip_file, mode="w", compression=zipfile.ZIP_DEFLATED, compresslevel=settings.EXPORT_COMPRESSION_LEVEL
+        ) as archive:
+            if project.collaborative_annotation:
+                create_collaborative_dataset(project, archive, confirmed_only, formatters, writer, since)
+            else:
+                # The members' files are written at the same time, in a single pass over the examples,
+                # but an archive accepts one entry at a time, so they are written to a temporary directory first.
+                with tempfile.TemporaryDirectory(dir=settings.MEDIA_ROOT) as dirpath:
+                    if settings.EXPORT_WORKERS > 1:
+                        create_individual_dataset_in_parallel(
+                            project, dirpath, confirmed_only, file_format, settings.EXPORT_WORKERS, since
+                        )
+                    else:
+                        create_individual_dataset(project, dirpath, confirmed_only, formatters, writer, since=since)
+                    move_into_archive(archive, dirpath)
+            if incremental:
+                create_tombstones(project, archive, writer, since)
+    except Exception:
+        if os.path.exists(zip_file):
+            os.remove(zip_file)
+        raise
+    if incremental:
+        ExportCheckpoint.objects.create(
+            project=project, file_format=file_format, confirmed_only=confirmed_only, exported_at=started_at
+        )
+        DeletedExample.objects.prune(project)
+    if use_cache:
+        ExportArtifact.objects.create(
+            project=project,
+            file_format=file_format,
+            confirmed_only=confirmed_only,
+            version=version,
+            path=zip_file,
+            size=os.path.getsize(zip_file),
+        )
+        ExportArtifact.objects.evict(settings.EXPORT_CACHE_MAX_AGE, settings.EXPORT_CACHE_MAX_SIZE)
     return zip_file
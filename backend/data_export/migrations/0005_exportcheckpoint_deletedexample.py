@@ -0,0 +1,52 @@
+# Generated by Django 4.2.30 on 2026-10-17 07:25
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("projects", "0009_aspectbasedsentimentanalysisproject_and_more"),
+        ("data_export", "0004_exportedcomment"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ExportCheckpoint",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("file_format", models.CharField(max_length=64)),
+                ("confirmed_only", models.BooleanField(default=False)),
+                ("exported_at", models.DateTimeField()),
+                (
+                    "project",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="export_checkpoints",
+                        to="projects.project",
+                    ),
+                ),
+            ],
+            options={
+                "get_latest_by": "exported_at",
+            },
+        ),
+        migrations.CreateModel(
+            name="DeletedExample",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("example_id", models.BigIntegerField()),
+                ("uuid", models.UUIDField()),
+                ("deleted_at", models.DateTimeField(auto_now_add=True, db_index=True)),
+                (
+                    "project",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="deleted_examples",
+                        to="projects.project",
+                    ),
+                ),
+            ],
+        ),
+    ]
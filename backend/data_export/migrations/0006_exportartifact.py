@@ -0,0 +1,34 @@
+# Generated by Django 4.2.30 on 2026-10-17 07:31
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("data_export", "0005_exportcheckpoint_deletedexample"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ExportArtifact",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("file_format", models.CharField(max_length=64)),
+                ("confirmed_only", models.BooleanField(default=False)),
+                ("version", models.CharField(max_length=64)),
+                ("path", models.CharField(max_length=1024)),
+                ("size", models.BigIntegerField()),
+                ("created_at", models.DateTimeField(auto_now_add=True, db_index=True)),
+                (
+                    "project",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="export_artifacts",
+                        to="projects.project",
+                    ),
+                ),
+            ],
+        ),
+    ]
@@ -1,15 +1,22 @@
-from typing import Any, Dict, Protocol, Tuple
+import hashlib
+import os
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional, Protocol, Tuple, Type
 
 from django.db import models
+from django.db.models import Count, Max, Q
+from django.utils import timezone
 
-from examples.models import Comment, Example
+from examples.managers import ExampleManager
+from examples.models import Comment, Example, ExampleState
+from label_types.models import CategoryType, RelationType, SpanType
 from labels.models import BoundingBox, Category, Relation, Segmentation, Span, TextLabel
-from projects.models import Project
+from projects.models import Member, Project
 
 DATA = "data"
 
 
-class ExportedExampleManager(models.Manager):
+class ExportedExampleManager(ExampleManager):
     def confirmed(self, project: Project, user=None):
         if project.collaborative_annotation:
             return self.filter(project=project).exclude(states=None)
@@ -17,6 +24,25 @@ class ExportedExampleManager(models.Manager):
             assert user is not None
             return self.filter(project=project, states__confirmed_by=user)
 
+    def changed_since(self, project: Project, since: datetime):
+        """Return the examples whose data, labels, comments or states changed after `since`."""
+        changed = Q(updated_at__gt=since)
+        label_models: Tuple[Type[models.Model], ...] = (
+            Category,
+            Span,
+            Relation,
+            TextLabel,
+            BoundingBox,
+            Segmentation,
+            Comment,
+        )
+        for model in label_models:
+            updated = model.objects.filter(example__project=project, updated_at__gt=since)
+            changed |= Q(pk__in=updated.values("example_id"))
+        confirmed = ExampleState.objects.filter(example__project=project, confirmed_at__gt=since)
+        changed |= Q(pk__in=confirmed.values("example_id"))
+        return self.filter(project=project).filter(changed)
+
 
 class ExportedExample(Example):
     objects = ExportedExampleManager()
@@ -116,3 +142,114 @@ class ExportedSegmentation(Segmentation):
 
     class Meta:
         proxy = True
+
+
+class ExportCheckpoint(models.Model):
+    """The point in time up to which an incremental export has exported a project."""
+
+    project = models.ForeignKey(to=Project, on_delete=models.CASCADE, related_name="export_checkpoints")
+    file_format = models.CharField(max_length=64)
+    confirmed_only = models.BooleanField(default=False)
+    exported_at = models.DateTimeField()
+
+    class Meta:
+        get_latest_by = "exported_at"
+
+
+class DeletedExampleManager(models.Manager):
+    def prune(self, project: Project):
+        """Delete the tombstones that the latest incremental export of every format has already reported."""
+        latest = (
+            ExportCheckpoint.objects.filter(project=project)
+            .values("file_format", "confirmed_only")
+            .annotate(last=Max("exported_at"))
+            .values_list("last", flat=True)
+        )
+        oldest = min(latest, default=None)
+        if oldest is not None:
+            self.filter(project=project, deleted_at__lte=oldest).delete()
+
+
+class DeletedExample(models.Model):
+    """A tombstone recording that an example was deleted from its project."""
+
+    objects = DeletedExampleManager()
+
+    project = models.ForeignKey(to=Project, on_delete=models.CASCADE, related_name="deleted_examples")
+    example_id = models.BigIntegerField()
+    uuid = models.UUIDField()
+    deleted_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+
+class ExportArtifactManager(models.Manager):
+    # The models whose rows end up in an export: (model, lookup of the project, timestamp updated on change).
+    content_models: Tuple[Tuple[Type[models.Model], str, str], ...] = (
+        (Example, "project", "updated_at"),
+        (Category, "example__project", "updated_at"),
+        (Span, "example__project", "updated_at"),
+        (Relation, "example__project", "updated_at"),
+        (TextLabel, "example__project", "updated_at"),
+        (BoundingBox, "example__project", "updated_at"),
+        (Segmentation, "example__project", "updated_at"),
+        (Comment, "example__project", "updated_at"),
+        (ExampleState, "example__project", "confirmed_at"),
+        (CategoryType, "project", "updated_at"),
+        (SpanType, "project", "updated_at"),
+        (RelationType, "project", "updated_at"),
+        (Member, "project", "updated_at"),
+    )
+
+    def content_version(self, project: Project) -> str:
+        """Fingerprint the content of the project from the row count and the latest timestamp of each model.
+
+        Any addition, update or deletion changes one of them, so an unchanged version means an unchanged export.
+        """
+        digest = hashlib.sha256(f"{project.pk}:{project.updated_at.isoformat()}".encode())
+        for model, lookup, timestamp in self.content_models:
+            stats = model.objects.filter(**{lookup: project}).aggregate(count=Count("pk"), last=Max(timestamp))
+            digest.update(f";{model.__name__}:{stats['count']}:{stats['last']}".encode())
+        return digest.hexdigest()
+
+    def find(
+        self, project: Project, file_format: str, confirmed_only: bool, version: str, max_age: int
+    ) -> Optional["ExportArtifact"]:
+        artifacts = self.filter(
+            project=project,
+            file_format=file_format,
+            confirmed_only=confirmed_only,
+            version=version,
+            created_at__gte=timezone.now() - timedelta(seconds=max_age),
+        )
+        for artifact in artifacts.order_by("-created_at"):
+            if os.path.exists(artifact.path):
+                return artifact
+        return None
+
+    def evict(self, max_age: int, max_size: int):
+        """Delete the artifacts older than `max_age` seconds, then the oldest ones beyond `max_size` bytes in total.
+
+        The newest artifact is always kept.
+        """
+        self.filter(created_at__lt=timezone.now() - timedelta(seconds=max_age)).delete()
+        total_size = 0
+        evicted = []
+        for i, (pk, size) in enumerate(self.order_by("-created_at").values_list("pk", "size")):
+            total_size += size
+            if i > 0 and total_size > max_size:
+                evicted.append(pk)
+        if evicted:
+            self.filter(pk__in=evicted).delete()
+
+
+class ExportArtifact(models.Model):
+    """An exported zip file, reused while the content of the project stays the same."""
+
+    objects = ExportArtifactManager()
+
+    project = models.ForeignKey(to=Project, on_delete=models.CASCADE, related_name="export_artifacts")
+    file_format = models.CharField(max_length=64)
+    confirmed_only = models.BooleanField(default=False)
+    version = models.CharField(max_length=64)
+    path = models.CharField(max_length=1024)
+    size = models.BigIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
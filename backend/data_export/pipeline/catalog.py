@@ -1,3 +1,4 @@
+import importlib.util
 from collections import defaultdict
 from pathlib import Path
 from typing import Dict, List, Type
@@ -33,6 +34,14 @@ class JSONL(Format):
     name = "JSONL"
 
 
+class Parquet(Format):
+    name = "Parquet"
+
+
+class Arrow(Format):
+    name = "Arrow"
+
+
 class Options:
     options: Dict[str, List] = defaultdict(list)
 
@@ -103,4 +112,12 @@ Options.register(ProjectType.DOCUMENT_SENTIMENT_ANALYSIS, JSON, DOCUMENT_SENTIME
 
 # Aspect Based Sentiment Analysis
 ASPECT_BASED_SENTIMENT_ANALYSIS_DIR = EXAMPLE_DIR / "aspect_based_sentiment_analysis"
-Options.register(ProjectType.ASPECT_BASED_SENTIMENT_ANALYSIS, JSONL, ASPECT_BASED_SENTIMENT_ANALYSIS_DIR / "example.jsonl", True)
\ No newline at end of file
+Options.register(ProjectType.ASPECT_BASED_SENTIMENT_ANALYSIS, JSONL, ASPECT_BASED_SENTIMENT_ANALYSIS_DIR / "example.jsonl", True)
+
+# Columnar formats, available if pyarrow is installed. They hold the same records as JSONL.
+if importlib.util.find_spec("pyarrow") is not None:
+    for options in Options.options.values():
+        for file_format, example, use_relation in list(options):
+            if file_format is JSONL:
+                options.append((Parquet, example, use_relation))
+                options.append((Arrow, example, use_relation))
@@ -1,24 +1,44 @@
 import abc
 from collections import defaultdict
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Sequence, Tuple
 
 from django.db.models import QuerySet
 
+from .records import CommentRecord
 from data_export.models import ExportedComment, ExportedExample
 
 
 class Comments(abc.ABC):
     comment_class = ExportedComment
+    record_class = CommentRecord
     column = "Comments"
-    fields: Tuple[str, ...] = ("example", "user")  # To boost performance
+    fields: Tuple[str, ...] = ("id", "text")  # Fetched with `values_list` to boost performance
 
-    def __init__(self, examples: QuerySet[ExportedExample], user=None):
-        self.comment_groups = defaultdict(list)
-        comments = self.comment_class.objects.filter(example__in=examples)
-        if user:
-            comments = comments.filter(user=user)
-        for comment in comments.select_related(*self.fields):
-            self.comment_groups[comment.example.id].append(comment)
+    def __init__(self, examples: QuerySet[ExportedExample], user=None, users: Optional[Sequence[int]] = None):
+        self.examples = examples
+        self.user = user
+        self.users = users
+        self.comment_groups: Dict[int, List[CommentRecord]] = {}
+        self.user_comment_groups: Dict[Tuple[int, int], List[CommentRecord]] = {}
 
-    def find_by(self, example_id: int) -> Dict[str, List[ExportedComment]]:
-        return {self.column: self.comment_groups[example_id]}
+    def load(self, example_ids: Sequence[int]):
+        """Fetch the comments of the given examples, replacing the previously loaded ones.
+        The comments are grouped both by example and by (user, example)."""
+        self.comment_groups = {example_id: [] for example_id in example_ids}
+        self.user_comment_groups = defaultdict(list)
+        comments = self.comment_class.objects.filter(example_id__in=example_ids)
+        if self.user:
+            comments = comments.filter(user=self.user)
+        if self.users is not None:
+            comments = comments.filter(user_id__in=self.users)
+        for example_id, user_id, *values in comments.values_list("example_id", "user_id", *self.fields):
+            record = self.record_class(*values)
+            self.comment_groups[example_id].append(record)
+            self.user_comment_groups[user_id, example_id].append(record)
+
+    def find_by(self, example_id: int, user_id: Optional[int] = None) -> Dict[str, List[CommentRecord]]:
+        if example_id not in self.comment_groups:
+            self.load([example_id])
+        if user_id is None:
+            return {self.column: self.comment_groups[example_id]}
+        return {self.column: self.user_comment_groups.get((user_id, example_id), [])}
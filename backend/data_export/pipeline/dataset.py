@@ -1,11 +1,14 @@
-from typing import Any, Dict, Iterator, List
+from collections import defaultdict
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Set
 
 import pandas as pd
+from django.conf import settings
 from django.db.models.query import QuerySet
 
 from .comments import Comments
 from .labels import Labels
 from data_export.models import ExportedExample
+from examples.models import ExampleState
 
 
 class Dataset:
@@ -18,13 +21,75 @@ class Dataset:
         self.comments = comments
 
     def __iter__(self) -> Iterator[Dict[str, Any]]:
-        for example in self.examples:
-            data = example.to_dict(self.is_text_project)
+        for rows in self.iter_rows():
+            yield from rows
+
+    def iter_examples(self, chunk_size: int) -> Iterator[List[ExportedExample]]:
+        """Walk the examples in primary-key order, `chunk_size` at a time.
+
+        Keyset pagination keeps each query cheap regardless of how deep into the project it is.
+        """
+        examples = self.examples.order_by("pk")
+        last_pk = None
+        while True:
+            page = examples if last_pk is None else examples.filter(pk__gt=last_pk)
+            chunk = list(page[:chunk_size])
+            if not chunk:
+                break
+            yield chunk
+            last_pk = chunk[-1].pk
+
+    def iter_loaded_examples(self, chunk_size: Optional[int] = None) -> Iterator[List[ExportedExample]]:
+        """Merge each chunk of examples with only the labels and comments belonging to it."""
+        for examples in self.iter_examples(chunk_size or settings.EXPORT_CHUNK_SIZE):
+            example_ids = [example.id for example in examples]
             for labels in self.labels:
-                data.update(**labels.find_by(example.id))
+                labels.load(example_ids)
             for comment in self.comments:
-                data.update(**comment.find_by(example.id))
-            yield data
+                comment.load(example_ids)
+            yield examples
+
+    def to_row(self, example: ExportedExample, user_id: Optional[int] = None) -> Dict[str, Any]:
+        data = example.to_dict(self.is_text_project)
+        for labels in self.labels:
+            data.update(**labels.find_by(example.id, user_id))
+        for comment in self.comments:
+            data.update(**comment.find_by(example.id, user_id))
+        return data
+
+    def iter_rows(self, chunk_size: Optional[int] = None) -> Iterator[List[Dict[str, Any]]]:
+        for examples in self.iter_loaded_examples(chunk_size):
+            yield [self.to_row(example) for example in examples]
 
     def to_dataframe(self) -> pd.DataFrame:
         return pd.DataFrame(self)
+
+    def chunks(self, chunk_size: int) -> Iterator[pd.DataFrame]:
+        """Yield the dataset as dataframes of at most `chunk_size` rows."""
+        for rows in self.iter_rows(chunk_size):
+            yield pd.DataFrame(rows)
+
+    def chunks_by_user(
+        self, user_ids: Sequence[int], chunk_size: int, confirmed_only=False
+    ) -> Iterator[Dict[int, pd.DataFrame]]:
+        """Split every chunk into one dataframe per user in a single pass over the examples.
+
+        Each user's dataframe holds only that user's labels and comments. If `confirmed_only` is set,
+        it also holds only the examples confirmed by that user. Users without any row in a chunk are omitted.
+        """
+        for examples in self.iter_loaded_examples(chunk_size):
+            confirmed_by: Dict[int, Set[int]] = defaultdict(set)
+            if confirmed_only:
+                states = ExampleState.objects.filter(example__in=examples).values_list("example_id", "confirmed_by_id")
+                for example_id, user_id in states:
+                    confirmed_by[example_id].add(user_id)
+            datasets = {}
+            for user_id in user_ids:
+                rows = [
+                    self.to_row(example, user_id)
+                    for example in examples
+                    if not confirmed_only or user_id in confirmed_by[example.id]
+                ]
+                if rows:
+                    datasets[user_id] = pd.DataFrame(rows)
+            yield datasets
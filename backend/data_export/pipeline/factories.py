@@ -1,9 +1,9 @@
-from typing import Dict, List, Type
+from typing import Dict, List, Optional, Sequence, Type
 
 from django.db.models import QuerySet
 
 from . import writers
-from .catalog import CSV, JSON, JSONL, FastText
+from .catalog import CSV, JSON, JSONL, Arrow, FastText, Parquet
 from .comments import Comments
 from .formatters import (
     DictFormatter,
@@ -25,6 +25,8 @@ def create_writer(file_format: str, project: str = None) -> writers.Writer:
         JSON.name: writers.JsonWriter(),
         JSONL.name: writers.JsonlWriter(),
         FastText.name: writers.FastTextWriter(),
+        Parquet.name: writers.ParquetWriter(),
+        Arrow.name: writers.ArrowWriter(),
     }
     if file_format not in mapping:
         ValueError(f"Invalid format: {file_format}")
@@ -173,7 +175,15 @@ def create_formatter(project: Project, file_format: str) -> List[Formatter]:
             ]
         },
     }
-    
+
+    if file_format in [Parquet.name, Arrow.name]:
+        # The columnar formats hold the JSONL records, but spans are stored as structs
+        # because a tuple mixing offsets and a label has no columnar type.
+        formatters = mapping[project.project_type][JSONL.name]
+        return [
+            DictFormatter(formatter.target_column) if isinstance(formatter, TupledSpanFormatter) else formatter
+            for formatter in formatters
+        ]
     return mapping[project.project_type][file_format]
 
 
@@ -196,11 +206,15 @@ def select_label_collection(project: Project) -> List[Type[Labels]]:
     return mapping[project.project_type]
 
 
-def create_labels(project: Project, examples: QuerySet[ExportedExample], user=None) -> List[Labels]:
+def create_labels(
+    project: Project, examples: QuerySet[ExportedExample], user=None, users: Optional[Sequence[int]] = None
+) -> List[Labels]:
     label_collections = select_label_collection(project)
-    labels = [label_collection(examples=examples, user=user) for label_collection in label_collections]
+    labels = [label_collection(examples=examples, user=user, users=users) for label_collection in label_collections]
     return labels
 
 
-def create_comment(examples: QuerySet[ExportedExample], user=None) -> List[Comments]:
-    return [Comments(examples=examples, user=user)]
+def create_comment(
+    examples: QuerySet[ExportedExample], user=None, users: Optional[Sequence[int]] = None
+) -> List[Comments]:
+    return [Comments(examples=examples, user=user, users=users)]
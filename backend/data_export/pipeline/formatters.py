@@ -2,12 +2,47 @@
 Convert a dataset to the specified format.
 """
 import abc
+from operator import methodcaller
+from typing import Any, Callable, Dict, List, Optional
 
 import pandas as pd
 
+from .records import DICT_CONVERTERS, STRING_GETTERS, TUPLE_CONVERTERS
 from data_export.models import DATA
 
 
+def find_label_class(column: List[List[Any]]) -> Optional[type]:
+    """Return the class of the labels in the column, or None if there are none."""
+    return next((type(labels[0]) for labels in column if len(labels) > 0), None)
+
+
+def find_converter(column: List[List[Any]], method: str, getters: Dict[type, Callable]) -> Callable:
+    """Resolve once per column the function that converts a label.
+
+    Records are converted by position with C-level getters.
+    Any other label falls back to calling its `method`.
+    """
+    label_class = find_label_class(column)
+    if label_class is None or label_class not in getters:
+        return methodcaller(method)
+    return getters[label_class]
+
+
+def find_list_converter(
+    column: List[List[Any]], method: str, converters: Dict[type, Callable[[List[Any]], List[Any]]]
+) -> Callable[[List[Any]], List[Any]]:
+    """Resolve once per column the function that converts the labels of an example.
+
+    Records are converted by a comprehension unpacking their fields, without a Python call per label.
+    Any other label falls back to calling its `method`.
+    """
+    label_class = find_label_class(column)
+    if label_class is not None and label_class in converters:
+        return converters[label_class]
+    convert = methodcaller(method)
+    return lambda labels: list(map(convert, labels))
+
+
 class Formatter(abc.ABC):
     def __init__(self, target_column: str = "labels", **kwargs):
         self.target_column = target_column
@@ -26,18 +61,18 @@ class Formatter(abc.ABC):
 class JoinedCategoryFormatter(Formatter):
     def apply(self, dataset: pd.DataFrame) -> pd.DataFrame:
         """Format the label column to `LabelA#LabelB` format."""
-        dataset[self.target_column] = dataset[self.target_column].apply(
-            lambda labels: "#".join(sorted(label.to_string() for label in labels))
-        )
+        column = dataset[self.target_column].tolist()
+        to_string = find_converter(column, "to_string", STRING_GETTERS)
+        dataset[self.target_column] = ["#".join(sorted(map(to_string, labels))) for labels in column]
         return dataset
 
 
 class ListedCategoryFormatter(Formatter):
     def apply(self, dataset: pd.DataFrame) -> pd.DataFrame:
         """Format the label column to `['LabelA', 'LabelB']` format."""
-        dataset[self.target_column] = dataset[self.target_column].apply(
-            lambda labels: sorted([label.to_string() for label in labels])
-        )
+        column = dataset[self.target_column].tolist()
+        to_string = find_converter(column, "to_string", STRING_GETTERS)
+        dataset[self.target_column] = [sorted(map(to_string, labels)) for labels in column]
         return dataset
 
 
@@ -47,13 +82,17 @@ class FastTextCategoryFormatter(Formatter):
         Also, drop the columns except for `data` and `self.target_column`.
         """
         dataset = dataset[[DATA, self.target_column, "Comments"]]
-        dataset[self.target_column] = dataset[self.target_column].apply(
-            lambda labels: " ".join(sorted(f"__label__{label.to_string()}" for label in labels))
-        )
+        column = dataset[self.target_column].tolist()
+        to_string = find_converter(column, "to_string", STRING_GETTERS)
+        dataset[self.target_column] = [
+            " ".join(sorted(f"__label__{text}" for text in map(to_string, labels))) for labels in column
+        ]
         dataset[self.target_column] = dataset[self.target_column].fillna("")
-        dataset["Comments"] = dataset["Comments"].apply(
-            lambda comments: " ".join(f"__comment__{comment.to_string()}" for comment in comments)
-        )
+        comments = dataset["Comments"].tolist()
+        to_string = find_converter(comments, "to_string", STRING_GETTERS)
+        dataset["Comments"] = [
+            " ".join(f"__comment__{text}" for text in map(to_string, comment_list)) for comment_list in comments
+        ]
         dataset = dataset[self.target_column] + " " + dataset[DATA] + " " + dataset["Comments"]
         return dataset
 
@@ -61,18 +100,21 @@ class FastTextCategoryFormatter(Formatter):
 class TupledSpanFormatter(Formatter):
     def apply(self, dataset: pd.DataFrame) -> pd.DataFrame:
         """Format the span column to `(start_offset, end_offset, label)` format"""
-        dataset[self.target_column] = dataset[self.target_column].apply(
-            lambda spans: sorted(span.to_tuple() for span in spans)
-        )
+        column = dataset[self.target_column].tolist()
+        to_tuples = find_list_converter(column, "to_tuple", TUPLE_CONVERTERS)
+        spans = list(map(to_tuples, column))
+        for tuples in spans:
+            tuples.sort()
+        dataset[self.target_column] = spans
         return dataset
 
 
 class DictFormatter(Formatter):
     def apply(self, dataset: pd.DataFrame) -> pd.DataFrame:
         """Format the column to `{key: value}` format"""
-        dataset[self.target_column] = dataset[self.target_column].apply(
-            lambda labels: [label.to_dict() for label in labels]
-        )
+        column = dataset[self.target_column].tolist()
+        to_dicts = find_list_converter(column, "to_dict", DICT_CONVERTERS)
+        dataset[self.target_column] = list(map(to_dicts, column))
         return dataset
 
 
@@ -3,10 +3,18 @@ Represents label collection.
 """
 import abc
 from collections import defaultdict
-from typing import Dict, List, Tuple
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Type
 
 from django.db.models import QuerySet
 
+from .records import (
+    BoundingBoxRecord,
+    CategoryRecord,
+    RelationRecord,
+    SegmentationRecord,
+    SpanRecord,
+    TextRecord,
+)
 from data_export.models import (
     ExportedBoundingBox,
     ExportedCategory,
@@ -21,52 +29,77 @@ from data_export.models import (
 
 class Labels(abc.ABC):
     label_class = ExportedLabel
+    record_class: Type[Tuple]
     column = "labels"
-    fields: Tuple[str, ...] = ("example", "label")  # To boost performance
-
-    def __init__(self, examples: QuerySet[ExportedExample], user=None):
-        self.label_groups = defaultdict(list)
-        labels = self.label_class.objects.filter(example__in=examples)
-        if user:
-            labels = labels.filter(user=user)
-        for label in labels.select_related(*self.fields):
-            self.label_groups[label.example.id].append(label)
-
-    def find_by(self, example_id: int) -> Dict[str, List[ExportedLabel]]:
-        return {self.column: self.label_groups[example_id]}
+    fields: Tuple[str, ...] = ("id", "label__text")  # Fetched with `values_list` to boost performance
+
+    def __init__(self, examples: QuerySet[ExportedExample], user=None, users: Optional[Sequence[int]] = None):
+        self.examples = examples
+        self.user = user
+        self.users = users
+        self.label_groups: Dict[int, List[Any]] = {}
+        self.user_label_groups: Dict[Tuple[int, int], List[Any]] = {}
+
+    def load(self, example_ids: Sequence[int]):
+        """Fetch the labels of the given examples, replacing the previously loaded ones.
+        The labels are grouped both by example and by (user, example)."""
+        self.label_groups = {example_id: [] for example_id in example_ids}
+        self.user_label_groups = defaultdict(list)
+        labels = self.label_class.objects.filter(example_id__in=example_ids)
+        if self.user:
+            labels = labels.filter(user=self.user)
+        if self.users is not None:
+            labels = labels.filter(user_id__in=self.users)
+        for example_id, user_id, *values in labels.order_by("id").values_list("example_id", "user_id", *self.fields):
+            record = self.record_class(*values)
+            self.label_groups[example_id].append(record)
+            self.user_label_groups[user_id, example_id].append(record)
+
+    def find_by(self, example_id: int, user_id: Optional[int] = None) -> Dict[str, List[Any]]:
+        if example_id not in self.label_groups:
+            self.load([example_id])
+        if user_id is None:
+            return {self.column: self.label_groups[example_id]}
+        return {self.column: self.user_label_groups.get((user_id, example_id), [])}
 
 
 class Categories(Labels):
     label_class = ExportedCategory
+    record_class = CategoryRecord
     column = "categories"
-    fields = ("example", "label")
+    fields = ("id", "label__text")
 
 
 class Spans(Labels):
     label_class = ExportedSpan
+    record_class = SpanRecord
     column = "entities"
-    fields = ("example", "label")
+    fields = ("id", "label__text", "start_offset", "end_offset")
 
 
 class Relations(Labels):
     label_class = ExportedRelation
+    record_class = RelationRecord
     column = "relations"
-    fields = ("example", "type")
+    fields = ("id", "from_id", "to_id", "type__text")
 
 
 class Texts(Labels):
     label_class = ExportedText
+    record_class = TextRecord
     column = "labels"
-    fields = ("example",)
+    fields = ("id", "text")
 
 
 class BoundingBoxes(Labels):
     label_class = ExportedBoundingBox
+    record_class = BoundingBoxRecord
     column = "labels"
-    fields = ("example", "label")
+    fields = ("uuid", "x", "y", "width", "height", "label__text")
 
 
 class Segments(Labels):
     label_class = ExportedSegmentation
+    record_class = SegmentationRecord
     column = "labels"
-    fields = ("example", "label")
+    fields = ("uuid", "points", "label__text")
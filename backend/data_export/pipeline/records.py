@@ -0,0 +1,138 @@
+"""
+Lightweight rows fetched with `values_list` by the label and comment collections.
+They expose the same `to_string`/`to_dict`/`to_tuple` interface as the exported models.
+"""
+from operator import itemgetter
+from typing import Any, Callable, Dict, List, NamedTuple, Tuple
+from uuid import UUID
+
+
+class CategoryRecord(NamedTuple):
+    id: int
+    label: str
+
+    def to_string(self) -> str:
+        return self.label
+
+
+class SpanRecord(NamedTuple):
+    id: int
+    label: str
+    start_offset: int
+    end_offset: int
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "label": self.label,
+            "start_offset": self.start_offset,
+            "end_offset": self.end_offset,
+        }
+
+    def to_tuple(self) -> Tuple:
+        return self.start_offset, self.end_offset, self.label
+
+
+class RelationRecord(NamedTuple):
+    id: int
+    from_id: int
+    to_id: int
+    type: str
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"id": self.id, "from_id": self.from_id, "to_id": self.to_id, "type": self.type}
+
+
+class TextRecord(NamedTuple):
+    id: int
+    text: str
+
+    def to_string(self) -> str:
+        return self.text
+
+
+class BoundingBoxRecord(NamedTuple):
+    uuid: UUID
+    x: float
+    y: float
+    width: float
+    height: float
+    label: str
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "uuid": str(self.uuid),
+            "x": self.x,
+            "y": self.y,
+            "width": self.width,
+            "height": self.height,
+            "label": self.label,
+        }
+
+    def to_tuple(self) -> Tuple:
+        return self.x, self.y, self.width, self.height
+
+
+class SegmentationRecord(NamedTuple):
+    uuid: UUID
+    points: List
+    label: str
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"uuid": str(self.uuid), "points": self.points, "label": self.label}
+
+
+class CommentRecord(NamedTuple):
+    id: int
+    text: str
+
+    def to_string(self) -> str:
+        return self.text
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"id": self.id, "comment": self.text}
+
+
+# The same conversions expressed by field position,
+# so that the formatters can apply them to whole columns with C-level getters.
+STRING_GETTERS: Dict[type, Callable] = {
+    CategoryRecord: itemgetter(1),
+    TextRecord: itemgetter(1),
+    CommentRecord: itemgetter(1),
+}
+
+
+# The conversions of whole lists of records, which unpack the fields in a comprehension
+# instead of calling a method per record.
+def span_tuples(records: List[SpanRecord]) -> List[Tuple]:
+    return [(start_offset, end_offset, label) for _, label, start_offset, end_offset in records]
+
+
+def bounding_box_tuples(records: List[BoundingBoxRecord]) -> List[Tuple]:
+    return [(x, y, width, height) for _, x, y, width, height, _ in records]
+
+
+def span_dicts(records: List[SpanRecord]) -> List[Dict[str, Any]]:
+    return [
+        {"id": id, "label": label, "start_offset": start_offset, "end_offset": end_offset}
+        for id, label, start_offset, end_offset in records
+    ]
+
+
+def relation_dicts(records: List[RelationRecord]) -> List[Dict[str, Any]]:
+    return [{"id": id, "from_id": from_id, "to_id": to_id, "type": type} for id, from_id, to_id, type in records]
+
+
+def comment_dicts(records: List[CommentRecord]) -> List[Dict[str, Any]]:
+    return [{"id": id, "comment": text} for id, text in records]
+
+
+TUPLE_CONVERTERS: Dict[type, Callable[[List[Any]], List[Tuple]]] = {
+    SpanRecord: span_tuples,
+    BoundingBoxRecord: bounding_box_tuples,
+}
+DICT_CONVERTERS: Dict[type, Callable[[List[Any]], List[Dict[str, Any]]]] = {
+    SpanRecord: span_dicts,
+    RelationRecord: relation_dicts,
+    CommentRecord: comment_dicts,
+}
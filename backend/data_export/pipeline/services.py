@@ -1,4 +1,7 @@
-from typing import List
+from contextlib import ExitStack
+from typing import Any, Dict, List, Optional
+
+from django.conf import settings
 
 from .dataset import Dataset
 from .formatters import Formatter
@@ -6,14 +9,27 @@ from .writers import Writer
 
 
 class ExportApplicationService:
-    def __init__(self, dataset: Dataset, formatters: List[Formatter], writer: Writer):
+    def __init__(self, dataset: Dataset, formatters: List[Formatter], writer: Writer, chunk_size: Optional[int] = None):
         self.dataset = dataset
         self.formatters = formatters
         self.writer = writer
+        self.chunk_size = chunk_size or settings.EXPORT_CHUNK_SIZE
 
     def export(self, file):
-        dataset = self.dataset.to_dataframe()
-        for formatter in self.formatters:
-            dataset = formatter.format(dataset)
-        self.writer.write(file, dataset)
+        with self.writer.open(file) as stream:
+            for dataset in self.dataset.chunks(self.chunk_size):
+                for formatter in self.formatters:
+                    dataset = formatter.format(dataset)
+                stream.write(dataset)
         return file
+
+    def export_by_user(self, files: Dict[int, Any], confirmed_only=False):
+        """Export each user's dataset to the file mapped to the user id, reading the data only once."""
+        with ExitStack() as stack:
+            streams = {user_id: stack.enter_context(self.writer.open(file)) for user_id, file in files.items()}
+            for datasets in self.dataset.chunks_by_user(list(streams), self.chunk_size, confirmed_only):
+                for user_id, dataset in datasets.items():
+                    for formatter in self.formatters:
+                        dataset = formatter.format(dataset)
+                    streams[user_id].write(dataset)
+        return files
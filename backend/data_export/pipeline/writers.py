@@ -1,19 +1,305 @@
 import abc
+import csv
+import io
+import os
+import tempfile
+from typing import IO, Any, Dict, Iterable, Iterator, List, Optional, Tuple, Type, Union
 
 import pandas as pd
 
+from api import json_backend
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    feather = None
+    pq = None
+
+
+def iter_records(dataset: pd.DataFrame) -> Iterator[Dict[str, Any]]:
+    """Same as `DataFrame.to_dict(orient="records")`, but converts each column to Python objects at once."""
+    columns = list(dataset.columns)
+    values = [dataset[column].tolist() for column in columns]
+    return (dict(zip(columns, row)) for row in zip(*values))
+
+
+def dump_records(dataset: pd.DataFrame) -> List[str]:
+    return [json_backend.dumps(record).decode("utf-8") for record in iter_records(dataset)]
+
+
+class Stream(abc.ABC):
+    """Appends datasets to a single file chunk by chunk.
+
+    The file is either a path, which the stream opens and closes by itself,
+    or an already opened file object, which is left open.
+    The file object must be binary if `binary` is set, and text otherwise.
+    """
+
+    binary = False
+
+    def __init__(self, file: Union[str, IO]):
+        self.owns_file = isinstance(file, str)
+        self.file: IO
+        if not isinstance(file, str):
+            self.file = file
+        elif self.binary:
+            self.file = open(file, mode="wb")
+        else:
+            self.file = open(file, mode="w", encoding="utf-8", newline="")
+        self.num_chunks = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def write(self, dataset: pd.DataFrame):
+        self.append(dataset)
+        self.num_chunks += 1
+
+    def close(self):
+        if self.num_chunks == 0:
+            # Keep the output of an empty dataset the same as the non-streaming writers.
+            self.write(pd.DataFrame([]))
+        self.finish()
+        if self.owns_file:
+            self.file.close()
+
+    @abc.abstractmethod
+    def append(self, dataset: pd.DataFrame):
+        raise NotImplementedError("Please implement this method in the subclass.")
+
+    def finish(self):
+        pass
+
+
+class CsvStream(Stream):
+    """Writes the rows to a temporary file until the stream is closed, and then the header and the rows to the file.
+
+    A later chunk may have columns the earlier ones don't have, e.g. a key of the metadata of some examples.
+    The header is the union of the columns in the order they appear, as in a DataFrame of the whole dataset,
+    and the rows of the chunks written before a column appeared are padded with empty values.
+    """
+
+    def __init__(self, file: Union[str, IO]):
+        super().__init__(file)
+        self.columns: List = []
+        self.body = tempfile.TemporaryFile()
+        # The size in bytes and the number of columns of each chunk in the temporary file.
+        self.chunks: List[Tuple[int, int]] = []
+
+    def append(self, dataset: pd.DataFrame):
+        known = set(self.columns)
+        self.columns.extend(column for column in dataset.columns if column not in known)
+        rows = dataset.reindex(columns=self.columns).to_csv(index=False, header=False).encode("utf-8")
+        self.body.write(rows)
+        self.chunks.append((len(rows), len(self.columns)))
+
+    def finish(self):
+        pd.DataFrame(columns=self.columns).to_csv(self.file, index=False, encoding="utf-8")
+        self.body.seek(0)
+        padding = csv.writer(self.file, lineterminator=os.linesep)
+        for size, num_columns in self.chunks:
+            rows = self.body.read(size).decode("utf-8")
+            if num_columns == len(self.columns):
+                self.file.write(rows)
+                continue
+            empty = [""] * (len(self.columns) - num_columns)
+            padding.writerows(row + empty for row in csv.reader(io.StringIO(rows)))
+        self.body.close()
+
+
+class JsonStream(Stream):
+    def __init__(self, file: Union[str, IO]):
+        super().__init__(file)
+        self.file.write("[")
+        self.has_records = False
+
+    def append(self, dataset: pd.DataFrame):
+        if json_backend.is_fast():
+            records = ",".join(dump_records(dataset))
+        else:
+            records = dataset.to_json(orient="records", force_ascii=False)[1:-1]
+        if not records:
+            return
+        if self.has_records:
+            self.file.write(",")
+        self.file.write(records)
+        self.has_records = True
+
+    def finish(self):
+        self.file.write("]")
+
+
+class JsonlStream(Stream):
+    def append(self, dataset: pd.DataFrame):
+        if not json_backend.is_fast():
+            dataset.to_json(self.file, orient="records", force_ascii=False, lines=True)
+            return
+        for record in dump_records(dataset):
+            self.file.write(record)
+            self.file.write("\n")
+
+
+class FastTextStream(Stream):
+    def append(self, dataset: pd.DataFrame):
+        dataset.to_csv(self.file, index=False, encoding="utf-8", header=False)
+
+
+def merge_types(a, b):
+    """Return the type to which the values of both types can be converted, or None if there is none.
+
+    A null type, e.g. of a column holding only nulls in a chunk, is replaced by the other type, numbers are widened,
+    and the fields of structs are merged.
+    """
+    if a == b:
+        return a
+    if pa.types.is_null(a):
+        return b
+    if pa.types.is_null(b):
+        return a
+    if pa.types.is_integer(a) and pa.types.is_integer(b):
+        return pa.int64()
+    if (pa.types.is_integer(a) or pa.types.is_floating(a)) and (pa.types.is_integer(b) or pa.types.is_floating(b)):
+        return pa.float64()
+    if pa.types.is_list(a) and pa.types.is_list(b):
+        value_type = merge_types(a.value_type, b.value_type)
+        return None if value_type is None else pa.list_(value_type)
+    if pa.types.is_struct(a) and pa.types.is_struct(b):
+        types = {field.name: field.type for field in a}
+        for field in b:
+            types[field.name] = merge_types(types[field.name], field.type) if field.name in types else field.type
+            if types[field.name] is None:
+                return None
+        return pa.struct(list(types.items()))
+    return None
+
+
+def to_string(value: Any) -> Optional[str]:
+    if value is None or isinstance(value, str):
+        return value
+    return json_backend.dumps(value, default=str).decode("utf-8")
+
+
+def convert_column(column, data_type):
+    """Convert the column to the type given by `merge_types`, or to strings if the types were in conflict."""
+    if column.type == data_type:
+        return column
+    if pa.types.is_string(data_type):
+        return pa.array([to_string(value) for value in column.to_pylist()], type=data_type)
+    try:
+        return column.cast(data_type)
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError, pa.ArrowTypeError):
+        return pa.array(column.to_pylist(), type=data_type)
+
+
+def to_table(dataset: pd.DataFrame):
+    """Convert the chunk to a table, writing as strings the columns whose values have conflicting types."""
+    try:
+        return pa.Table.from_pandas(dataset, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        dataset = dataset.copy()
+        for name in dataset.columns:
+            try:
+                pa.array(dataset[name], from_pandas=True)
+            except (pa.ArrowInvalid, pa.ArrowTypeError):
+                dataset[name] = dataset[name].map(to_string)
+        return pa.Table.from_pandas(dataset, preserve_index=False)
+
+
+class ArrowStream(Stream):
+    """Writes each chunk as a row group or record batch of a columnar file.
+
+    A columnar file has one schema, but a later chunk may have a new column, e.g. a key of the metadata
+    of some examples, or another type in a column. The chunks are therefore written to a temporary file
+    in the Arrow IPC format as they come, and the schema is widened with each one. On close, the chunks
+    are converted to the final schema and written to the file. A column whose types cannot be merged,
+    e.g. a metadata value which is a number in one example and a string in another, is written as strings.
+    """
+
+    binary = True
+
+    def __init__(self, file: Union[str, IO]):
+        super().__init__(file)
+        self.types: Dict[str, Any] = {}
+        self.body = tempfile.TemporaryFile()
+        # The size in bytes of each chunk in the temporary file.
+        self.chunks: List[int] = []
+
+    @abc.abstractmethod
+    def open_writer(self, schema):
+        raise NotImplementedError("Please implement this method in the subclass.")
+
+    def append(self, dataset: pd.DataFrame):
+        table = to_table(dataset)
+        for field in table.schema:
+            if field.name not in self.types:
+                self.types[field.name] = field.type
+            else:
+                self.types[field.name] = merge_types(self.types[field.name], field.type) or pa.string()
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        chunk = sink.getvalue()
+        self.body.write(chunk)
+        self.chunks.append(chunk.size)
+
+    def finish(self):
+        schema = pa.schema(list(self.types.items()))
+        self.body.seek(0)
+        with self.open_writer(schema) as writer:
+            for size in self.chunks:
+                table = pa.ipc.open_stream(self.body.read(size)).read_all()
+                columns = [
+                    convert_column(table.column(name), data_type)
+                    if name in table.column_names
+                    else pa.nulls(table.num_rows, data_type)
+                    for name, data_type in self.types.items()
+                ]
+                writer.write_table(pa.Table.from_arrays(columns, schema=schema))
+        self.body.close()
+
+
+class ParquetStream(ArrowStream):
+    def open_writer(self, schema):
+        return pq.ParquetWriter(self.file, schema)
+
+
+class ArrowIPCStream(ArrowStream):
+    def open_writer(self, schema):
+        return pa.ipc.new_file(self.file, schema)
+
 
 class Writer(abc.ABC):
     extension = ""
+    stream_class: Type[Stream]
+
+    @property
+    def binary(self) -> bool:
+        return self.stream_class.binary
 
     @staticmethod
     @abc.abstractmethod
     def write(file, dataset: pd.DataFrame):
         raise NotImplementedError("Please implement this method in the subclass.")
 
+    def open(self, file: Union[str, IO]) -> Stream:
+        """Open a stream to write the dataset incrementally."""
+        return self.stream_class(file)
+
+    def write_chunks(self, file: Union[str, IO], datasets: Iterable[pd.DataFrame]):
+        with self.open(file) as stream:
+            for dataset in datasets:
+                stream.write(dataset)
+
 
 class CsvWriter(Writer):
     extension = "csv"
+    stream_class = CsvStream
 
     @staticmethod
     def write(file, dataset: pd.DataFrame):
@@ -22,6 +308,7 @@ class CsvWriter(Writer):
 
 class JsonWriter(Writer):
     extension = "json"
+    stream_class = JsonStream
 
     @staticmethod
     def write(file, dataset: pd.DataFrame):
@@ -30,6 +317,7 @@ class JsonWriter(Writer):
 
 class JsonlWriter(Writer):
     extension = "jsonl"
+    stream_class = JsonlStream
 
     @staticmethod
     def write(file, dataset: pd.DataFrame):
@@ -38,7 +326,26 @@ class JsonlWriter(Writer):
 
 class FastTextWriter(Writer):
     extension = "txt"
+    stream_class = FastTextStream
 
     @staticmethod
     def write(file, dataset: pd.DataFrame):
         dataset.to_csv(file, index=False, encoding="utf-8", header=False)
+
+
+class ParquetWriter(Writer):
+    extension = "parquet"
+    stream_class = ParquetStream
+
+    @staticmethod
+    def write(file, dataset: pd.DataFrame):
+        pq.write_table(to_table(dataset), file)
+
+
+class ArrowWriter(Writer):
+    extension = "arrow"
+    stream_class = ArrowIPCStream
+
+    @staticmethod
+    def write(file, dataset: pd.DataFrame):
+        feather.write_feather(to_table(dataset), file)
@@ -0,0 +1,73 @@
+import os
+
+from django.contrib.auth.models import User
+from django.db.models import Model, QuerySet
+from django.db.models.signals import post_delete, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import DeletedExample, ExportArtifact, ExportCheckpoint
+from examples.models import Comment, Example, ExampleState
+from examples.signals import pre_bulk_delete
+from label_types.models import CategoryType, RelationType, SpanType
+from labels.models import BoundingBox, Category, Relation, Segmentation, Span, TextLabel
+from projects.models import Project
+
+# The models whose deletion changes the export of their examples.
+EXAMPLE_CONTENT_MODELS = (Category, Span, Relation, TextLabel, BoundingBox, Segmentation, Comment, ExampleState)
+
+
+def is_deleted_along_with(origin, *models) -> bool:
+    """Tell whether the deletion started from an instance or a queryset of one of the models."""
+    model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    return issubclass(model, models)
+
+
+def touch_examples(example_ids):
+    """Mark the examples as changed because some of their labels, comments or states were deleted."""
+    Example.objects.filter(pk__in=set(example_ids)).update(updated_at=timezone.now())
+
+
+def record_deleted_examples(examples: QuerySet):
+    """Leave tombstones so that the next incremental export reports the deletions.
+
+    Only the projects exported incrementally need them, as a first export has all the examples anyway.
+    """
+    exported_projects = ExportCheckpoint.objects.values("project_id")
+    tombstones = [
+        DeletedExample(project_id=project_id, example_id=example_id, uuid=uuid)
+        for project_id, example_id, uuid in examples.filter(project__in=exported_projects).values_list(
+            "project_id", "id", "uuid"
+        )
+    ]
+    DeletedExample.objects.bulk_create(tombstones)
+
+
+@receiver(pre_bulk_delete)
+def record_deletion(sender, queryset: QuerySet, **kwargs):
+    """Record the deletion of examples, labels, comments or states, once per deleted queryset or instance."""
+    if issubclass(sender, Example):
+        record_deleted_examples(queryset)
+    elif issubclass(sender, EXAMPLE_CONTENT_MODELS):
+        touch_examples(queryset.values_list("example_id", flat=True))
+
+
+def touch_examples_of(sender, instance: Model, origin=None, **kwargs):
+    """Mark the examples whose labels, comments or states are deleted along with the user or the label type."""
+    if is_deleted_along_with(origin, Project):
+        return
+    for model in EXAMPLE_CONTENT_MODELS:
+        for field in model._meta.concrete_fields:
+            if field.is_relation and issubclass(sender, field.related_model):
+                touch_examples(model.objects.filter(**{field.name: instance}).values_list("example_id", flat=True))
+
+
+# The labels, comments and states are deleted by a cascade from these models without sending `pre_bulk_delete`.
+for model in (User, CategoryType, SpanType, RelationType):
+    pre_delete.connect(touch_examples_of, sender=model, dispatch_uid=f"data_export.touch_examples_of.{model.__name__}")
+
+
+@receiver(post_delete, sender=ExportArtifact)
+def remove_artifact_file(sender, instance: ExportArtifact, **kwargs):
+    if os.path.exists(instance.path):
+        os.remove(instance.path)
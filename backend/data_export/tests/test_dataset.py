@@ -1,29 +1,69 @@
-import unittest
-from unittest.mock import MagicMock
-
 import pandas as pd
+from django.test import TestCase
+from model_mommy import mommy
 from pandas.testing import assert_frame_equal
 
+from data_export.models import ExportedExample
+from data_export.pipeline.comments import Comments
 from data_export.pipeline.dataset import Dataset
+from data_export.pipeline.labels import Categories
+from projects.models import ProjectType
+from projects.tests.utils import prepare_project
 
 
-class TestDataset(unittest.TestCase):
+class TestDataset(TestCase):
     def setUp(self):
-        example = MagicMock()
-        example.to_dict.return_value = {"data": "example"}
-        self.examples = MagicMock()
-        self.examples.__iter__.return_value = [example]
-        label = MagicMock()
-        label.find_by.return_value = {"labels": ["label"]}
-        self.labels = MagicMock()
-        self.labels.__iter__.return_value = [label]
-        comment = MagicMock()
-        comment.find_by.return_value = {"comments": ["comment"]}
-        self.comments = MagicMock()
-        self.comments.__iter__.return_value = [comment]
+        self.project = prepare_project(task=ProjectType.DOCUMENT_CLASSIFICATION)
+        self.example1 = mommy.make("ExportedExample", project=self.project.item, text="example1", meta={})
+        self.example2 = mommy.make("ExportedExample", project=self.project.item, text="example2", meta={})
+        self.example3 = mommy.make("ExportedExample", project=self.project.item, text="example3", meta={})
+        mommy.make("ExportedCategory", example=self.example1, user=self.project.admin, label__text="category")
+        mommy.make("ExportedComment", example=self.example3, user=self.project.admin, text="comment")
+        self.examples = ExportedExample.objects.filter(project=self.project.item)
+        self.expected = pd.DataFrame(
+            [
+                {"id": self.example1.id, "data": "example1", "categories": ["category"], "Comments": []},
+                {"id": self.example2.id, "data": "example2", "categories": [], "Comments": []},
+                {"id": self.example3.id, "data": "example3", "categories": [], "Comments": ["comment"]},
+            ]
+        )
+
+    def make_dataset(self):
+        labels = [Categories(self.examples)]
+        comments = [Comments(self.examples)]
+        return Dataset(self.examples, labels, comments)
+
+    def to_strings(self, df):
+        for column in ["categories", "Comments"]:
+            df[column] = df[column].apply(lambda items: [item.to_string() for item in items])
+        return df
 
     def test_to_dataframe(self):
-        dataset = Dataset(self.examples, self.labels, self.comments)
-        df = dataset.to_dataframe()
-        expected = pd.DataFrame([{"data": "example", "labels": ["label"], "comments": ["comment"]}])
+        df = self.to_strings(self.make_dataset().to_dataframe())
+        assert_frame_equal(df, self.expected)
+
+    def test_chunks(self):
+        chunks = list(self.make_dataset().chunks(2))
+        self.assertEqual([len(chunk) for chunk in chunks], [2, 1])
+        df = self.to_strings(pd.concat(chunks, ignore_index=True))
+        assert_frame_equal(df, self.expected)
+
+    def test_chunks_issue_one_query_per_collection(self):
+        dataset = self.make_dataset()
+        # one query per chunk for the examples, labels and comments plus a final empty page of examples
+        with self.assertNumQueries(3 * 2 + 1):
+            list(dataset.chunks(2))
+
+    def test_chunks_by_user(self):
+        annotator = self.project.annotator
+        mommy.make("ExportedCategory", example=self.example2, user=annotator, label__text="other")
+        mommy.make("ExampleState", example=self.example2, confirmed_by=annotator)
+        users = [self.project.admin.id, annotator.id]
+        datasets = {user_id: [] for user_id in users}
+        for chunk in self.make_dataset().chunks_by_user(users, 2, confirmed_only=True):
+            for user_id, df in chunk.items():
+                datasets[user_id].append(self.to_strings(df))
+        self.assertEqual(datasets[self.project.admin.id], [])
+        df = pd.concat(datasets[annotator.id], ignore_index=True)
+        expected = pd.DataFrame([{"id": self.example2.id, "data": "example2", "categories": ["other"], "Comments": []}])
         assert_frame_equal(df, expected)
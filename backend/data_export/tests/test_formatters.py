@@ -13,6 +13,7 @@ from data_export.pipeline.formatters import (
     RenameFormatter,
     TupledSpanFormatter,
 )
+from data_export.pipeline.records import CategoryRecord, CommentRecord, SpanRecord
 
 TARGET_COLUMN = "labels"
 
@@ -73,6 +74,36 @@ class TestTupledSpanFormatter(unittest.TestCase):
         assert_frame_equal(dataset, expected_dataset)
 
 
+class TestRecordFormatters(unittest.TestCase):
+    def setUp(self):
+        self.categories = [[CategoryRecord(1, "B"), CategoryRecord(2, "A")], []]
+        self.spans = [[SpanRecord(1, "B", 5, 6), SpanRecord(2, "A", 0, 1)], []]
+
+    def test_joined_category(self):
+        dataset = JoinedCategoryFormatter(TARGET_COLUMN).format(pd.DataFrame({TARGET_COLUMN: self.categories}))
+        assert_frame_equal(dataset, pd.DataFrame({TARGET_COLUMN: ["A#B", ""]}))
+
+    def test_listed_category(self):
+        dataset = ListedCategoryFormatter(TARGET_COLUMN).format(pd.DataFrame({TARGET_COLUMN: self.categories}))
+        assert_frame_equal(dataset, pd.DataFrame({TARGET_COLUMN: [["A", "B"], []]}))
+
+    def test_tupled_span(self):
+        dataset = TupledSpanFormatter(TARGET_COLUMN).format(pd.DataFrame({TARGET_COLUMN: self.spans}))
+        assert_frame_equal(dataset, pd.DataFrame({TARGET_COLUMN: [[(0, 1, "A"), (5, 6, "B")], []]}))
+
+    def test_dict(self):
+        dataset = DictFormatter(TARGET_COLUMN).format(pd.DataFrame({TARGET_COLUMN: self.spans}))
+        expected = [[span.to_dict() for span in self.spans[0]], []]
+        assert_frame_equal(dataset, pd.DataFrame({TARGET_COLUMN: expected}))
+
+    def test_fasttext(self):
+        dataset = pd.DataFrame(
+            [{TARGET_COLUMN: self.categories[0], DATA: "example", "Comments": [CommentRecord(1, "Comment")]}]
+        )
+        dataset = FastTextCategoryFormatter(TARGET_COLUMN).format(dataset)
+        self.assertEqual(dataset.tolist(), ["__label__A __label__B example __comment__Comment"])
+
+
 class TestFastTextFormatter(unittest.TestCase):
     def setUp(self):
         self.return_value_label = "Label"
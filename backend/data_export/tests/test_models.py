@@ -1,7 +1,16 @@
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+
 from django.test import TestCase
+from django.utils import timezone
 from model_mommy import mommy
 
-from data_export.models import ExportedExample
+from data_export.models import DeletedExample, ExportArtifact, ExportedExample
+from examples.models import Comment, Example
+from labels.models import Span
+from projects.models import ProjectType
 from projects.tests.utils import prepare_project
 
 
@@ -28,3 +37,145 @@ class TestExportedExample(TestCase):
         self.prepare_data(collaborative=False)
         examples = ExportedExample.objects.confirmed(self.project.item, user=self.project.annotator)
         self.assertEqual(examples.count(), 0)
+
+
+class TestChangedExamples(TestCase):
+    def setUp(self):
+        self.project = prepare_project(ProjectType.SEQUENCE_LABELING)
+        self.example1 = mommy.make("ExportedExample", project=self.project.item)
+        self.example2 = mommy.make("ExportedExample", project=self.project.item)
+        self.span = mommy.make("Span", example=self.example1, user=self.project.admin, start_offset=0, end_offset=1)
+        self.comment = mommy.make("Comment", example=self.example1, user=self.project.admin)
+        self.since = timezone.now()
+
+    def changed(self):
+        return list(ExportedExample.objects.changed_since(self.project.item, self.since))
+
+    def test_nothing_changed(self):
+        self.assertEqual(self.changed(), [])
+
+    def test_example_is_updated(self):
+        self.example2.save()
+        self.assertEqual(self.changed(), [self.example2])
+
+    def test_label_is_added(self):
+        mommy.make("Span", example=self.example2, user=self.project.admin, start_offset=0, end_offset=1)
+        self.assertEqual(self.changed(), [self.example2])
+
+    def test_example_is_confirmed(self):
+        mommy.make("ExampleState", example=self.example2, confirmed_by=self.project.admin)
+        self.assertEqual(self.changed(), [self.example2])
+
+    def test_label_is_deleted(self):
+        self.span.delete()
+        self.assertEqual(self.changed(), [self.example1])
+
+    def test_comments_are_deleted(self):
+        Comment.objects.filter(example=self.example1).delete()
+        self.assertEqual(self.changed(), [self.example1])
+
+
+class TestDeletedExample(TestCase):
+    def setUp(self):
+        self.project = prepare_project()
+        self.example = mommy.make("Example", project=self.project.item)
+        self.checkpoint = mommy.make(
+            "ExportCheckpoint", project=self.project.item, file_format="JSONL", exported_at=timezone.now()
+        )
+
+    def test_tombstone_is_recorded(self):
+        Example.objects.filter(pk=self.example.pk).delete()
+        tombstone = DeletedExample.objects.get(project=self.project.item)
+        self.assertEqual((tombstone.example_id, tombstone.uuid), (self.example.id, self.example.uuid))
+
+    def test_tombstone_is_recorded_on_instance_deletion(self):
+        example_id = self.example.id
+        self.example.delete()
+        self.assertTrue(DeletedExample.objects.filter(example_id=example_id).exists())
+
+    def test_no_tombstone_without_incremental_export(self):
+        self.checkpoint.delete()
+        self.example.delete()
+        self.assertFalse(DeletedExample.objects.exists())
+
+    def test_project_deletion_leaves_no_tombstone(self):
+        self.project.item.delete()
+        self.assertFalse(DeletedExample.objects.exists())
+
+    def test_examples_are_deleted_in_bulk(self):
+        mommy.make("Example", project=self.project.item, _quantity=10)
+        # The tombstones are selected and inserted at once, and the labels are deleted without being loaded.
+        with self.assertNumQueries(13):
+            Example.objects.filter(project=self.project.item).delete()
+        self.assertEqual(DeletedExample.objects.count(), 11)
+
+    def test_prune_keeps_the_tombstones_of_the_oldest_checkpoint(self):
+        self.example.delete()
+        mommy.make("ExportCheckpoint", project=self.project.item, file_format="CSV", exported_at=timezone.now())
+        DeletedExample.objects.prune(self.project.item)
+        self.assertEqual(DeletedExample.objects.count(), 1)
+        mommy.make("ExportCheckpoint", project=self.project.item, file_format="JSONL", exported_at=timezone.now())
+        DeletedExample.objects.prune(self.project.item)
+        self.assertFalse(DeletedExample.objects.exists())
+
+
+class TestDeletionTouchesExamples(TestCase):
+    def setUp(self):
+        self.project = prepare_project(ProjectType.SEQUENCE_LABELING)
+        self.example = mommy.make("ExportedExample", project=self.project.item)
+        self.span = mommy.make("Span", example=self.example, user=self.project.annotator, start_offset=0, end_offset=1)
+        self.since = timezone.now()
+
+    def changed(self):
+        return list(ExportedExample.objects.changed_since(self.project.item, self.since))
+
+    def test_user_deletion(self):
+        self.project.annotator.delete()
+        self.assertEqual(self.changed(), [self.example])
+
+    def test_label_type_deletion(self):
+        self.span.label.delete()
+        self.assertEqual(self.changed(), [self.example])
+
+    def test_labels_are_deleted_in_bulk(self):
+        mommy.make("Span", example=self.example, user=self.project.admin, start_offset=1, end_offset=2)
+        with self.assertNumQueries(5):
+            Span.objects.filter(example=self.example).delete()
+        self.assertEqual(self.changed(), [self.example])
+
+
+class TestExportArtifact(TestCase):
+    def setUp(self):
+        self.project = prepare_project()
+        self.dirpath = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dirpath)
+
+    def make_artifact(self, name, size=1, age=0):
+        path = os.path.join(self.dirpath, name)
+        open(path, "w").close()
+        artifact = mommy.make("ExportArtifact", project=self.project.item, path=path, size=size, version="v")
+        ExportArtifact.objects.filter(pk=artifact.pk).update(created_at=timezone.now() - timedelta(seconds=age))
+        return artifact
+
+    def test_content_version_changes_with_content(self):
+        version = ExportArtifact.objects.content_version(self.project.item)
+        self.assertEqual(ExportArtifact.objects.content_version(self.project.item), version)
+        mommy.make("Example", project=self.project.item)
+        self.assertNotEqual(ExportArtifact.objects.content_version(self.project.item), version)
+
+    def test_find_skips_expired_and_missing_artifacts(self):
+        self.make_artifact("old", age=100)
+        missing = self.make_artifact("missing")
+        os.remove(missing.path)
+        found = ExportArtifact.objects.find(self.project.item, missing.file_format, False, "v", max_age=10)
+        self.assertIsNone(found)
+
+    def test_evict_by_age_and_size(self):
+        self.make_artifact("old", age=100)
+        self.make_artifact("large", size=10, age=2)
+        newest = self.make_artifact("newest", size=10, age=1)
+        ExportArtifact.objects.evict(max_age=10, max_size=15)
+        self.assertEqual(list(ExportArtifact.objects.all()), [newest])
+        self.assertEqual(os.listdir(self.dirpath), ["newest"])
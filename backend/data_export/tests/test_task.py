@@ -1,11 +1,20 @@
+import io
 import os
+import shutil
+import tempfile
+import unittest
 import zipfile
+from unittest.mock import patch
 
+import billiard
 import pandas as pd
-from django.test import TestCase, override_settings
+from django.test import TestCase, TransactionTestCase, override_settings
 from model_mommy import mommy
 
+from .. import celery_tasks
 from ..celery_tasks import export_dataset
+from ..pipeline.factories import create_labels
+from ..pipeline.writers import pa
 from data_export.models import DATA
 from projects.models import ProjectType
 from projects.tests.utils import prepare_project
@@ -117,6 +126,73 @@ class TestExportCategory(TestExport):
         self.assertEqual(dataset, expected_dataset)
 
 
+class InlinePool:
+    """Runs the functions applied in the current process, which shares the test database."""
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def apply_async(self, fn, args):
+        return AsyncResult(fn, args)
+
+
+class AsyncResult:
+    def __init__(self, fn, args):
+        self.value = fn(*args)
+
+    def get(self):
+        return self.value
+
+
+def export_in_worker(*args):
+    """Run the export task in a pool process of billiard, which is what a prefork Celery worker runs tasks in."""
+    with billiard.Pool(processes=1) as pool:
+        return pool.apply(export_dataset, args)
+
+
+@override_settings(EXPORT_WORKERS=2)
+@patch.object(celery_tasks, "Pool", InlinePool)
+class TestExportCategoryInParallel(TestExportCategory):
+    pass
+
+
+@override_settings(EXPORT_WORKERS=2)
+class TestExportInProcessPool(TransactionTestCase):
+    """Runs the export across a real process pool, whose workers set up Django and connect to the database again.
+
+    The data is committed, as the workers cannot see the transaction of a test case.
+    """
+
+    def setUp(self):
+        self.project = prepare_project(ProjectType.DOCUMENT_CLASSIFICATION)
+        self.example = mommy.make("ExportedExample", project=self.project.item, text="example")
+        self.category = mommy.make("ExportedCategory", example=self.example, user=self.project.annotator)
+
+    def assert_exported(self, file):
+        datasets = read_zip_content(file)
+        os.remove(file)
+        data = {"id": self.example.id, "text": "example", "Comments": []}
+        expected_datasets = {
+            self.project.admin.username: [{**data, "label": []}],
+            self.project.approver.username: [{**data, "label": []}],
+            self.project.annotator.username: [{**data, "label": [self.category.to_string()]}],
+        }
+        self.assertEqual(datasets, expected_datasets)
+
+    def test_members_are_exported_by_workers(self):
+        self.assert_exported(export_dataset(self.project.id, "JSONL"))
+
+    def test_members_are_exported_inside_celery_worker(self):
+        # A prefork worker is a daemonic process, which may not start a pool of the multiprocessing module.
+        self.assert_exported(export_in_worker(self.project.id, "JSONL"))
+
+
 class TestExportSeq2seq(TestExport):
     def prepare_data(self, collaborative=False):
         self.project = prepare_project(ProjectType.SEQ2SEQ, collaborative_annotation=collaborative)
@@ -824,3 +900,134 @@ class TestExportRelation(TestExport):
             }
         ]
         self.assertEqual(dataset, expected_dataset)
+
+
+class TestExportArchive(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.media_root)
+
+    def export(self, collaborative):
+        project = prepare_project(ProjectType.DOCUMENT_CLASSIFICATION, collaborative_annotation=collaborative)
+        mommy.make("ExportedExample", project=project.item, text="example")
+        with override_settings(MEDIA_ROOT=self.media_root, EXPORT_COMPRESSION_LEVEL=9):
+            return export_dataset(project.id, "JSONL")
+
+    def test_collaborative_dataset_is_written_into_archive(self):
+        file = self.export(collaborative=True)
+        with zipfile.ZipFile(file) as z:
+            entries = [(info.filename, info.compress_type) for info in z.infolist()]
+        self.assertEqual(entries, [("all.jsonl", zipfile.ZIP_DEFLATED)])
+        self.assertEqual(os.listdir(self.media_root), [os.path.basename(file)])
+
+    def test_individual_files_are_written_into_archive(self):
+        file = self.export(collaborative=False)
+        with zipfile.ZipFile(file) as z:
+            self.assertEqual(len(z.namelist()), 3)
+            self.assertTrue(all(info.compress_type == zipfile.ZIP_DEFLATED for info in z.infolist()))
+        self.assertEqual(os.listdir(self.media_root), [os.path.basename(file)])
+
+    @patch.object(celery_tasks, "create_labels", wraps=create_labels)
+    def test_individual_files_are_written_in_single_pass(self, create_labels_mock):
+        self.export(collaborative=False)
+        create_labels_mock.assert_called_once()
+
+    @override_settings(EXPORT_WORKERS=2)
+    @patch.object(celery_tasks, "Pool", InlinePool)
+    def test_individual_files_of_workers_are_removed_after_archiving(self):
+        file = self.export(collaborative=False)
+        with zipfile.ZipFile(file) as z:
+            self.assertEqual(len(z.namelist()), 3)
+        self.assertEqual(os.listdir(self.media_root), [os.path.basename(file)])
+
+
+@unittest.skipIf(pa is None, "pyarrow is not installed")
+class TestExportColumnar(TestCase):
+    def setUp(self):
+        self.project = prepare_project(ProjectType.SEQUENCE_LABELING, collaborative_annotation=True)
+        self.example = mommy.make("ExportedExample", project=self.project.item, text="example", meta={})
+        self.span = mommy.make(
+            "ExportedSpan", example=self.example, user=self.project.admin, start_offset=0, end_offset=1
+        )
+
+    def read(self, file_format, read_table):
+        file = export_dataset(self.project.id, file_format)
+        with zipfile.ZipFile(file) as z:
+            records = read_table(io.BytesIO(z.read(z.namelist()[0]))).to_pylist()
+        os.remove(file)
+        return records
+
+    def test_parquet_and_arrow(self):
+        expected = [{"id": self.example.id, "text": "example", "label": [self.span.to_dict()], "Comments": []}]
+        self.assertEqual(self.read("Parquet", pa.parquet.read_table), expected)
+        self.assertEqual(self.read("Arrow", lambda f: pa.ipc.open_file(f).read_all()), expected)
+
+
+class TestIncrementalExport(TestCase):
+    def setUp(self):
+        self.project = prepare_project(ProjectType.DOCUMENT_CLASSIFICATION, collaborative_annotation=True)
+        self.example1 = mommy.make("ExportedExample", project=self.project.item, text="example1")
+        self.example2 = mommy.make("ExportedExample", project=self.project.item, text="example2")
+
+    def export(self):
+        file = export_dataset(self.project.id, "JSONL", incremental=True)
+        datasets = read_zip_content(file)
+        os.remove(file)
+        return {name: [record["id"] for record in records] for name, records in datasets.items()}
+
+    def test_first_export_contains_all_examples(self):
+        self.assertEqual(self.export(), {"all": [self.example1.id, self.example2.id], "deleted": []})
+
+    def test_export_contains_only_changes_since_previous_export(self):
+        self.export()
+        mommy.make("ExportedCategory", example=self.example2, user=self.project.admin)
+        deleted_id = self.example1.id
+        self.example1.delete()
+        self.assertEqual(self.export(), {"all": [self.example2.id], "deleted": [deleted_id]})
+        self.assertEqual(self.export(), {"all": [], "deleted": []})
+
+    def test_checkpoint_is_kept_per_format(self):
+        self.export()
+        file = export_dataset(self.project.id, "CSV", incremental=True)
+        with zipfile.ZipFile(file) as z:
+            self.assertEqual(len(pd.read_csv(io.BytesIO(z.read("all.csv")))), 2)
+        os.remove(file)
+
+
+class TestExportCache(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.project = prepare_project(ProjectType.DOCUMENT_CLASSIFICATION, collaborative_annotation=True)
+        self.example = mommy.make("ExportedExample", project=self.project.item, text="example")
+
+    def tearDown(self):
+        shutil.rmtree(self.media_root)
+
+    def export(self, file_format="JSONL", **kwargs):
+        with override_settings(MEDIA_ROOT=self.media_root):
+            return export_dataset(self.project.id, file_format, **kwargs)
+
+    def test_same_request_reuses_archive(self):
+        self.assertEqual(self.export(), self.export())
+        self.assertEqual(len(os.listdir(self.media_root)), 1)
+
+    def test_different_request_is_exported(self):
+        self.assertNotEqual(self.export(), self.export(confirmed_only=True))
+        self.assertNotEqual(self.export(), self.export("CSV"))
+
+    def test_changed_content_is_exported(self):
+        file = self.export()
+        mommy.make("ExportedCategory", example=self.example, user=self.project.admin)
+        self.assertNotEqual(self.export(), file)
+
+    def test_deleted_label_is_exported(self):
+        category = mommy.make("ExportedCategory", example=self.example, user=self.project.admin)
+        file = self.export()
+        category.delete()
+        self.assertNotEqual(self.export(), file)
+
+    @override_settings(EXPORT_CACHE_MAX_AGE=0)
+    def test_disabled_cache(self):
+        self.assertNotEqual(self.export(), self.export())
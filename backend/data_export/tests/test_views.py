@@ -1,3 +1,7 @@
+import os
+import tempfile
+
+from celery.result import AsyncResult
 from rest_framework import status
 from rest_framework.reverse import reverse
 
@@ -19,3 +23,25 @@ class TestDownloadCatalog(CRUDMixin):
     def test_denies_project_staff_to_list_catalog(self):
         for member in self.project.staffs:
             self.assert_fetch(member, status.HTTP_403_FORBIDDEN)
+
+
+class TestDownloadDataset(CRUDMixin):
+    def setUp(self):
+        self.project = prepare_project(task=ProjectType.DOCUMENT_CLASSIFICATION)
+        self.url = reverse(viewname="download-dataset", args=[self.project.item.id]) + "?taskId=task-id"
+        self.file = tempfile.NamedTemporaryFile(suffix=".zip", delete=False)
+        self.file.write(b"zip")
+        self.file.close()
+        AsyncResult("task-id").backend.store_result("task-id", self.file.name, "SUCCESS")
+
+    def tearDown(self):
+        if os.path.exists(self.file.name):
+            os.remove(self.file.name)
+
+    def test_allows_project_admin_to_download_dataset(self):
+        response = self.assert_fetch(self.project.admin, status.HTTP_200_OK)
+        self.assertEqual(b"".join(response.streaming_content), b"zip")
+
+    def test_reports_evicted_file(self):
+        os.remove(self.file.name)
+        self.assert_fetch(self.project.admin, status.HTTP_404_NOT_FOUND)
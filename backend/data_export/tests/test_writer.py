@@ -2,9 +2,18 @@ import os
 import unittest
 
 import pandas as pd
+from django.test import override_settings
 from pandas.testing import assert_frame_equal
 
-from ..pipeline.writers import CsvWriter, FastTextWriter, JsonlWriter, JsonWriter
+from ..pipeline.writers import (
+    ArrowWriter,
+    CsvWriter,
+    FastTextWriter,
+    JsonlWriter,
+    JsonWriter,
+    ParquetWriter,
+    pa,
+)
 
 
 class TestWriter(unittest.TestCase):
@@ -29,6 +38,23 @@ class TestCSVWriter(TestWriter):
         loaded_dataset = pd.read_csv(self.file)
         assert_frame_equal(self.dataset, loaded_dataset)
 
+    def test_write_chunks(self):
+        writer = CsvWriter()
+        writer.write_chunks(self.file, [self.dataset[:2], self.dataset[2:]])
+        loaded_dataset = pd.read_csv(self.file)
+        assert_frame_equal(self.dataset, loaded_dataset)
+
+    def test_write_chunks_with_new_columns(self):
+        records = [
+            {"id": 0, "text": "A", "source": "web"},
+            {"id": 1, "text": "B\nC"},
+            {"id": 2, "text": "D", "source": "book", "page": 3},
+        ]
+        writer = CsvWriter()
+        writer.write_chunks(self.file, [pd.DataFrame(records[:2]), pd.DataFrame(records[2:])])
+        loaded_dataset = pd.read_csv(self.file)
+        assert_frame_equal(pd.DataFrame(records), loaded_dataset)
+
 
 class TestJsonWriter(TestWriter):
     def test_write(self):
@@ -37,6 +63,18 @@ class TestJsonWriter(TestWriter):
         loaded_dataset = pd.read_json(self.file)
         assert_frame_equal(self.dataset, loaded_dataset)
 
+    def test_write_chunks(self):
+        writer = JsonWriter()
+        writer.write_chunks(self.file, [self.dataset[:2], self.dataset[2:]])
+        loaded_dataset = pd.read_json(self.file)
+        assert_frame_equal(self.dataset, loaded_dataset)
+
+    def test_write_no_chunks(self):
+        writer = JsonWriter()
+        writer.write_chunks(self.file, [])
+        with open(self.file, encoding="utf-8") as f:
+            self.assertEqual(f.read(), "[]")
+
 
 class TestJsonlWriter(TestWriter):
     def test_write(self):
@@ -45,6 +83,78 @@ class TestJsonlWriter(TestWriter):
         loaded_dataset = pd.read_json(self.file, lines=True)
         assert_frame_equal(self.dataset, loaded_dataset)
 
+    def test_write_chunks(self):
+        writer = JsonlWriter()
+        writer.write_chunks(self.file, [self.dataset[:2], self.dataset[2:]])
+        loaded_dataset = pd.read_json(self.file, lines=True)
+        assert_frame_equal(self.dataset, loaded_dataset)
+
+    @override_settings(JSON_BACKEND="json")
+    def test_write_chunks_without_fast_backend(self):
+        self.test_write_chunks()
+
+
+@unittest.skipIf(pa is None, "pyarrow is not installed")
+class TestColumnarWriter(TestWriter):
+    def setUp(self):
+        super().setUp()
+        self.dataset["labels"] = [[], [], [{"label": "A", "start_offset": 0}]]
+
+    def test_write_chunks_parquet(self):
+        writer = ParquetWriter()
+        writer.write_chunks(self.file, [self.dataset[:1], self.dataset[1:2], self.dataset[2:]])
+        loaded_dataset = pa.parquet.read_table(self.file).to_pylist()
+        self.assertEqual(loaded_dataset, self.dataset.to_dict(orient="records"))
+
+    def test_write_chunks_arrow(self):
+        writer = ArrowWriter()
+        writer.write_chunks(self.file, [self.dataset[:2], self.dataset[2:]])
+        loaded_dataset = pa.ipc.open_file(self.file).read_all().to_pylist()
+        self.assertEqual(loaded_dataset, self.dataset.to_dict(orient="records"))
+
+    def test_write_chunks_with_new_columns(self):
+        chunks = [
+            pd.DataFrame([{"id": 0, "text": "A", "score": 1}]),
+            pd.DataFrame([{"id": 1, "text": "B", "score": 0.5, "source": {"name": "web"}}]),
+            pd.DataFrame([{"id": 2, "text": "C", "source": {"name": "book", "page": 3}}]),
+        ]
+        expected = [
+            {"id": 0, "text": "A", "score": 1.0, "source": None},
+            {"id": 1, "text": "B", "score": 0.5, "source": {"name": "web", "page": None}},
+            {"id": 2, "text": "C", "score": None, "source": {"name": "book", "page": 3}},
+        ]
+        ParquetWriter().write_chunks(self.file, chunks)
+        self.assertEqual(pa.parquet.read_table(self.file).to_pylist(), expected)
+        ArrowWriter().write_chunks(self.file, chunks)
+        self.assertEqual(pa.ipc.open_file(self.file).read_all().to_pylist(), expected)
+
+    def test_write_chunks_with_conflicting_types(self):
+        chunks = [
+            pd.DataFrame([{"id": 0, "page": 1}]),
+            pd.DataFrame([{"id": 1, "page": "iv"}]),
+            pd.DataFrame([{"id": 2, "page": [1, 2]}]),
+        ]
+        expected = [{"id": 0, "page": "1"}, {"id": 1, "page": "iv"}, {"id": 2, "page": "[1,2]"}]
+        ParquetWriter().write_chunks(self.file, chunks)
+        self.assertEqual(pa.parquet.read_table(self.file).to_pylist(), expected)
+        ArrowWriter().write_chunks(self.file, chunks)
+        self.assertEqual(pa.ipc.open_file(self.file).read_all().to_pylist(), expected)
+
+    def test_write_chunk_with_conflicting_types(self):
+        chunks = [pd.DataFrame([{"id": 0, "meta": 1}, {"id": 1, "meta": "a"}, {"id": 2, "meta": None}])]
+        expected = [{"id": 0, "meta": "1"}, {"id": 1, "meta": "a"}, {"id": 2, "meta": None}]
+        ParquetWriter().write_chunks(self.file, chunks)
+        self.assertEqual(pa.parquet.read_table(self.file).to_pylist(), expected)
+        ArrowWriter().write_chunks(self.file, chunks)
+        self.assertEqual(pa.ipc.open_file(self.file).read_all().to_pylist(), expected)
+        ParquetWriter().write(self.file, chunks[0])
+        self.assertEqual(pa.parquet.read_table(self.file).to_pylist(), expected)
+
+    def test_write_parquet(self):
+        ParquetWriter().write(self.file, self.dataset)
+        loaded_dataset = pa.parquet.read_table(self.file).to_pylist()
+        self.assertEqual(loaded_dataset, self.dataset.to_dict(orient="records"))
+
 
 class TestFastText(unittest.TestCase):
     def setUp(self):
@@ -32,7 +32,15 @@ class DatasetExportAPI(APIView):
         ready = task.ready()
         if ready:
             filename = task.result
-            return FileResponse(open(filename, mode="rb"), as_attachment=True)
+            try:
+                file = open(filename, mode="rb")
+            except FileNotFoundError:
+                # The archive has been evicted from the export cache since the task finished.
+                return Response(
+                    {"detail": "The exported file no longer exists. Please export the dataset again."},
+                    status=status.HTTP_404_NOT_FOUND,
+                )
+            return FileResponse(file, as_attachment=True)
         return Response({"status": "Not ready"})
 
     def post(self, request, *args, **kwargs):
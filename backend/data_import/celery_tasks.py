@@ -1,4 +1,4 @@
-from typing import List
+from typing import Any, Dict, List
 
 import filetype
 from celery import shared_task
@@ -8,7 +8,8 @@ from django.shortcuts import get_object_or_404
 from django_drf_filepond.api import store_upload
 from django_drf_filepond.models import TemporaryUpload
 
-from .datasets import load_dataset
+from .datasets import BatchSizer, load_dataset
+from .models import ImportCheckpoint
 from .pipeline.catalog import Format, create_file_format
 from .pipeline.exceptions import (
     FileImportException,
@@ -46,25 +47,60 @@ def check_uploaded_files(upload_ids: List[str], file_format: Format):
     return cleaned_ids, errors
 
 
-@shared_task(autoretry_for=(Exception,), retry_backoff=True, retry_jitter=True)
-def import_dataset(user_id, project_id, file_format: str, upload_ids: List[str], task: str, **kwargs):
+@shared_task(bind=True, autoretry_for=(Exception,), retry_backoff=True, retry_jitter=True)
+def import_dataset(self, user_id, project_id, file_format: str, upload_ids: List[str], task: str, **kwargs):
     project = get_object_or_404(Project, pk=project_id)
     user = get_object_or_404(get_user_model(), pk=user_id)
+    # The retries of a task share its id, so they find the checkpoint of the previous attempts.
+    checkpoint = None
+    if self.request.id:
+        checkpoint, _ = ImportCheckpoint.objects.get_or_create(task_id=self.request.id, defaults={"project": project})
     try:
         fmt = create_file_format(file_format)
         upload_ids, errors = check_uploaded_files(upload_ids, fmt)
-        temporary_uploads = TemporaryUpload.objects.filter(upload_id__in=upload_ids)
+        if checkpoint is not None:
+            # The rejected files are deleted, so a retry can only report them from the checkpoint.
+            checkpoint.add_errors([e.dict() for e in errors])
+        # The files must come in the same order on a retry, as the checkpoint refers to them by index.
+        temporary_uploads = sorted(
+            TemporaryUpload.objects.filter(upload_id__in=upload_ids), key=lambda tu: upload_ids.index(tu.upload_id)
+        )
         filenames = [
             FileName(full_path=tu.get_file_path(), generated_name=tu.file.name, upload_name=tu.upload_name)
             for tu in temporary_uploads
         ]
 
-        dataset = load_dataset(task, fmt, filenames, project, **kwargs)
-        dataset.save(user, batch_size=settings.IMPORT_BATCH_SIZE)
+        def report_progress(progress: Dict[str, Any]):
+            self.update_state(state="PROGRESS", meta=progress)
+
+        if checkpoint is None or not checkpoint.finished:
+            dataset = load_dataset(task, fmt, filenames, project, **kwargs)
+            dataset.save(
+                user,
+                batch_size=BatchSizer(
+                    settings.IMPORT_BATCH_SIZE,
+                    min_size=settings.IMPORT_BATCH_SIZE_MIN,
+                    max_size=settings.IMPORT_BATCH_SIZE_MAX,
+                    target_seconds=settings.IMPORT_BATCH_SECONDS,
+                    max_rows=settings.IMPORT_BATCH_MAX_ROWS,
+                ),
+                checkpoint=checkpoint,
+                on_progress=report_progress if self.request.id else None,
+            )
+            errors.extend(dataset.errors)
+        result = [e.dict() for e in errors]
+        if checkpoint is not None:
+            result = checkpoint.merge_errors(result)
+            checkpoint.finished = True
+            checkpoint.save()
         upload_to_store(temporary_uploads)
-        errors.extend(dataset.errors)
-        return {"error": [e.dict() for e in errors]}
+        if checkpoint is not None:
+            checkpoint.delete()
+        return {"error": result}
     except FileImportException as e:
+        # It isn't retried.
+        if checkpoint is not None:
+            checkpoint.delete()
         return {"error": [e.dict()]}
 
 
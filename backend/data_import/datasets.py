@@ -1,10 +1,15 @@
 import abc
-import pandas as pd
-from typing import List, Type
+import os
+import time
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple, Type, Union
 
+import numpy as np
+import pandas as pd
+from django.conf import settings
 from django.contrib.auth.models import User
+from django.db import transaction
 
-from .models import DummyLabelType
+from .models import DummyLabelType, ImportCheckpoint
 from .pipeline.catalog import RELATION_EXTRACTION, Format
 from .pipeline.data import BaseData, BinaryData, TextData
 from .pipeline.examples import Examples
@@ -17,17 +22,106 @@ from .pipeline.makers import BinaryExampleMaker, ExampleMaker, LabelMaker
 from .pipeline.readers import (
     DEFAULT_LABEL_COLUMN,
     DEFAULT_TEXT_COLUMN,
+    Cursor,
     FileName,
+    FileRange,
+    ParallelReader,
+    Parser,
     Reader,
+    RecordBatch,
+    is_missing,
 )
 from label_types.models import CategoryType, LabelType, RelationType, SpanType
 from projects.models import Project, ProjectType
-from examples.models import Example
-from labels.models import Span, Relation
-from projects.models import AspectBasedSentimentAnalysisProject
-from data_import.pipeline.makers import LabelMaker
-from data_import.pipeline.makers import ExampleMaker
-from data_import.pipeline.label_types import LabelTypes
+
+
+class ImportProgress:
+    """The counts of what an import has done so far, reported while it runs.
+
+    The bytes read are those of the files before the one being parsed, plus the position of the reader in it.
+    """
+
+    def __init__(self, filenames: List[FileName], interval: float = 1.0):
+        self.sizes = [os.path.getsize(filename.full_path) for filename in filenames]
+        self.interval = interval
+        self.records = 0
+        self.examples = 0
+        self.labels = 0
+        self.started_at = time.monotonic()
+        self.reported_at: Optional[float] = None
+
+    def add(self, records: int, examples: int, labels: int):
+        self.records += records
+        self.examples += examples
+        self.labels += labels
+
+    def is_due(self) -> bool:
+        """Tell whether the interval has passed since the last report, which is then made now."""
+        now = time.monotonic()
+        if self.reported_at is not None and now - self.reported_at < self.interval:
+            return False
+        self.reported_at = now
+        return True
+
+    def dict(self, position: Tuple[int, int], errors: int, batch_size: int) -> Dict[str, Any]:
+        """Return the counts, with the bytes read up to the position given by `Reader.tell_bytes`."""
+        file_index, file_bytes = position
+        elapsed = time.monotonic() - self.started_at
+        return {
+            "records": self.records,
+            "examples": self.examples,
+            "labels": self.labels,
+            "errors": errors,
+            "rows_per_second": self.records / elapsed if elapsed > 0 else 0.0,
+            "bytes_read": sum(self.sizes[:file_index]) + file_bytes,
+            "bytes_total": sum(self.sizes),
+            "elapsed": elapsed,
+            "batch_size": batch_size,
+        }
+
+
+class BatchSizer:
+    """Tunes the size of the batches of an import to the time they take to save.
+
+    A batch has a fixed cost, like the round trips to the database, so larger batches save faster up to a point,
+    while too large ones make long transactions. After each batch, the size moves toward the one that would take
+    `target_seconds` to save, by at most twice or half at once, and is capped so that a batch inserts at most
+    `max_rows` examples and labels. With the default bounds, the size stays fixed.
+
+    Args:
+        size: The size of the first batch.
+        min_size: The lower bound of the size. It's lowered to `size` if greater.
+        max_size: The upper bound of the size. It's raised to `size` if less.
+        target_seconds: The time a batch should take to save.
+        max_rows: The number of examples and labels a batch may insert.
+    """
+
+    def __init__(
+        self,
+        size: int,
+        min_size: Optional[int] = None,
+        max_size: Optional[int] = None,
+        target_seconds: float = 1.0,
+        max_rows: Optional[int] = None,
+    ):
+        self.size = size
+        self.min_size = min(min_size or size, size)
+        self.max_size = max(max_size or size, size)
+        self.target_seconds = target_seconds
+        self.max_rows = max_rows
+
+    def __call__(self) -> int:
+        return self.size
+
+    def update(self, records: int, rows: int, seconds: float):
+        """Tune the size to the last batch, which had `records` records inserting `rows` rows in `seconds`."""
+        if records == 0:
+            return
+        factor = self.target_seconds / seconds if seconds > 0 else 2.0
+        size = records * min(max(factor, 0.5), 2.0)
+        if self.max_rows and rows > 0:
+            size = min(size, self.max_rows * records / rows)
+        self.size = int(min(max(size, self.min_size), self.max_size))
 
 
 class Dataset(abc.ABC):
@@ -36,7 +130,45 @@ class Dataset(abc.ABC):
         self.project = project
         self.kwargs = kwargs
 
-    def save(self, user: User, batch_size: int = 1000):
+    def save(
+        self,
+        user: User,
+        batch_size: Union[int, BatchSizer] = 1000,
+        checkpoint: Optional[ImportCheckpoint] = None,
+        on_progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ):
+        """Save the records batch by batch, each in a transaction.
+
+        With a checkpoint, the saving starts at its cursor, and the cursor after each batch is saved in the same
+        transaction as the batch. So an interrupted import resumes without saving any batch twice.
+
+        Args:
+            user: The user annotating the labels.
+            batch_size: The number of records saved at once, or a `BatchSizer` tuning it while saving.
+            checkpoint: The progress of the previous attempts of the import.
+            on_progress: A function called with `ImportProgress.dict()` after a batch, at most once per second.
+        """
+        sizer = batch_size if isinstance(batch_size, BatchSizer) else BatchSizer(batch_size)
+        if checkpoint is not None:
+            self.reader.seek(checkpoint.cursor)
+        progress = ImportProgress(self.reader.filenames)
+        # The errors already added to the checkpoint. The makers sort their errors, so they are told apart by identity.
+        checkpointed: Set[int] = set()
+        for records in self.reader.batch(sizer):
+            started_at = time.monotonic()
+            with transaction.atomic():
+                examples, labels = self.save_batch(user, records)
+                if checkpoint is not None:
+                    errors = [error for error in self.errors if id(error) not in checkpointed]
+                    checkpointed.update(map(id, errors))
+                    checkpoint.advance(self.reader.tell(), [error.dict() for error in errors])
+            sizer.update(len(records), examples + labels, time.monotonic() - started_at)
+            progress.add(len(records), examples, labels)
+            if on_progress is not None and progress.is_due():
+                on_progress(progress.dict(self.reader.tell_bytes(), len(self.errors), sizer.size))
+
+    def save_batch(self, user: User, records: RecordBatch) -> Tuple[int, int]:
+        """Save the examples and the labels of a batch, and return how many of each were saved."""
         raise NotImplementedError()
 
     @property
@@ -49,10 +181,10 @@ class PlainDataset(Dataset):
         super().__init__(reader, project, **kwargs)
         self.example_maker = ExampleMaker(project=project, data_class=TextData)
 
-    def save(self, user: User, batch_size: int = 1000):
-        for records in self.reader.batch(batch_size):
-            examples = Examples(self.example_maker.make(records))
-            examples.save()
+    def save_batch(self, user: User, records: RecordBatch) -> Tuple[int, int]:
+        examples = Examples(self.example_maker.make(records))
+        examples.save()
+        return len(examples), 0
 
     @property
     def errors(self) -> List[FileParseException]:
@@ -78,19 +210,18 @@ class DatasetWithSingleLabelType(Dataset):
             column=kwargs.get("column_label") or DEFAULT_LABEL_COLUMN, label_class=self.label_class
         )
 
-    def save(self, user: User, batch_size: int = 1000):
-        for records in self.reader.batch(batch_size):
-            # create examples
-            examples = Examples(self.example_maker.make(records))
-            examples.save()
+    def save_batch(self, user: User, records: RecordBatch) -> Tuple[int, int]:
+        # create examples
+        examples = Examples(self.example_maker.make(records))
+        examples.save()
 
-            # create label types
-            labels = self.labels_class(self.label_maker.make(records), self.types)
-            labels.clean(self.project)
-            labels.save_types(self.project)
+        # create label types
+        labels = self.labels_class(self.label_maker.make(records), self.types)
+        labels.clean(self.project)
+        labels.save_types(self.project)
 
-            # create Labels
-            labels.save(user, examples)
+        # create Labels
+        return len(examples), len(labels.save(user, examples))
 
     @property
     def errors(self) -> List[FileParseException]:
@@ -102,10 +233,10 @@ class BinaryDataset(Dataset):
         super().__init__(reader, project, **kwargs)
         self.example_maker = BinaryExampleMaker(project=project, data_class=BinaryData)
 
-    def save(self, user: User, batch_size: int = 1000):
-        for records in self.reader.batch(batch_size):
-            examples = Examples(self.example_maker.make(records))
-            examples.save()
+    def save_batch(self, user: User, records: RecordBatch) -> Tuple[int, int]:
+        examples = Examples(self.example_maker.make(records))
+        examples.save()
+        return len(examples), 0
 
     @property
     def errors(self) -> List[FileParseException]:
@@ -147,24 +278,24 @@ class RelationExtractionDataset(Dataset):
         self.span_maker = LabelMaker(column="entities", label_class=SpanLabel)
         self.relation_maker = LabelMaker(column="relations", label_class=RelationLabel)
 
-    def save(self, user: User, batch_size: int = 1000):
-        for records in self.reader.batch(batch_size):
-            # create examples
-            examples = Examples(self.example_maker.make(records))
-            examples.save()
+    def save_batch(self, user: User, records: RecordBatch) -> Tuple[int, int]:
+        # create examples
+        examples = Examples(self.example_maker.make(records))
+        examples.save()
 
-            # create label types
-            spans = Spans(self.span_maker.make(records), self.span_types)
-            spans.clean(self.project)
-            spans.save_types(self.project)
+        # create label types
+        spans = Spans(self.span_maker.make(records), self.span_types)
+        spans.clean(self.project)
+        spans.save_types(self.project)
 
-            relations = Relations(self.relation_maker.make(records), self.relation_types)
-            relations.clean(self.project)
-            relations.save_types(self.project)
+        relations = Relations(self.relation_maker.make(records), self.relation_types)
+        relations.clean(self.project)
+        relations.save_types(self.project)
 
-            # create Labels
-            spans.save(user, examples)
-            relations.save(user, examples, spans=spans)
+        # create Labels
+        saved = len(spans.save(user, examples))
+        saved += len(relations.save(user, examples, spans=spans))
+        return len(examples), saved
 
     @property
     def errors(self) -> List[FileParseException]:
@@ -185,24 +316,24 @@ class CategoryAndSpanDataset(Dataset):
         self.category_maker = LabelMaker(column="cats", label_class=CategoryLabel)
         self.span_maker = LabelMaker(column="entities", label_class=SpanLabel)
 
-    def save(self, user: User, batch_size: int = 1000):
-        for records in self.reader.batch(batch_size):
-            # create examples
-            examples = Examples(self.example_maker.make(records))
-            examples.save()
+    def save_batch(self, user: User, records: RecordBatch) -> Tuple[int, int]:
+        # create examples
+        examples = Examples(self.example_maker.make(records))
+        examples.save()
 
-            # create label types
-            categories = Categories(self.category_maker.make(records), self.category_types)
-            categories.clean(self.project)
-            categories.save_types(self.project)
+        # create label types
+        categories = Categories(self.category_maker.make(records), self.category_types)
+        categories.clean(self.project)
+        categories.save_types(self.project)
 
-            spans = Spans(self.span_maker.make(records), self.span_types)
-            spans.clean(self.project)
-            spans.save_types(self.project)
+        spans = Spans(self.span_maker.make(records), self.span_types)
+        spans.clean(self.project)
+        spans.save_types(self.project)
 
-            # create Labels
-            categories.save(user, examples)
-            spans.save(user, examples)
+        # create Labels
+        saved = len(categories.save(user, examples))
+        saved += len(spans.save(user, examples))
+        return len(examples), saved
 
     @property
     def errors(self) -> List[FileParseException]:
@@ -210,6 +341,10 @@ class CategoryAndSpanDataset(Dataset):
 
 
 class AspectBasedSentimentAnalysisDataset(Dataset):
+    # The ids linking the aspect and the opinion of a row, like the entity ids of the relation extraction format.
+    aspect_id = 0
+    opinion_id = 1
+
     def __init__(self, reader: Reader, project: Project, **kwargs):
         super().__init__(reader, project, **kwargs)
         self.category_types = LabelTypes(CategoryType)
@@ -219,13 +354,24 @@ class AspectBasedSentimentAnalysisDataset(Dataset):
             project=project,
             data_class=TextData,
             column_data=kwargs.get("column_data") or "text",
-            exclude_columns=["entities", "relations", "cats", "aspect", "category", "opinion", "polarity", 
-                            "aspect_start", "aspect_end", "opinion_start", "opinion_end"],
+            exclude_columns=[
+                "entities",
+                "relations",
+                "cats",
+                "aspect",
+                "category",
+                "opinion",
+                "polarity",
+                "aspect_start",
+                "aspect_end",
+                "opinion_start",
+                "opinion_end",
+            ],
         )
         self.category_maker = LabelMaker(column="cats", label_class=CategoryLabel)
         self.span_maker = LabelMaker(column="entities", label_class=SpanLabel)
         self.relation_maker = LabelMaker(column="relations", label_class=RelationLabel)
-        
+
         self.column_data = kwargs.get("column_data") or "text"
         self.column_category = kwargs.get("column_category") or "category"
         self.column_aspect = kwargs.get("column_aspect") or "aspect"
@@ -235,192 +381,119 @@ class AspectBasedSentimentAnalysisDataset(Dataset):
         self.column_aspect_end = kwargs.get("column_aspect_end") or "aspect_end"
         self.column_opinion_start = kwargs.get("column_opinion_start") or "opinion_start"
         self.column_opinion_end = kwargs.get("column_opinion_end") or "opinion_end"
+        # Whether any batch had the aspect columns, to set the colors of the label types at the end.
+        self.has_aspects = False
 
     def ensure_label_colors(self):
-        for cat_type in CategoryType.objects.filter(project=self.project):
-            cat_type.background_color = "#0d7781"
-            cat_type.text_color = "#ffffff"
-            cat_type.save()
-
-        aspect_type, created = SpanType.objects.get_or_create(
-            project=self.project,
-            text="aspect",
-            defaults={
-                "background_color": "#11a4ed",
-                "text_color": "#ffffff",
-                "suffix_key": "",
-            }
-        )
-        if not created:
-            aspect_type.background_color = "#11a4ed"
-            aspect_type.text_color = "#ffffff"
-            aspect_type.save()
-
-        opinion_type, created = SpanType.objects.get_or_create(
-            project=self.project,
-            text="opinion",
-            defaults={
-                "background_color": "#c83936",
-                "text_color": "#ffffff",
-                "suffix_key": "",
-            }
-        )
-        if not created:
-            opinion_type.background_color = "#c83936"
-            opinion_type.text_color = "#ffffff"
-            opinion_type.save()
-        
-    def save(self, user: User, batch_size: int = 1000):
-        for df_records in self.reader.batch(batch_size):            
-            examples_data = self.example_maker.make(df_records)
-            examples = Examples(examples_data)
-            examples.save()
-            
-            example_uuids = [str(example.uuid) for example in examples_data]
-            
-            required_aspect_columns = {self.column_data, self.column_aspect, self.column_aspect_start, self.column_aspect_end}
-            df_columns_set = set(df_records.columns)
-            
-            if required_aspect_columns.issubset(df_columns_set):
-                df_transformed = df_records.copy()
-                
-                # aspect and opinion
-                entities_list = []
-                for index, row in df_transformed.iterrows():
-                    example_entities = []
-                    
-                    aspect = row.get(self.column_aspect)
-                    aspect_start = row.get(self.column_aspect_start)
-                    aspect_end = row.get(self.column_aspect_end)
-                    if (aspect is not None and aspect_start is not None and aspect_end is not None):
-                        try:
-                            aspect_start = int(aspect_start)
-                            aspect_end = int(aspect_end)
-                            if 0 <= aspect_start < aspect_end:
-                                example_entities.append({"label": "aspect", "start_offset": aspect_start, "end_offset": aspect_end})
-                        except (ValueError, TypeError):
-                            pass
-                    
-                    if {self.column_opinion, self.column_opinion_start, self.column_opinion_end}.issubset(df_columns_set):
-                        opinion = row.get(self.column_opinion)
-                        opinion_start = row.get(self.column_opinion_start)
-                        opinion_end = row.get(self.column_opinion_end)
-                        if (opinion is not None and opinion_start is not None and opinion_end is not None):
-                            try:
-                                opinion_start = int(opinion_start)
-                                opinion_end = int(opinion_end)
-                                if 0 <= opinion_start < opinion_end:
-                                    example_entities.append({"label": "opinion", "start_offset": opinion_start, "end_offset": opinion_end})
-                            except (ValueError, TypeError):
-                                pass
-                    
-                    entities_list.append(example_entities)
-                
-                df_transformed['entities'] = entities_list
-                
-                spans = Spans(self.span_maker.make(df_transformed), self.span_types)
-                spans.clean(self.project)
-                spans.save_types(self.project)
-                spans.save(user, examples)
-                
-                
-                # category
-                if hasattr(self.project, 'is_quadruple_extraction') and self.project.is_quadruple_extraction:
-                    categories_data = []
-                    for index, row in df_transformed.iterrows():
-                        category = row.get(self.column_category)
-                        
-                        if category:
-                            example_uuid = example_uuids[index]
-                            categories_data.append({
-                                'example_uuid': example_uuid,
-                                'cats': category
-                            })
-                    
-                    if categories_data:
-                        df_categories = pd.DataFrame(categories_data)
-                        
-                        categories = Categories(self.category_maker.make(df_categories), self.category_types)
-                        categories.clean(self.project)
-                        categories.save_types(self.project)
-                        categories.save(user, examples)
-                
-                
-                self.ensure_label_colors()
-                
-                
-                example_uuids_set = set(example_uuids)
-                db_examples = Example.objects.filter(uuid__in=example_uuids_set)
-                
-                uuid_to_example = {}
-                for example in db_examples:
-                    uuid_to_example[str(example.uuid)] = example
-                
-                example_ids = [example.id for example in db_examples]
-                db_spans = Span.objects.filter(example_id__in=example_ids)
-                
-                id_to_span = {}
-                for span in db_spans:
-                    example_uuid = str(span.example.uuid)
-                    id_to_span[(span.id, example_uuid)] = span
-                
-                example_uuid_to_spans = {}
-                for span in db_spans:
-                    example_uuid = str(span.example.uuid)
-                    if example_uuid not in example_uuid_to_spans:
-                        example_uuid_to_spans[example_uuid] = []
-                    example_uuid_to_spans[example_uuid].append(span)
-                
-
-                # relation
-                relations_list = []
-                for index, row in df_transformed.iterrows():
-                    example_relations = []
-                    polarity = row.get(self.column_polarity)
-                    example_uuid = example_uuids[index]
-                    
-                    if (self.project.use_relation and polarity is not None and 
-                        {self.column_opinion, self.column_opinion_start, self.column_opinion_end}.issubset(df_columns_set) and 
-                        len(entities_list[index]) == 2 and 
-                        example_uuid in example_uuid_to_spans and 
-                        len(example_uuid_to_spans[example_uuid]) >= 2):
-                        
-                        example_spans = example_uuid_to_spans[example_uuid]
-                        
-                        aspect_span = None
-                        opinion_span = None
-                        for span in example_spans:
-                            if span.label.text == "aspect":
-                                aspect_span = span
-                            elif span.label.text == "opinion":
-                                opinion_span = span
-                        
-                        if aspect_span and opinion_span:
-                            example_relations.append({
-                                "from_id": aspect_span.id, 
-                                "to_id": opinion_span.id, 
-                                "type": polarity
-                            })
-                    
-                    relations_list.append(example_relations)
-                 
-                df_transformed['relations'] = relations_list
-                relations = Relations(self.relation_maker.make(df_transformed), self.relation_types)
-                relations.clean(self.project)
-                relations.save_types(self.project)
-                
-                class SpansWrapper:
-                    def __init__(self, spans, id_to_span):
-                        self.spans = spans
-                        self.id_to_span = id_to_span
-                
-                spans_wrapper = SpansWrapper(spans, id_to_span)
-                
-                relations.save(user, examples, spans=spans_wrapper)
+        CategoryType.objects.filter(project=self.project).update(background_color="#0d7781", text_color="#ffffff")
+        for text, color in (("aspect", "#11a4ed"), ("opinion", "#c83936")):
+            _, created = SpanType.objects.get_or_create(
+                project=self.project,
+                text=text,
+                defaults={"background_color": color, "text_color": "#ffffff", "suffix_key": ""},
+            )
+            if not created:
+                SpanType.objects.filter(project=self.project, text=text).update(
+                    background_color=color, text_color="#ffffff"
+                )
+
+    @staticmethod
+    def find_offsets(
+        batch: RecordBatch, column: str, column_start: str, column_end: str
+    ) -> List[Tuple[bool, int, int]]:
+        """Return whether each row has a valid span in the columns, and its offsets.
+
+        The offsets are validated column by column. Empty or non-numeric offsets make the span invalid.
+        """
+        if not {column, column_start, column_end}.issubset(batch.columns):
+            return [(False, 0, 0)] * len(batch)
+        start = np.trunc(pd.to_numeric(pd.Series(batch.column(column_start), dtype=object), errors="coerce"))
+        end = np.trunc(pd.to_numeric(pd.Series(batch.column(column_end), dtype=object), errors="coerce"))
+        valid = pd.Series(batch.column(column), dtype=object).notna() & (start >= 0) & (start < end)
+        return list(zip(valid.tolist(), start.fillna(0).astype(int).tolist(), end.fillna(0).astype(int).tolist()))
+
+    def make_entities(self, batch: RecordBatch) -> List[List[Dict[str, Any]]]:
+        columns = [
+            ("aspect", self.aspect_id, (self.column_aspect, self.column_aspect_start, self.column_aspect_end)),
+            ("opinion", self.opinion_id, (self.column_opinion, self.column_opinion_start, self.column_opinion_end)),
+        ]
+        entities: List[List[Dict[str, Any]]] = [[] for _ in range(len(batch))]
+        for label, entity_id, span_columns in columns:
+            for row, (valid, start_offset, end_offset) in zip(entities, self.find_offsets(batch, *span_columns)):
+                if valid:
+                    entity = {"id": entity_id, "label": label, "start_offset": start_offset, "end_offset": end_offset}
+                    row.append(entity)
+        return entities
+
+    def make_relations(self, batch: RecordBatch, entities: List[List[Dict[str, Any]]]) -> List[List[Dict[str, Any]]]:
+        """Relate the aspect to the opinion of each row having both, with the polarity as the type."""
+        if not getattr(self.project, "use_relation", False) or self.column_polarity not in batch.columns:
+            return [[] for _ in entities]
+        return [
+            [{"from_id": self.aspect_id, "to_id": self.opinion_id, "type": polarity}]
+            if len(row) == 2 and not is_missing(polarity)
+            else []
+            for row, polarity in zip(entities, batch.column(self.column_polarity))
+        ]
+
+    def save(
+        self,
+        user: User,
+        batch_size: Union[int, BatchSizer] = 1000,
+        checkpoint: Optional[ImportCheckpoint] = None,
+        on_progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ):
+        resumed = checkpoint is not None and checkpoint.cursor != Cursor()
+        super().save(user, batch_size, checkpoint, on_progress)
+
+        # The colors are set once all the label types exist. A resumed import may have saved them before.
+        if self.has_aspects or (resumed and SpanType.objects.filter(project=self.project, text="aspect").exists()):
+            self.ensure_label_colors()
+
+    def save_batch(self, user: User, records: RecordBatch) -> Tuple[int, int]:
+        # create examples
+        examples = Examples(self.example_maker.make(records))
+        examples.save()
+
+        required_columns = {self.column_data, self.column_aspect, self.column_aspect_start, self.column_aspect_end}
+        if not required_columns.issubset(records.columns):
+            return len(examples), 0
+        self.has_aspects = True
+        entities = self.make_entities(records)
+        records = records.assign(entities=entities, relations=self.make_relations(records, entities))
+
+        # create label types
+        spans = Spans(self.span_maker.make(records), self.span_types)
+        spans.clean(self.project)
+        spans.save_types(self.project)
+
+        relations = Relations(self.relation_maker.make(records), self.relation_types)
+        relations.clean(self.project)
+        relations.save_types(self.project)
+
+        categories = None
+        if getattr(self.project, "is_quadruple_extraction", False) and self.column_category in records.columns:
+            category_records = records.assign(cats=records.column(self.column_category))
+            categories = Categories(self.category_maker.make(category_records), self.category_types)
+            categories.clean(self.project)
+            categories.save_types(self.project)
+
+        # create Labels
+        saved = len(spans.save(user, examples))
+        saved += len(relations.save(user, examples, spans=spans))
+        if categories is not None:
+            saved += len(categories.save(user, examples))
+        return len(examples), saved
 
     @property
     def errors(self) -> List[FileParseException]:
-        return self.reader.errors + self.example_maker.errors + self.category_maker.errors + self.span_maker.errors + self.relation_maker.errors
+        return (
+            self.reader.errors
+            + self.example_maker.errors
+            + self.category_maker.errors
+            + self.span_maker.errors
+            + self.relation_maker.errors
+        )
 
 
 def select_dataset(project: Project, task: str, file_format: Format) -> Type[Dataset]:
@@ -445,8 +518,28 @@ def select_dataset(project: Project, task: str, file_format: Format) -> Type[Dat
     return mapping[task]
 
 
+def split_files(parser: Parser, data_files: List[FileName]) -> Dict[int, List[FileRange]]:
+    """Split the files larger than the split size, and return the ranges of those split in several, by file index."""
+    split_size = settings.IMPORT_SPLIT_SIZE
+    ranges: Dict[int, List[FileRange]] = {}
+    for file_index, data_file in enumerate(data_files):
+        if split_size > 0 and os.path.getsize(data_file.full_path) > split_size:
+            file_ranges = parser.split(data_file.full_path, split_size)
+            if len(file_ranges) > 1:
+                ranges[file_index] = file_ranges
+    return ranges
+
+
 def load_dataset(task: str, file_format: Format, data_files: List[FileName], project: Project, **kwargs) -> Dataset:
     parser = create_parser(file_format, **kwargs)
-    reader = Reader(data_files, parser)
+    reader: Reader
+    # A file larger than the split size is parsed by all the workers if the parser splits it. Otherwise, a single
+    # file is streamed in this process, as a worker would parse it whole.
+    ranges = split_files(parser, data_files) if settings.IMPORT_WORKERS > 1 else {}
+    if settings.IMPORT_WORKERS > 1 and (len(data_files) > 1 or ranges):
+        workers = settings.IMPORT_WORKERS if ranges else min(settings.IMPORT_WORKERS, len(data_files))
+        reader = ParallelReader(data_files, parser, workers=workers, ranges=ranges)
+    else:
+        reader = Reader(data_files, parser)
     dataset_class = select_dataset(project, task, file_format)
     return dataset_class(reader, project, **kwargs)
@@ -0,0 +1,93 @@
+import gc
+import random
+import time
+from typing import Callable, List, Tuple
+
+from django.core.management.base import BaseCommand
+from seqeval.scheme import IOB2, Tokens
+
+from data_import.pipeline.parsers import CoNLLParser
+
+Sentence = Tuple[List[str], List[str]]
+
+
+def align_span_by_joining(words: List[str], tags: List[str], delimiter: str = " ") -> List[Tuple[int, int, str]]:
+    """The former `CoNLLParser.align_span`, joining the words before each entity."""
+    labels = []
+    for entity in Tokens(tags, IOB2).entities:
+        text = delimiter.join(words[: entity.start])
+        start = len(text) + len(delimiter) if text else len(text)
+        end = start + len(delimiter.join(words[entity.start : entity.end]))
+        labels.append((start, end, entity.tag))
+    return labels
+
+
+class Command(BaseCommand):
+    help = "Compares the speed of the CoNLL span alignment with the former one on a corpus the size of CoNLL-2003"
+
+    def add_arguments(self, parser):
+        # The training set of CoNLL-2003 has 14,041 sentences of 203,621 tokens in 946 documents.
+        parser.add_argument("--sentences", type=int, default=14041, help="The number of sentences.")
+        parser.add_argument("--tokens", type=int, default=14, help="The average number of tokens per sentence.")
+        parser.add_argument("--documents", type=int, default=946, help="The number of documents.")
+        parser.add_argument("--repeat", type=int, default=3, help="The number of runs to take the fastest of.")
+
+    def handle(self, *args, **options):
+        sentences = self.make_sentences(options["sentences"], options["tokens"])
+        documents = self.join_sentences(sentences, options["documents"])
+        parser = CoNLLParser()
+        for name, corpus in [("sentences", sentences), ("documents", documents)]:
+            former = self.measure(lambda: [align_span_by_joining(words, tags) for words, tags in corpus], options)
+            current = self.measure(lambda: [parser.align_span(words, tags) for words, tags in corpus], options)
+            tokens = sum(len(words) for words, _ in corpus)
+            self.stdout.write(
+                f"{name}: {tokens / former:,.0f} tokens/s joined, {tokens / current:,.0f} tokens/s with offsets "
+                f"({former / current:.2f}x)"
+            )
+
+    @staticmethod
+    def make_sentences(count: int, tokens: int) -> List[Sentence]:
+        rng = random.Random(0)
+        types = ["PER", "ORG", "LOC", "MISC"]
+        sentences = []
+        for _ in range(count):
+            words: List[str] = []
+            tags: List[str] = []
+            length = rng.randint(1, tokens * 2 - 1)
+            while len(words) < length:
+                # About one token in eight starts an entity, as in CoNLL-2003.
+                if rng.random() < 0.125:
+                    entity_type = rng.choice(types)
+                    size = rng.randint(1, 3)
+                    tags.extend([f"B-{entity_type}"] + [f"I-{entity_type}"] * (size - 1))
+                else:
+                    size = 1
+                    tags.append("O")
+                words.extend(rng.choice(["EU", "rejects", "German", "call", "Peter", "Blackburn"]) for _ in range(size))
+            sentences.append((words, tags))
+        return sentences
+
+    @staticmethod
+    def join_sentences(sentences: List[Sentence], documents: int) -> List[Sentence]:
+        """Join the sentences into documents, as a corpus without sentence breaks would be imported."""
+        size = -(-len(sentences) // documents)
+        joined = []
+        for i in range(0, len(sentences), size):
+            part = sentences[i : i + size]
+            joined.append(([word for words, _ in part for word in words], [tag for _, tags in part for tag in tags]))
+        return joined
+
+    @staticmethod
+    def measure(align: Callable[[], List], options) -> float:
+        """Return the shortest CPU time of the runs. The garbage collection is paused as it adds much noise."""
+        best = float("inf")
+        gc.disable()
+        try:
+            for _ in range(options["repeat"]):
+                start = time.process_time()
+                align()
+                best = min(best, time.process_time() - start)
+                gc.collect()
+        finally:
+            gc.enable()
+        return best
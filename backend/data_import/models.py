@@ -1,6 +1,12 @@
+import json
+from typing import Any, Dict, Iterable, List
 from unittest.mock import MagicMock
 
+from django.db import models
+
+from .pipeline.readers import Cursor
 from label_types.models import CategoryType
+from projects.models import Project
 
 
 class DummyLabelType(CategoryType):
@@ -8,3 +14,48 @@ class DummyLabelType(CategoryType):
 
     class Meta:
         proxy = True
+
+
+class ImportCheckpoint(models.Model):
+    """The progress of an import task, so that a retry of the task resumes after the last saved batch."""
+
+    task_id = models.CharField(max_length=255, unique=True)
+    project = models.ForeignKey(to=Project, on_delete=models.CASCADE, related_name="import_checkpoints")
+    file_index = models.IntegerField(default=0)
+    record_offset = models.IntegerField(default=0)
+    finished = models.BooleanField(default=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    @property
+    def cursor(self) -> Cursor:
+        return Cursor(self.file_index, self.record_offset)
+
+    def add_errors(self, errors: Iterable[Dict[str, Any]]):
+        """Append the errors, without rewriting the ones already saved."""
+        ImportCheckpointError.objects.bulk_create(
+            [ImportCheckpointError(checkpoint=self, error=error) for error in errors]
+        )
+
+    def merge_errors(self, errors: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Add the errors, and return them with the ones of the previous attempts.
+
+        A file parsed again reports the same errors twice, so the duplicates are left out.
+        """
+        self.add_errors(errors)
+        merged: Dict[str, Dict[str, Any]] = {}
+        for error in self.errors.order_by("id").values_list("error", flat=True):
+            merged.setdefault(json.dumps(error, sort_keys=True), error)
+        return list(merged.values())
+
+    def advance(self, cursor: Cursor, errors: Iterable[Dict[str, Any]]):
+        """Record that the records before the cursor are saved, along with the errors found since the last call."""
+        self.file_index, self.record_offset = cursor.file_index, cursor.record_offset
+        self.save(update_fields=["file_index", "record_offset", "updated_at"])
+        self.add_errors(errors)
+
+
+class ImportCheckpointError(models.Model):
+    """An error found by an attempt of an import task, kept apart so that the errors are appended batch by batch."""
+
+    checkpoint = models.ForeignKey(to=ImportCheckpoint, on_delete=models.CASCADE, related_name="errors")
+    error = models.JSONField()
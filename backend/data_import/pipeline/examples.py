@@ -2,6 +2,7 @@ from typing import Dict, List
 
 from pydantic import UUID4
 
+from .loaders import bulk_load
 from examples.models import Example
 
 
@@ -10,6 +11,9 @@ class Examples:
         self.examples = examples
         self.uuid_to_example: Dict[UUID4, Example] = {}
 
+    def __len__(self) -> int:
+        return len(self.examples)
+
     def __getitem__(self, uuid: UUID4) -> Example:
         return self.uuid_to_example[uuid]
 
@@ -17,5 +21,5 @@ class Examples:
         return uuid in self.uuid_to_example
 
     def save(self):
-        examples = Example.objects.bulk_create(self.examples)
+        examples = bulk_load(Example, self.examples)
         self.uuid_to_example = {example.uuid: example for example in examples}
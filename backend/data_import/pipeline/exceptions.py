@@ -15,6 +15,10 @@ class FileParseException(FileImportException):
     def __str__(self):
         return f"ParseError: You cannot parse line {self.line_num} in {self.filename}: {self.message}"
 
+    def __reduce__(self):
+        # Keep the exception picklable, so that the errors can be sent back from a worker process.
+        return self.__class__, (self.filename, self.line_num, self.message)
+
     def dict(self):
         return {"filename": self.filename, "line": self.line_num, "message": self.message}
 
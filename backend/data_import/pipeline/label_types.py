@@ -1,13 +1,21 @@
-from typing import Dict, List, Type
+from typing import Dict, List, Set, Type
 
 from label_types.models import LabelType
 from projects.models import Project
 
 
 class LabelTypes:
+    """The label types of a project, kept across the batches of an import.
+
+    The types of the project are read once, by the first `update`. After that, `save` inserts only the texts
+    never seen before, and `update` reads back only those.
+    """
+
     def __init__(self, label_type_class: Type[LabelType]):
         self.types: Dict[str, LabelType] = {}
         self.label_type_class = label_type_class
+        self.loaded = False
+        self.new_texts: Set[str] = set()
 
     def __contains__(self, text: str) -> bool:
         return text in self.types
@@ -16,8 +24,21 @@ class LabelTypes:
         return self.types[text]
 
     def save(self, label_types: List[LabelType]):
-        self.label_type_class.objects.bulk_create(label_types, ignore_conflicts=True)
+        new_types: Dict[str, LabelType] = {}
+        for label_type in label_types:
+            if label_type.text not in self.types:
+                new_types.setdefault(label_type.text, label_type)
+        if not new_types:
+            return
+        self.label_type_class.objects.bulk_create(list(new_types.values()), ignore_conflicts=True)
+        self.new_texts.update(new_types)
 
     def update(self, project: Project):
         types = self.label_type_class.objects.filter(project=project)
-        self.types = {label_type.text: label_type for label_type in types}
+        if self.loaded:
+            if not self.new_texts:
+                return
+            types = types.filter(text__in=self.new_texts)
+        self.types.update((label_type.text, label_type) for label_type in types)
+        self.loaded = True
+        self.new_texts = set()
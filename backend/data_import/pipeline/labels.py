@@ -3,8 +3,9 @@ from itertools import groupby
 from typing import Dict, List, Tuple
 
 from .examples import Examples
-from .label import Label
+from .label import Label, RelationLabel
 from .label_types import LabelTypes
+from .loaders import bulk_load
 from labels.models import Category as CategoryModel
 from labels.models import Label as LabelModel
 from labels.models import Relation as RelationModel
@@ -32,13 +33,13 @@ class Labels(abc.ABC):
         self.types.save(filtered_types)
         self.types.update(project)
 
-    def save(self, user, examples: Examples, **kwargs):
+    def save(self, user, examples: Examples, **kwargs) -> List[LabelModel]:
         labels = [
             label.create(user, examples[label.example_uuid], self.types, **kwargs)
             for label in self.labels
             if label.example_uuid in examples
         ]
-        self.label_model.objects.bulk_create(labels)
+        return bulk_load(self.label_model, labels)
 
 
 class Categories(Labels):
@@ -54,6 +55,10 @@ class Categories(Labels):
 class Spans(Labels):
     label_model = SpanModel
 
+    def __init__(self, labels: List[Label], types: LabelTypes):
+        super().__init__(labels, types)
+        self.saved_spans: List[SpanModel] = []
+
     def clean(self, project: Project):
         allow_overlapping = getattr(project, "allow_overlapping", False)
         if allow_overlapping:
@@ -69,12 +74,22 @@ class Spans(Labels):
                     spans.append(label)
         self.labels = spans
 
+    def save(self, user, examples: Examples, **kwargs) -> List[SpanModel]:
+        self.saved_spans = super().save(user, examples, **kwargs)
+        return self.saved_spans
+
     @property
     def id_to_span(self) -> Dict[Tuple[int, str], SpanModel]:
-        uuids = [str(span.uuid) for span in self.labels]
-        spans = SpanModel.objects.filter(uuid__in=uuids)
+        spans = self.saved_spans
+        if any(span.pk is None for span in spans):
+            # Some databases don't return the primary keys of the rows inserted by `bulk_create`.
+            spans = SpanModel.objects.filter(uuid__in=[span.uuid for span in spans])
         uuid_to_span = {span.uuid: span for span in spans}
-        return {(span.id, str(span.example_uuid)): uuid_to_span[span.uuid] for span in self.labels}
+        return {
+            (span.id, str(span.example_uuid)): uuid_to_span[span.uuid]
+            for span in self.labels
+            if span.uuid in uuid_to_span
+        }
 
 
 class Texts(Labels):
@@ -84,6 +99,15 @@ class Texts(Labels):
 class Relations(Labels):
     label_model = RelationModel
 
-    def save(self, user, examples: Examples, **kwargs):
-        id_to_span = kwargs["spans"].id_to_span
-        super().save(user, examples, id_to_span=id_to_span)
+    def save(self, user, examples: Examples, **kwargs) -> List[LabelModel]:
+        spans: Spans = kwargs["spans"]
+        id_to_span: Dict[Tuple[int, str], SpanModel] = spans.id_to_span
+        # Skip the relations between spans that weren't saved, e.g. because they overlapped.
+        self.labels = [
+            label
+            for label in self.labels
+            if isinstance(label, RelationLabel)
+            and (label.from_id, str(label.example_uuid)) in id_to_span
+            and (label.to_id, str(label.example_uuid)) in id_to_span
+        ]
+        return super().save(user, examples, id_to_span=id_to_span)
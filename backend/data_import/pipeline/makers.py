@@ -1,5 +1,6 @@
 from typing import List, Optional, Type
 
+import numpy as np
 import pandas as pd
 
 from .data import BaseData
@@ -10,10 +11,14 @@ from .readers import (
     LINE_NUMBER_COLUMN,
     UPLOAD_NAME_COLUMN,
     UUID_COLUMN,
+    RecordBatch,
+    is_missing,
 )
 from examples.models import Example
 from projects.models import Project
 
+LIST_LIKE_TYPES = (list, tuple, set, np.ndarray, pd.Series)
+
 
 class ExampleMaker:
     def __init__(
@@ -29,16 +34,18 @@ class ExampleMaker:
         self.exclude_columns = exclude_columns or []
         self._errors: List[FileParseException] = []
 
-    def make(self, df: pd.DataFrame) -> List[Example]:
-        if not self.check_column_existence(df):
+    def make(self, batch: RecordBatch) -> List[Example]:
+        if not self.check_column_existence(batch):
             return []
-        self.check_value_existence(df)
-        # make dataframe without exclude columns and missing data
-        df_with_data_column = df.loc[:, ~df.columns.isin(self.exclude_columns)]
-        df_with_data_column = df_with_data_column.dropna(subset=[self.column_data])
+        self.check_value_existence(batch)
 
+        exclude_columns = set(self.exclude_columns)
         examples = []
-        for row in df_with_data_column.to_dict(orient="records"):
+        for record in batch:
+            # skip missing data and drop the excluded columns
+            if is_missing(record.get(self.column_data)):
+                continue
+            row = {column: value for column, value in record.items() if column not in exclude_columns}
             line_num = row.pop(LINE_NUMBER_COLUMN, 0)
             row[DEFAULT_TEXT_COLUMN] = row.pop(self.column_data)  # Rename column for parsing
             try:
@@ -51,19 +58,20 @@ class ExampleMaker:
                 self._errors.append(error)
         return examples
 
-    def check_column_existence(self, df: pd.DataFrame) -> bool:
+    def check_column_existence(self, batch: RecordBatch) -> bool:
         message = f"Column {self.column_data} not found in the file"
-        if self.column_data not in df.columns:
-            for filename in df[UPLOAD_NAME_COLUMN].unique():
+        if self.column_data not in batch.columns:
+            for filename in batch.unique(UPLOAD_NAME_COLUMN):
                 self._errors.append(FileParseException(filename, 0, message))
             return False
         return True
 
-    def check_value_existence(self, df: pd.DataFrame):
-        df_without_data_column = df[df[self.column_data].isnull()]
-        for row in df_without_data_column.to_dict(orient="records"):
+    def check_value_existence(self, batch: RecordBatch):
+        for record in batch:
+            if not is_missing(record.get(self.column_data)):
+                continue
             message = f"Column {self.column_data} not found in record"
-            error = FileParseException(row[UPLOAD_NAME_COLUMN], row.get(LINE_NUMBER_COLUMN, 0), message)
+            error = FileParseException(record[UPLOAD_NAME_COLUMN], record.get(LINE_NUMBER_COLUMN, 0), message)
             self._errors.append(error)
 
     @property
@@ -73,9 +81,9 @@ class ExampleMaker:
 
 
 class BinaryExampleMaker(ExampleMaker):
-    def make(self, df: pd.DataFrame) -> List[Example]:
+    def make(self, batch: RecordBatch) -> List[Example]:
         examples = []
-        for row in df.to_dict(orient="records"):
+        for row in batch:
             data = self.data_class.parse(**row)
             example = data.create(self.project)
             examples.append(example)
@@ -88,26 +96,29 @@ class LabelMaker:
         self.label_class = label_class
         self._errors: List[FileParseException] = []
 
-    def make(self, df: pd.DataFrame) -> List[Label]:
-        if not self.check_column_existence(df):
+    def make(self, batch: RecordBatch) -> List[Label]:
+        if not self.check_column_existence(batch):
             return []
 
-        df_label = df.explode(self.column)
-        df_label = df_label[[UUID_COLUMN, self.column]]
-        df_label.dropna(subset=[self.column], inplace=True)
         labels = []
-        for row in df_label.to_dict(orient="records"):
-            try:
-                label = self.label_class.parse(row[UUID_COLUMN], row[self.column])
-                labels.append(label)
-            except ValueError:
-                pass
+        for record in batch:
+            example_uuid = record[UUID_COLUMN]
+            value = record.get(self.column)
+            # a list holds several labels, like the rows made by `DataFrame.explode`
+            for obj in value if isinstance(value, LIST_LIKE_TYPES) else [value]:
+                if is_missing(obj):
+                    continue
+                try:
+                    label = self.label_class.parse(example_uuid, obj)
+                    labels.append(label)
+                except ValueError:
+                    pass
         return labels
 
-    def check_column_existence(self, df: pd.DataFrame) -> bool:
+    def check_column_existence(self, batch: RecordBatch) -> bool:
         message = f"Column {self.column} not found in the file"
-        if self.column not in df.columns:
-            for filename in df[UPLOAD_NAME_COLUMN].unique():
+        if self.column not in batch.columns:
+            for filename in batch.unique(UPLOAD_NAME_COLUMN):
                 self._errors.append(FileParseException(filename, 0, message))
             return False
         return True
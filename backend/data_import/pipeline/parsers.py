@@ -1,60 +1,161 @@
+import abc
+import codecs
 import csv
-import io
+import functools
 import json
+import mmap
 import os
-from typing import Any, Dict, Iterator, List, Tuple
+import zipfile
+from itertools import zip_longest
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
 
 import chardet
+import openpyxl
 import pyexcel
 import pyexcel.exceptions
-from chardet import UniversalDetector
-from seqeval.scheme import BILOU, IOB2, IOBES, IOE2, Tokens
+from seqeval.scheme import BILOU, IOB2, IOBES, IOE2
+
+# The detectors are optional, and detect_sample_encoding() checks which of them is installed before using it.
+try:
+    import cchardet
+except ImportError:
+    cchardet = None
+
+try:
+    import charset_normalizer
+except ImportError:
+    charset_normalizer = None  # type: ignore[assignment]
 
 from .exceptions import FileParseException
 from .readers import (
     DEFAULT_LABEL_COLUMN,
     DEFAULT_TEXT_COLUMN,
     LINE_NUMBER_COLUMN,
+    FileRange,
     Parser,
 )
+from .tagging import get_decoder
 
 DEFAULT_ENCODING = "Auto"
 
+# The extensions of the Excel files read by openpyxl, and the first bytes of the zip files they are.
+XLSX_EXTENSIONS = {".xlsx", ".xlsm"}
+ZIP_SIGNATURE = b"PK\x03\x04"
+
+# The encodings whose files LineReader maps into memory.
+MAPPED_ENCODINGS = {"utf-8", "utf-8-sig", "ascii"}
+
+# The number of bytes read from the beginning of a file to detect its encoding,
+# and the number and the size of the chunks read from the rest of it.
+DETECTION_HEAD_SIZE = 1 << 16
+DETECTION_CHUNKS = 4
+DETECTION_CHUNK_SIZE = 1 << 14
+
+# The number of characters at the end of JSONStream's buffer within which a value may be cut off by the buffer
+# rather than end or be malformed in the file, e.g. "-Infinity", "1.5e-10" or "\uXXXX".
+TRUNCATED_LENGTH = 16
+
+# The byte order marks, longest first, as the one of UTF-32LE starts with the one of UTF-16LE.
+BOMS = [
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+]
+
+
+def read_sample(
+    filename: str,
+    head_size: int = DETECTION_HEAD_SIZE,
+    chunks: int = DETECTION_CHUNKS,
+    chunk_size: int = DETECTION_CHUNK_SIZE,
+) -> List[bytes]:
+    """Reads the beginning of a file and a few chunks spread evenly over the rest of it.
+
+    A small file is read whole. The chunks are trimmed to whole lines when they have line breaks,
+    so that they don't start or end in the middle of a character.
+
+    Args:
+        filename: the filename to read.
+        head_size: the number of bytes read from the beginning.
+        chunks: the number of chunks read from the rest.
+        chunk_size: the size of a chunk.
 
-def detect_encoding(filename: str, buffer_size: int = io.DEFAULT_BUFFER_SIZE) -> str:
+    Returns:
+        The bytes read, the beginning first.
+    """
+    size = os.path.getsize(filename)
+    with open(filename, "rb") as f:
+        if size <= head_size + chunks * chunk_size:
+            return [f.read()]
+        sample = [f.read(head_size)]
+        stride = (size - head_size) // chunks
+        for i in range(1, chunks + 1):
+            f.seek(head_size + i * stride - chunk_size)
+            chunk = f.read(chunk_size)
+            first, last = chunk.find(b"\n"), chunk.rfind(b"\n")
+            if first < last:
+                chunk = chunk[first + 1 : last + 1]
+            sample.append(chunk)
+        return sample
+
+
+def is_utf8(sample: List[bytes]) -> bool:
+    """Checks whether the sample read by `read_sample` is valid UTF-8, except for the characters cut at its ends."""
+    for i, chunk in enumerate(sample):
+        if i > 0:
+            # Skips the continuation bytes of a character cut at the start of the chunk.
+            for _ in range(3):
+                if chunk[:1] and 0x80 <= chunk[0] < 0xC0:
+                    chunk = chunk[1:]
+        try:
+            codecs.getincrementaldecoder("utf-8")().decode(chunk, final=False)
+        except UnicodeDecodeError:
+            return False
+    return True
+
+
+def detect_sample_encoding(sample: bytes) -> Optional[str]:
+    """Detects the encoding of the bytes with the fastest detector installed."""
+    if cchardet is not None:
+        return cchardet.detect(sample).get("encoding")
+    if charset_normalizer is not None:
+        match = charset_normalizer.from_bytes(sample).best()
+        return match.encoding if match is not None else None
+    return chardet.detect(sample).get("encoding")
+
+
+@functools.lru_cache(maxsize=128)
+def _detect_encoding(filename: str, size: int, modified_at: int) -> str:
+    sample = read_sample(filename)
+    for bom, encoding in BOMS:
+        if sample[0].startswith(bom):
+            return encoding
+    if is_utf8(sample):
+        return "utf-8"
+    return detect_sample_encoding(b"\n".join(sample)) or "utf-8"
+
+
+def detect_encoding(filename: str) -> str:
     """Detects character encoding automatically.
 
+    Only the beginning of the file and a few chunks of the rest are read. The encoding is found from the byte
+    order mark if any, then UTF-8 is tried, and the other encodings are detected by cChardet, charset-normalizer
+    or chardet, the first one installed. The result is cached for the file until it changes, so that it is
+    detected once per upload.
+
     If you want to know the supported encodings, please see the following document:
     https://chardet.readthedocs.io/en/latest/supported-encodings.html
 
     Args:
         filename: the filename for detecting the encoding.
-        buffer_size: the buffer size to read file contents incrementally.
 
     Returns:
         The character encoding.
     """
-    # For a small file.
-    if os.path.getsize(filename) < buffer_size:
-        detected = chardet.detect(open(filename, "rb").read())
-        return detected.get("encoding", "utf-8")
-
-    # For a large file, call the Universal Encoding Detector incrementally.
-    # It will stop as soon as it is confident enough to report its results.
-    # See: https://chardet.readthedocs.io/en/latest/usage.html
-    with open(filename, "rb") as f:
-        detector = UniversalDetector()
-        while True:
-            binary = f.read(buffer_size)
-            detector.feed(binary)
-            if binary == b"":
-                break
-            if detector.done:
-                break
-        if detector.done:
-            return detector.result["encoding"] or "utf-8"
-        else:
-            return "utf-8"
+    stat = os.stat(filename)
+    return _detect_encoding(filename, stat.st_size, stat.st_mtime_ns)
 
 
 def decide_encoding(filename: str, encoding: str) -> str:
@@ -79,21 +180,229 @@ def decide_encoding(filename: str, encoding: str) -> str:
 class LineReader:
     """LineReader is a helper class to read a file line by line.
 
+    A UTF-8 or ASCII file is mapped into memory and decoded a chunk of lines at a time. Its line breaks are
+    single bytes which don't occur inside the characters, so the lines are split on the bytes.
+    The other encodings are read in text mode. Both ways split the lines on LF, CRLF and CR.
+
     Attributes:
         filename: The filename to read.
         encoding: The character encoding.
+        chunk_size: The number of bytes decoded at once from a mapped file. A chunk is extended to a line break.
+        file_range: The range of the file to read, returned by `split_lines`. The whole file is read by default.
+        position: The number of bytes of the file read so far, up to the chunk of the lines being yielded.
     """
 
-    def __init__(self, filename: str, encoding: str = DEFAULT_ENCODING):
+    def __init__(
+        self,
+        filename: str,
+        encoding: str = DEFAULT_ENCODING,
+        chunk_size: int = 1 << 20,
+        file_range: Optional[FileRange] = None,
+    ):
         self.filename = filename
         self.encoding = encoding
+        self.chunk_size = chunk_size
+        self.file_range = file_range
+        self.position = 0
 
     def __iter__(self) -> Iterator[str]:
         encoding = decide_encoding(self.filename, self.encoding)
+        if codecs.lookup(encoding).name in MAPPED_ENCODINGS:
+            yield from self.read_mapped(encoding)
+            return
+        if self.file_range is not None:
+            raise ValueError(f"A range of a file can't be read in {encoding}.")
         with open(self.filename, encoding=encoding) as f:
             for line in f:
+                self.position = f.buffer.tell()
                 yield line.rstrip()
 
+    def read_mapped(self, encoding: str) -> Iterator[str]:
+        codec = codecs.lookup(encoding).name
+        with open(self.filename, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+                pos, end = 0, len(m)
+                if self.file_range is not None:
+                    pos, end = self.file_range.start, min(self.file_range.end, end)
+                if pos == 0 and codec == "utf-8-sig" and m[:3] == codecs.BOM_UTF8:
+                    pos = len(codecs.BOM_UTF8)
+                codec = "ascii" if codec == "ascii" else "utf-8"
+                while pos < end:
+                    stop = m.find(b"\n", min(pos + self.chunk_size, end) - 1, end) + 1 or end
+                    text = m[pos:stop].decode(codec)
+                    if "\r" in text:
+                        text = text.replace("\r\n", "\n").replace("\r", "\n")
+                    lines = text.split("\n")
+                    if lines[-1] == "":
+                        lines.pop()
+                    self.position = stop
+                    for line in lines:
+                        yield line.rstrip()
+                    pos = stop
+
+
+def split_lines(filename: str, size: int, at_blank_lines: bool = False) -> List[FileRange]:
+    """Splits a UTF-8 or ASCII file into ranges of whole lines of about `size` bytes.
+
+    The lines are counted as `LineReader` splits them, so that each range knows the number of its first line.
+
+    Args:
+        filename: The filename to split.
+        size: The size of a range. A range is extended to the end of a line.
+        at_blank_lines: Whether to end a range only after a blank line, for the records spanning lines.
+
+    Returns:
+        The ranges covering the whole file.
+    """
+    with open(filename, "rb") as f:
+        file_size = os.fstat(f.fileno()).st_size
+        if file_size <= size:
+            return [FileRange(0, file_size, 1)]
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+            ranges = []
+            start, line_num = 0, 1
+            while start < file_size:
+                end = find_line_end(m, start + size, at_blank_lines)
+                ranges.append(FileRange(start, end, line_num))
+                data = m[start:end]
+                # A lone CR is a line break as well as LF and CRLF.
+                line_num += data.count(b"\n") + data.count(b"\r") - data.count(b"\r\n")
+                start = end
+            return ranges
+
+
+def find_line_end(m: mmap.mmap, pos: int, at_blank_line: bool = False) -> int:
+    """Finds the end of the line at `pos`, or of the first blank line from there, or else the end of the file."""
+    stop = m.find(b"\n", pos)
+    while stop != -1 and at_blank_line:
+        line_start, stop = stop + 1, m.find(b"\n", stop + 1)
+        if stop != -1 and m[line_start:stop].strip() == b"":
+            break
+    return stop + 1 if stop != -1 else len(m)
+
+
+class JSONStream:
+    """JSONStream is a helper class to read the top-level items of a JSON array or object one at a time.
+
+    Only the item being decoded is kept in memory, so the memory usage doesn't grow with the file size.
+    The decoding errors report their line, column and character offset in the whole file.
+
+    Attributes:
+        f: The text file to read.
+        buffer_size: The number of characters to read at once.
+    """
+
+    def __init__(self, f: TextIO, buffer_size: int = 1 << 16):
+        self.f = f
+        self.buffer_size = buffer_size
+        self.decoder = json.JSONDecoder()
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+        # The location of the start of the buffer in the file.
+        self.offset = 0
+        self.line_num = 1
+        self.column = 1
+
+    def read(self, size: int) -> bool:
+        """Drop the consumed characters and read at least `size` more. Returns False at the end of the file."""
+        consumed = self.buffer[: self.pos]
+        newlines = consumed.count("\n")
+        if newlines:
+            self.line_num += newlines
+            self.column = len(consumed) - consumed.rfind("\n")
+        else:
+            self.column += len(consumed)
+        self.offset += len(consumed)
+        self.buffer = self.buffer[self.pos :]
+        self.pos = 0
+        chunk = self.f.read(max(size, self.buffer_size))
+        self.buffer += chunk
+        self.eof = not chunk
+        return not self.eof
+
+    def error(self, message: str, pos: int) -> json.JSONDecodeError:
+        """Make an error located in the whole file rather than in the buffer."""
+        error = json.JSONDecodeError(message, self.buffer, pos)
+        prefix = self.buffer[:pos]
+        newlines = prefix.count("\n")
+        error.pos = self.offset + pos
+        error.lineno = self.line_num + newlines
+        error.colno = pos - prefix.rfind("\n") if newlines else self.column + pos
+        error.args = (f"{message}: line {error.lineno} column {error.colno} (char {error.pos})",)
+        return error
+
+    def peek(self) -> str:
+        """Skip the whitespaces and return the next character, or an empty string at the end of the file."""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in " \t\n\r":
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self.read(self.buffer_size):
+                return ""
+
+    def expect(self, characters: str, message: str) -> str:
+        character = self.peek()
+        if not character or character not in characters:
+            raise self.error(message, self.pos)
+        self.pos += 1
+        return character
+
+    def is_truncated(self, error: json.JSONDecodeError) -> bool:
+        """Tell whether a decoding error may be caused by the end of the buffer rather than by the file."""
+        # A literal or an escape sequence cut off by the end of the buffer is reported at its start.
+        return error.msg.startswith("Unterminated string") or len(self.buffer) - error.pos <= TRUNCATED_LENGTH
+
+    def decode(self) -> Any:
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError as e:
+                # Only a value cut off by the end of the buffer can be decoded by reading more, so a syntax error
+                # earlier on is raised at once instead of reading the rest of the file into the buffer.
+                if self.eof or not self.is_truncated(e):
+                    raise self.error(e.msg, e.pos) from None
+            else:
+                # A number can continue in the next chunk, even after a prefix like "1.5e" which is decoded as 1.5.
+                is_number = isinstance(value, (int, float)) and not isinstance(value, bool)
+                if self.eof or len(self.buffer) - end > (TRUNCATED_LENGTH if is_number else 0):
+                    self.pos = end
+                    return value
+            # Double the buffer, so that a long value is decoded in linear time.
+            self.read(len(self.buffer))
+
+    def items(self, container: str = "[{") -> Iterator[Tuple[Any, Any]]:
+        """Yield the index and element of each item of an array, or the key and value of each item of an object.
+
+        Args:
+            container: The accepted opening brackets.
+        """
+        names = {"[": "'['", "{": "'{'"}
+        opening = self.expect(container, f"Expecting {' or '.join(names[c] for c in container)}")
+        closing = "]" if opening == "[" else "}"
+        if self.peek() == closing:
+            self.pos += 1
+        else:
+            index = 0
+            while True:
+                if opening == "{":
+                    if self.peek() != '"':
+                        raise self.error("Expecting property name enclosed in double quotes", self.pos)
+                    key = self.decode()
+                    self.expect(":", "Expecting ':' delimiter")
+                else:
+                    key = index
+                yield key, self.decode()
+                index += 1
+                if self.expect("," + closing, "Expecting ',' delimiter") == closing:
+                    break
+        if self.peek():
+            raise self.error("Extra data", self.pos)
+
 
 class PlainParser(Parser):
     """PlainParser is a parser simply returns a dictionary.
@@ -108,19 +417,55 @@ class PlainParser(Parser):
         yield {}
 
 
-class LineParser(Parser):
-    """LineParser is a parser to read a file line by line.
+class LineBasedParser(Parser):
+    """LineBasedParser is the base class of the parsers reading a file line by line.
+
+    A UTF-8 or ASCII file can be split into ranges of lines, which are parsed apart as if the lines were the file,
+    except that the line numbers count from the start of the file.
 
     Attributes:
         encoding: The character encoding.
     """
 
+    # Whether a record spans the lines up to a blank line, so that a file is split only after blank lines.
+    split_at_blank_lines = False
+
     def __init__(self, encoding: str = DEFAULT_ENCODING, **kwargs):
         self.encoding = encoding
+        self.lines: Optional[LineReader] = None
 
     def parse(self, filename: str) -> Iterator[Dict[Any, Any]]:
-        reader = LineReader(filename, self.encoding)
-        for line_num, line in enumerate(reader, start=1):
+        self.lines = LineReader(filename, self.encoding)
+        return self.parse_lines(filename, self.lines, line_num=1)
+
+    def tell(self) -> int:
+        return self.lines.position if self.lines is not None else 0
+
+    def split(self, filename: str, size: int) -> List[FileRange]:
+        encoding = decide_encoding(filename, self.encoding)
+        if codecs.lookup(encoding).name not in MAPPED_ENCODINGS:
+            return []
+        return split_lines(filename, size, self.split_at_blank_lines)
+
+    def parse_range(self, filename: str, file_range: FileRange) -> Iterator[Dict[Any, Any]]:
+        reader = LineReader(filename, self.encoding, file_range=file_range)
+        return self.parse_lines(filename, reader, file_range.line_num)
+
+    @abc.abstractmethod
+    def parse_lines(self, filename: str, lines: Iterable[str], line_num: int) -> Iterator[Dict[Any, Any]]:
+        """Parses the lines of the file, the first of which has the number `line_num`."""
+        raise NotImplementedError("Please implement this method in the subclass.")
+
+
+class LineParser(LineBasedParser):
+    """LineParser is a parser to read a file line by line.
+
+    Attributes:
+        encoding: The character encoding.
+    """
+
+    def parse_lines(self, filename: str, lines: Iterable[str], line_num: int) -> Iterator[Dict[Any, Any]]:
+        for line_num, line in enumerate(lines, start=line_num):
             yield {DEFAULT_TEXT_COLUMN: line, LINE_NUMBER_COLUMN: line_num}
 
 
@@ -151,14 +496,20 @@ class CSVParser(Parser):
     def __init__(self, encoding: str = DEFAULT_ENCODING, delimiter: str = ",", **kwargs):
         self.encoding = encoding
         self.delimiter = delimiter
+        self.position = 0
 
     def parse(self, filename: str) -> Iterator[Dict[Any, Any]]:
         encoding = decide_encoding(filename, self.encoding)
+        self.position = 0
         with open(filename, encoding=encoding) as f:
             reader = csv.DictReader(f, delimiter=self.delimiter)
             for line_num, row in enumerate(reader, start=1):
+                self.position = f.buffer.tell()
                 yield {LINE_NUMBER_COLUMN: line_num, **row}
 
+    def tell(self) -> int:
+        return self.position
+
 
 class JSONParser(Parser):
     """JSONParser is a parser to read a json file and return its rows.
@@ -169,25 +520,30 @@ class JSONParser(Parser):
 
     def __init__(self, encoding: str = DEFAULT_ENCODING, **kwargs):
         self.encoding = encoding
+        self.position = 0
         self._errors: List[FileParseException] = []
 
     def parse(self, filename: str) -> Iterator[Dict[Any, Any]]:
         encoding = decide_encoding(filename, self.encoding)
+        self.position = 0
         with open(filename, encoding=encoding) as f:
             try:
-                rows = json.load(f)
-                for row in rows:
+                for _, row in JSONStream(f).items("["):
+                    self.position = f.buffer.tell()
                     yield row
             except json.decoder.JSONDecodeError as e:
-                error = FileParseException(filename, line_num=1, message=str(e))
+                error = FileParseException(filename, line_num=e.lineno, message=str(e))
                 self._errors.append(error)
 
+    def tell(self) -> int:
+        return self.position
+
     @property
     def errors(self) -> List[FileParseException]:
         return self._errors
 
 
-class JSONLParser(Parser):
+class JSONLParser(LineBasedParser):
     """JSONLParser is a parser to read a JSONL file and return its rows.
 
     Attributes:
@@ -195,12 +551,11 @@ class JSONLParser(Parser):
     """
 
     def __init__(self, encoding: str = DEFAULT_ENCODING, **kwargs):
-        self.encoding = encoding
+        super().__init__(encoding)
         self._errors: List[FileParseException] = []
 
-    def parse(self, filename: str) -> Iterator[Dict[Any, Any]]:
-        reader = LineReader(filename, self.encoding)
-        for line_num, line in enumerate(reader, start=1):
+    def parse_lines(self, filename: str, lines: Iterable[str], line_num: int) -> Iterator[Dict[Any, Any]]:
+        for line_num, line in enumerate(lines, start=line_num):
             try:
                 row = json.loads(line)
                 yield {LINE_NUMBER_COLUMN: line_num, **row}
@@ -215,74 +570,91 @@ class JSONLParser(Parser):
 
 class JSONFParser(Parser):
     """JSONFParser is a parser to read a JSON file with filenames as keys and return its rows.
+
     Attributes:
         encoding: The character encoding.
     """
     def __init__(self, encoding: str = DEFAULT_ENCODING, **kwargs):
         self.encoding = encoding
         self._errors: List[FileParseException] = []
-    
+
+    @staticmethod
+    def is_valid_record(item: Any) -> bool:
+        if not isinstance(item, dict):
+            return False
+        return isinstance(item.get("text"), str) and isinstance(item.get("annotations", []), list)
+
+    @staticmethod
+    def location(term: Dict[str, Any]) -> Tuple[Any, Any]:
+        location = term.get("location", [None, None])
+        start = location[0] if len(location) > 0 else None
+        end = location[1] if len(location) > 1 else None
+        return start, end
+
     def parse(self, filename: str) -> Iterator[Dict[Any, Any]]:
         encoding = decide_encoding(filename, self.encoding)
         with open(filename, encoding=encoding) as f:
             try:
-                data = json.load(f)
-                def is_valid_record(item):
-                    text = item.get("text")
-                    annotations = item.get("annotations", [])
-                    return isinstance(text, str) and isinstance(annotations, list)
-                
                 line_num = 1
-                if isinstance(data, dict):
-                    for key, item in data.items():
-                        if not isinstance(item, dict) or not is_valid_record(item):
-                            continue
-                        text = item["text"]
-                        for ann in item["annotations"]:
-                            category = ann.get("category")
-                            
-                            aspect = ann.get("aspect", {})
-                            aspect_term = aspect.get("term")
-                            aspect_location = aspect.get("location", [None, None])
-                            aspect_start = aspect_location[0] if len(aspect_location) > 0 else None
-                            aspect_end = aspect_location[1] if len(aspect_location) > 1 else None
-                            
-                            sentiment = ann.get("sentiment", {})
-                            opinion_term = sentiment.get("term")
-                            opinion_location = sentiment.get("location", [None, None])
-                            opinion_start = opinion_location[0] if len(opinion_location) > 0 else None
-                            opinion_end = opinion_location[1] if len(opinion_location) > 1 else None
-                            
-                            row_data = {
-                                "text": text,
-                                "category": category,
-                                "aspect": aspect_term,
-                                "aspect_start": aspect_start,
-                                "aspect_end": aspect_end,
-                                "opinion": opinion_term,
-                                "opinion_start": opinion_start,
-                                "opinion_end": opinion_end,
-                                "polarity": ann.get("polarity"),
-                                LINE_NUMBER_COLUMN: line_num
-                            }
-                            
-                            yield row_data
-                            line_num += 1
+                for _, item in JSONStream(f).items("{"):
+                    if not self.is_valid_record(item):
+                        continue
+                    for ann in item.get("annotations", []):
+                        aspect = ann.get("aspect", {})
+                        aspect_start, aspect_end = self.location(aspect)
+                        sentiment = ann.get("sentiment", {})
+                        opinion_start, opinion_end = self.location(sentiment)
+                        yield {
+                            "text": item["text"],
+                            "category": ann.get("category"),
+                            "aspect": aspect.get("term"),
+                            "aspect_start": aspect_start,
+                            "aspect_end": aspect_end,
+                            "opinion": sentiment.get("term"),
+                            "opinion_start": opinion_start,
+                            "opinion_end": opinion_end,
+                            "polarity": ann.get("polarity"),
+                            LINE_NUMBER_COLUMN: line_num,
+                        }
+                        line_num += 1
             except json.JSONDecodeError as e:
-                self._errors.append(FileParseException(filename, line_num=1, message=str(e)))
-    
+                self._errors.append(FileParseException(filename, line_num=e.lineno, message=str(e)))
+
     @property
     def errors(self) -> List[FileParseException]:
         return self._errors
 
 
 class ExcelParser(Parser):
-    """ExcelParser is a parser to read a excel file."""
+    """ExcelParser is a parser to read a excel file.
+
+    An xlsx file is streamed row by row in the read-only mode of openpyxl, and an xlsx file which is actually
+    a CSV export is read as CSV. The rows are mapped to the header as pyexcel would do, but without loading the
+    sheet into memory: the empty cells are empty strings, the trailing ones are dropped, and a row longer or
+    shorter than the header is padded with the empty string. The other formats are read by pyexcel.
+    """
 
     def __init__(self, **kwargs):
         self._errors = []
 
     def parse(self, filename: str) -> Iterator[Dict[Any, Any]]:
+        if os.path.splitext(filename)[1].lower() not in XLSX_EXTENSIONS:
+            yield from self.parse_by_pyexcel(filename)
+            return
+        with open(filename, "rb") as f:
+            is_zip = f.read(len(ZIP_SIGNATURE)) == ZIP_SIGNATURE
+        rows = self.read_xlsx(filename) if is_zip else self.read_csv(filename)
+        line_num = 0
+        try:
+            header = self.trim(next(rows, ()))
+            for line_num, row in enumerate(rows, start=1):
+                yield {LINE_NUMBER_COLUMN: line_num, **dict(zip_longest(header, self.trim(row), fillvalue=""))}
+        except (csv.Error, KeyError, SyntaxError, ValueError, zipfile.BadZipFile) as e:
+            # The row after the last one read is broken, or the whole file if no row has been read.
+            error = FileParseException(filename, line_num=line_num + 1, message=str(e))
+            self._errors.append(error)
+
+    def parse_by_pyexcel(self, filename: str) -> Iterator[Dict[Any, Any]]:
         rows = pyexcel.iget_records(file_name=filename)
         try:
             for line_num, row in enumerate(rows, start=1):
@@ -291,12 +663,40 @@ class ExcelParser(Parser):
             error = FileParseException(filename, line_num=1, message=str(e))
             self._errors.append(error)
 
+    @staticmethod
+    def read_xlsx(filename: str) -> Iterator[Tuple[Any, ...]]:
+        workbook = openpyxl.load_workbook(filename, read_only=True, data_only=True)
+        try:
+            sheets = [sheet for sheet in workbook.worksheets if sheet.sheet_state != "hidden"]
+            if sheets:
+                yield from sheets[0].iter_rows(values_only=True)
+        finally:
+            workbook.close()
+
+    @staticmethod
+    def read_csv(filename: str) -> Iterator[List[str]]:
+        encoding = decide_encoding(filename, DEFAULT_ENCODING)
+        with open(filename, encoding=encoding, newline="") as f:
+            try:
+                dialect = csv.Sniffer().sniff(f.read(1 << 16), delimiters=",;\t")
+            except csv.Error:
+                dialect = csv.excel
+            f.seek(0)
+            yield from csv.reader(f, dialect)
+
+    @staticmethod
+    def trim(row: Iterable[Any]) -> List[Any]:
+        values = ["" if value is None else value for value in row]
+        while values and values[-1] == "":
+            values.pop()
+        return values
+
     @property
     def errors(self) -> List[FileParseException]:
         return self._errors
 
 
-class FastTextParser(Parser):
+class FastTextParser(LineBasedParser):
     """FastTextParser is a parser to read a fastText format and returns a text and labels.
 
     The example format is as follows:
@@ -310,12 +710,11 @@ class FastTextParser(Parser):
     """
 
     def __init__(self, encoding: str = DEFAULT_ENCODING, label: str = "__label__", **kwargs):
-        self.encoding = encoding
+        super().__init__(encoding)
         self.label = label
 
-    def parse(self, filename: str) -> Iterator[Dict[Any, Any]]:
-        reader = LineReader(filename, self.encoding)
-        for line_num, line in enumerate(reader, start=1):
+    def parse_lines(self, filename: str, lines: Iterable[str], line_num: int) -> Iterator[Dict[Any, Any]]:
+        for line_num, line in enumerate(lines, start=line_num):
             labels = []
             tokens = []
             for token in line.rstrip().split(" "):
@@ -328,7 +727,7 @@ class FastTextParser(Parser):
             yield {DEFAULT_TEXT_COLUMN: text, DEFAULT_LABEL_COLUMN: labels, LINE_NUMBER_COLUMN: line_num}
 
 
-class CoNLLParser(Parser):
+class CoNLLParser(LineBasedParser):
     """CoNLLParser is a parser to read conll like format and returns a text and labels.
 
     The example format is as follows:
@@ -353,8 +752,11 @@ class CoNLLParser(Parser):
         scheme: The tagging scheme. It supports `IOB2`, `IOE2`, `IOBES`, and `BILOU`.
     """
 
+    split_at_blank_lines = True
+    stops_at_error = True
+
     def __init__(self, encoding: str = DEFAULT_ENCODING, delimiter: str = " ", scheme: str = "IOB2", **kwargs):
-        self.encoding = encoding
+        super().__init__(encoding)
         self.delimiter = delimiter
         mapping = {"IOB2": IOB2, "IOE2": IOE2, "IOBES": IOBES, "BILOU": BILOU}
         self._errors: List[FileParseException] = []
@@ -367,16 +769,19 @@ class CoNLLParser(Parser):
     def errors(self) -> List[FileParseException]:
         return self._errors
 
-    def parse(self, filename: str) -> Iterator[Dict[Any, Any]]:
+    def split(self, filename: str, size: int) -> List[FileRange]:
+        # The file is parsed whole to report the unsupported scheme once.
+        return super().split(filename, size) if self.scheme else []
+
+    def parse_lines(self, filename: str, lines: Iterable[str], line_num: int) -> Iterator[Dict[Any, Any]]:
         if not self.scheme:
             message = "The specified scheme is not supported."
             error = FileParseException(filename, line_num=1, message=message)
             self._errors.append(error)
             return
 
-        reader = LineReader(filename, self.encoding)
         words, tags = [], []
-        for line_num, line in enumerate(reader, start=1):
+        for line_num, line in enumerate(lines, start=line_num):
             line = line.rstrip()
             if line:
                 tokens = line.split("\t")
@@ -399,13 +804,13 @@ class CoNLLParser(Parser):
         return {DEFAULT_TEXT_COLUMN: text, DEFAULT_LABEL_COLUMN: labels}
 
     def align_span(self, words: List[str], tags: List[str]) -> List[Tuple[int, int, str]]:
-        tokens = Tokens(tags, self.scheme)
+        # offsets[i] is where words[i] starts in the text, and the length of words[:i] joined plus the delimiter.
+        offsets = [0]
+        for word in words:
+            offsets.append(offsets[-1] + len(word) + len(self.delimiter))
         labels = []
-        for entity in tokens.entities:
-            text = self.delimiter.join(words[: entity.start])
-            start = len(text) + len(self.delimiter) if text else len(text)
-            chunk = words[entity.start : entity.end]
-            text = self.delimiter.join(chunk)
-            end = start + len(text)
-            labels.append((start, end, entity.tag))
+        for entity_start, entity_end, tag in get_decoder(self.scheme).entities(tags):
+            start = offsets[entity_start] if offsets[entity_start] > len(self.delimiter) else 0
+            end = start + offsets[entity_end] - offsets[entity_start] - len(self.delimiter)
+            labels.append((start, end, tag))
         return labels
@@ -1,10 +1,32 @@
 import abc
 import collections.abc
 import dataclasses
+import math
+import os
+import pickle
+import tempfile
 import uuid
-from typing import Any, Dict, Iterator, List
+from collections import deque
+from itertools import chain, groupby, islice, repeat
+from operator import itemgetter
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    Generator,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
 
+import django
 import pandas as pd
+from billiard.pool import ApplyResult, Pool
+from django.db import connections
 
 from .exceptions import FileParseException
 
@@ -15,6 +37,45 @@ UPLOAD_NAME_COLUMN = "upload_name"
 UUID_COLUMN = "example_uuid"
 LINE_NUMBER_COLUMN = "#line_number"
 
+# The number of rows pickled at a time by the workers of ParallelReader.
+PICKLE_CHUNK_SIZE = 1000
+
+
+def is_missing(value: Any) -> bool:
+    """Tell whether a value counts as missing, like `pd.isna` does for a scalar."""
+    return value is None or value is pd.NA or value is pd.NaT or (isinstance(value, float) and math.isnan(value))
+
+
+class RecordBatch:
+    """A batch of records, kept as the dictionaries yielded by the reader.
+
+    It provides the few column operations the makers need, so that a batch isn't copied into a DataFrame and back.
+    A record lacking a column has a missing value in it, as a DataFrame would have NaN.
+    """
+
+    def __init__(self, records: List[Dict[Any, Any]]):
+        self.records = records
+        self.columns = list(dict.fromkeys(key for record in records for key in record))
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __iter__(self) -> Iterator[Dict[Any, Any]]:
+        return iter(self.records)
+
+    def column(self, name: Any) -> List[Any]:
+        return [record.get(name) for record in self.records]
+
+    def unique(self, name: Any) -> List[Any]:
+        return list(dict.fromkeys(record[name] for record in self.records))
+
+    def assign(self, **columns: List[Any]) -> "RecordBatch":
+        """Return a new batch with the columns added, as `DataFrame.assign` does."""
+        names = list(columns)
+        return RecordBatch(
+            [{**record, **dict(zip(names, values))} for record, *values in zip(self.records, *columns.values())]
+        )
+
 
 class BaseReader(collections.abc.Iterable):
     """Reader has a role to parse files and return a Record iterator."""
@@ -34,13 +95,16 @@ class BaseReader(collections.abc.Iterable):
         raise NotImplementedError("Please implement this method in the subclass.")
 
     @abc.abstractmethod
-    def batch(self, batch_size: int) -> Iterator[pd.DataFrame]:
+    def batch(self, batch_size: Union[int, Callable[[], int]]) -> Iterator[RecordBatch]:
         raise NotImplementedError("Please implement this method in the subclass.")
 
 
 class Parser(abc.ABC):
     """The abstract file parser."""
 
+    # Whether an error ends the parsing of the file, so that the ranges after the one reporting it are dropped.
+    stops_at_error = False
+
     @abc.abstractmethod
     def parse(self, filename: str) -> Iterator[Dict[Any, Any]]:
         """Parses the file and returns the dictionary."""
@@ -51,6 +115,21 @@ class Parser(abc.ABC):
         """Returns parsing errors."""
         return []
 
+    def tell(self) -> int:
+        """Returns the number of bytes of the file being parsed which were read so far, or 0 if it isn't tracked."""
+        return 0
+
+    def split(self, filename: str, size: int) -> List["FileRange"]:
+        """Splits the file into ranges of about `size` bytes which `parse_range` parses apart.
+
+        Returns no ranges if the file can't be split, which is the default.
+        """
+        return []
+
+    def parse_range(self, filename: str, file_range: "FileRange") -> Iterator[Dict[Any, Any]]:
+        """Parses a range of the file returned by `split`, as `parse` would parse that part of the file."""
+        raise NotImplementedError("Please implement this method in the subclass.")
+
 
 @dataclasses.dataclass
 class FileName:
@@ -59,32 +138,218 @@ class FileName:
     upload_name: str
 
 
+@dataclasses.dataclass(frozen=True)
+class Cursor:
+    """A position in the files read, as the index of the file and the number of records read from it."""
+
+    file_index: int = 0
+    record_offset: int = 0
+
+
+@dataclasses.dataclass(frozen=True)
+class FileRange:
+    """A range of the bytes of a file, starting at the beginning of a line, with the number of that line."""
+
+    start: int
+    end: int
+    line_num: int
+
+
 class Reader(BaseReader):
     def __init__(self, filenames: List[FileName], parser: Parser):
         self.filenames = filenames
         self.parser = parser
+        self.start = Cursor()
+        self._file_index = 0
+        self._record_offset = 0
+        self._parsed_file_index = 0
 
     def __iter__(self) -> Iterator[Dict[Any, Any]]:
-        for filename in self.filenames:
+        for file_index, filename in islice(enumerate(self.filenames), self.start.file_index, None):
+            self._parsed_file_index = file_index
             rows = self.parser.parse(filename.full_path)
-            for row in rows:
-                yield {
-                    UUID_COLUMN: uuid.uuid4(),
-                    FILE_NAME_COLUMN: filename.generated_name,
-                    UPLOAD_NAME_COLUMN: filename.upload_name,
-                    **row,
-                }
-
-    def batch(self, batch_size: int) -> Iterator[pd.DataFrame]:
-        batch = []
-        for record in self:
-            batch.append(record)
-            if len(batch) == batch_size:
-                yield pd.DataFrame(batch)
-                batch = []
-        if batch:
-            yield pd.DataFrame(batch)
+            yield from self.read(file_index, filename, rows)
+
+    def seek(self, cursor: Cursor):
+        """Make the next iteration start at the cursor. The files before it aren't parsed at all."""
+        self.start = cursor
+        self._file_index, self._record_offset = cursor.file_index, cursor.record_offset
+        self._parsed_file_index = cursor.file_index
+
+    def tell(self) -> Cursor:
+        """Return the cursor right after the last record yielded."""
+        return Cursor(self._file_index, self._record_offset)
+
+    def tell_bytes(self) -> Tuple[int, int]:
+        """Return the index of the file being parsed and the number of bytes of it which were read so far."""
+        return self._parsed_file_index, self.parser.tell()
+
+    def read(self, file_index: int, filename: FileName, rows: Iterable[Dict[Any, Any]]) -> Iterator[Dict[Any, Any]]:
+        """Yield the records of a file from the start cursor on, keeping track of the position."""
+        offset = self.start.record_offset if file_index == self.start.file_index else 0
+        for record in self.make_records(filename, islice(rows, offset, None)):
+            offset += 1
+            self._file_index, self._record_offset = file_index, offset
+            yield record
+
+    @staticmethod
+    def make_records(filename: FileName, rows: Iterable[Dict[Any, Any]]) -> Iterator[Dict[Any, Any]]:
+        for row in rows:
+            yield {
+                UUID_COLUMN: uuid.uuid4(),
+                FILE_NAME_COLUMN: filename.generated_name,
+                UPLOAD_NAME_COLUMN: filename.upload_name,
+                **row,
+            }
+
+    def batch(self, batch_size: Union[int, Callable[[], int]]) -> Iterator[RecordBatch]:
+        """Yield the records in batches. `batch_size` can be a function giving the size of each next batch."""
+        next_size: Callable[[], int] = batch_size if callable(batch_size) else repeat(batch_size).__next__
+        records = iter(self)
+        while True:
+            batch = list(islice(records, next_size()))
+            if not batch:
+                break
+            yield RecordBatch(batch)
 
     @property
     def errors(self) -> List[FileParseException]:
         return self.parser.errors
+
+
+def dump_rows(rows: Iterable[Dict[Any, Any]], chunk_size: int = PICKLE_CHUNK_SIZE) -> str:
+    """Pickle the rows to a temporary file `chunk_size` at a time as they are parsed, and return its path."""
+    rows = iter(rows)
+    fd, path = tempfile.mkstemp(prefix="import-", suffix=".pickle")
+    with os.fdopen(fd, mode="wb") as f:
+        for chunk in iter(lambda: list(islice(rows, chunk_size)), []):
+            pickle.dump(chunk, f, protocol=pickle.HIGHEST_PROTOCOL)
+    return path
+
+
+def load_rows(path: str) -> Generator[Dict[Any, Any], None, None]:
+    """Yield the rows pickled by `dump_rows` a chunk at a time, and delete the file."""
+    try:
+        with open(path, mode="rb") as f:
+            while True:
+                try:
+                    chunk = pickle.load(f)
+                except EOFError:
+                    break
+                yield from chunk
+    finally:
+        os.remove(path)
+
+
+def parse_file(parser: Parser, filename: str) -> Tuple[str, List[FileParseException]]:
+    """Parse a whole file in a worker process.
+
+    The rows are passed back through a temporary file, so that neither process holds all of them,
+    and the errors are returned because the parser is a copy.
+    """
+    path = dump_rows(parser.parse(filename))
+    return path, parser.errors
+
+
+def parse_range(parser: Parser, filename: str, file_range: FileRange) -> Tuple[str, List[FileParseException]]:
+    """Parse a range of a file in a worker process, like `parse_file`."""
+    path = dump_rows(parser.parse_range(filename, file_range))
+    return path, parser.errors
+
+
+class ParallelReader(Reader):
+    """Parses the files in a process pool, but yields the records in the order of the files.
+
+    A file that the parser has split, e.g. a large JSONL file, is parsed as the ranges given for its index in
+    `ranges`, so that even a single file is parsed by all the workers. At most `workers` files or ranges are parsed
+    ahead of the one being read, which bounds the memory usage.
+    """
+
+    def __init__(
+        self,
+        filenames: List[FileName],
+        parser: Parser,
+        workers: int,
+        ranges: Optional[Dict[int, List[FileRange]]] = None,
+    ):
+        super().__init__(filenames, parser)
+        self.workers = workers
+        self.ranges = ranges or {}
+        self._errors: List[FileParseException] = []
+        self._parsed_bytes = 0
+
+    def __iter__(self) -> Iterator[Dict[Any, Any]]:
+        # The workers must open their own database connections instead of sharing the forked ones.
+        connections.close_all()
+        # The pool is billiard's, as a prefork Celery worker is a daemonic process,
+        # which the multiprocessing module doesn't allow to start children.
+        with Pool(processes=self.workers, initializer=django.setup) as pool:
+            results = self.results(pool)
+            try:
+                for file_index, group in groupby(results, key=itemgetter(0)):
+                    # The ranges of a file are read as one, and parsed as they are read.
+                    _, filename, rows = next(group)
+                    rest = chain.from_iterable(rows for _, _, rows in group)
+                    yield from self.read(file_index, filename, chain(rows, rest))
+            finally:
+                # The results are cleaned up before the pool is terminated.
+                results.close()
+
+    def submit(self, pool: Pool) -> Iterator[Tuple[int, FileName, int, ApplyResult]]:
+        """Submit the files or ranges, each with the number of bytes of its file parsed once it's done."""
+        for file_index, filename in islice(enumerate(self.filenames), self.start.file_index, None):
+            if file_index in self.ranges:
+                for file_range in self.ranges[file_index]:
+                    result = pool.apply_async(parse_range, (self.parser, filename.full_path, file_range))
+                    yield file_index, filename, file_range.end, result
+            else:
+                # A whole file counts as read once the reader moves to the next one.
+                yield file_index, filename, 0, pool.apply_async(parse_file, (self.parser, filename.full_path))
+
+    def results(self, pool: Pool) -> Generator[Tuple[int, FileName, Iterator[Dict[Any, Any]]], None, None]:
+        """Yield the rows parsed from each file or range in order, keeping `workers` of them submitted ahead."""
+        tasks = self.submit(pool)
+        pending: Deque[Tuple[int, FileName, int, ApplyResult]] = deque()
+        path = None
+        rows: Optional[Generator[Dict[Any, Any], None, None]] = None
+        stopped: Optional[int] = None
+        try:
+            while True:
+                pending.extend(islice(tasks, self.workers - len(pending)))
+                if not pending:
+                    break
+                file_index, filename, parsed_bytes, result = pending.popleft()
+                path, errors = result.get()
+                if file_index == stopped:
+                    # The parsing of the whole file would have stopped at the error of a range before.
+                    os.remove(path)
+                    continue
+                self._errors.extend(errors)
+                if errors and self.parser.stops_at_error:
+                    stopped = file_index
+                rows = load_rows(path)
+                self._parsed_file_index, self._parsed_bytes = file_index, parsed_bytes
+                yield file_index, filename, rows
+                # The rows are read before the next ones are asked for, which deletes the file.
+                rows.close()
+        finally:
+            # When the reading stops early, the rows that are left mustn't be left behind in the temporary directory.
+            # Closing the rows being read deletes their file, unless they haven't been started.
+            if rows is not None:
+                rows.close()
+            if path is not None and os.path.exists(path):
+                os.remove(path)
+            # The tasks submitted ahead are waited for, so that the rows they parsed can be deleted.
+            pool.close()
+            pool.join()
+            for _, _, _, result in pending:
+                if result.successful():
+                    os.remove(result.get()[0])
+
+    def tell_bytes(self) -> Tuple[int, int]:
+        """Return the index of the file being read and the end of its range being read, or 0 if it's read whole."""
+        return self._parsed_file_index, self._parsed_bytes
+
+    @property
+    def errors(self) -> List[FileParseException]:
+        return self._errors
@@ -0,0 +1,87 @@
+import functools
+from typing import FrozenSet, List, Set, Tuple, Type
+
+from seqeval.scheme import Prefix, Prefixes, Tag, Token
+
+# A tag split into its prefix and its entity type, e.g. ("B", "PER") for "B-PER".
+Chunk = Tuple[str, str]
+Pattern = Tuple[str, str, str]
+
+OUTSIDE: Chunk = ("O", "_")
+
+
+def expand_prefix(prefix: Prefix) -> List[str]:
+    return [name for name, member in Prefixes.items() if name != "ANY" and member in prefix]
+
+
+def expand_patterns(patterns: Set[Tuple[Prefix, Prefix, Tag]]) -> FrozenSet[Pattern]:
+    """Expand seqeval's patterns to the (previous prefix, prefix, tag condition) triples they match."""
+    return frozenset(
+        (prev, current, condition.name)
+        for prev_prefix, current_prefix, condition in patterns
+        for prev in expand_prefix(prev_prefix)
+        for current in expand_prefix(current_prefix)
+    )
+
+
+class TagDecoder:
+    """Finds the entities in a sequence of tags as `seqeval.scheme.Tokens(tags, scheme).entities` does.
+
+    The patterns of the scheme are compiled to sets once, and the tags are split into tuples,
+    so that no object is made per tag.
+
+    Attributes:
+        scheme: The tagging scheme of seqeval, e.g. `IOB2`.
+    """
+
+    def __init__(self, scheme: Type[Token]):
+        self.scheme = scheme
+        self.allowed_prefixes = frozenset(expand_prefix(scheme.allowed_prefix))
+        self.start_patterns = expand_patterns(scheme.start_patterns)
+        self.inside_patterns = expand_patterns(scheme.inside_patterns)
+        self.end_patterns = expand_patterns(scheme.end_patterns)
+
+    def split(self, tag: str) -> Chunk:
+        prefix = tag[0]
+        if prefix not in Prefixes:
+            raise KeyError(prefix)
+        if prefix not in self.allowed_prefixes:
+            allowed_prefixes = str(self.scheme.allowed_prefix).replace("Prefix.", "")
+            raise ValueError(f"Invalid token is found: {tag}. Allowed prefixes are: {allowed_prefixes}.")
+        return prefix, tag[1:].strip("-") or "_"
+
+    @staticmethod
+    def matches(patterns: FrozenSet[Pattern], prev: Chunk, current: Chunk) -> bool:
+        if (prev[0], current[0], "ANY") in patterns:
+            return True
+        return (prev[0], current[0], "SAME" if prev[1] == current[1] else "DIFF") in patterns
+
+    def entities(self, tags: List[str]) -> List[Tuple[int, int, str]]:
+        """Return the entities as (start, end, type) with the indices of their first tag and after their last one."""
+        chunks = [self.split(tag) for tag in tags] + [OUTSIDE]
+        entities = []
+        i = 0
+        prev = OUTSIDE
+        while i < len(chunks):
+            chunk = chunks[i]
+            if self.matches(self.start_patterns, prev, chunk):
+                end = i + 1
+                last = chunk
+                while end < len(chunks) and self.matches(self.inside_patterns, last, chunks[end]):
+                    last = chunks[end]
+                    end += 1
+                if end == len(chunks):
+                    # seqeval goes back to the last tag when the entity runs past the end.
+                    end = len(tags) - 1
+                if self.matches(self.end_patterns, chunks[end - 1], chunks[end]):
+                    entities.append((i, end, chunk[1]))
+                i = end
+            else:
+                i += 1
+            prev = chunks[i - 1]
+        return entities
+
+
+@functools.lru_cache(maxsize=None)
+def get_decoder(scheme: Type[Token]) -> TagDecoder:
+    return TagDecoder(scheme)
@@ -0,0 +1,97 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
+
+from data_import.datasets import BatchSizer, load_dataset
+from data_import.pipeline.catalog import JSON, JSONL
+from data_import.pipeline.parsers import JSONLParser
+from data_import.pipeline.readers import FileName, ParallelReader
+from projects.models import ProjectType
+from projects.tests.utils import prepare_project
+
+
+class TestBatchSizer(unittest.TestCase):
+    def test_size_is_fixed_without_bounds(self):
+        sizer = BatchSizer(100)
+        sizer.update(100, 100, 0.01)
+        self.assertEqual(sizer(), 100)
+
+    def test_size_grows_when_batches_are_fast(self):
+        sizer = BatchSizer(100, min_size=10, max_size=1000, target_seconds=1.0)
+        sizer.update(100, 100, 0.01)
+        self.assertEqual(sizer(), 200)
+        sizer.update(200, 200, 0.8)
+        self.assertEqual(sizer(), 250)
+
+    def test_size_shrinks_when_batches_are_slow(self):
+        sizer = BatchSizer(100, min_size=10, max_size=1000, target_seconds=1.0)
+        sizer.update(100, 100, 10.0)
+        self.assertEqual(sizer(), 50)
+        sizer.update(50, 50, 1.25)
+        self.assertEqual(sizer(), 40)
+
+    def test_size_stays_within_bounds(self):
+        sizer = BatchSizer(100, min_size=80, max_size=150, target_seconds=1.0)
+        sizer.update(100, 100, 0.01)
+        self.assertEqual(sizer(), 150)
+        sizer.update(150, 150, 10.0)
+        self.assertEqual(sizer(), 80)
+
+    def test_bounds_include_the_initial_size(self):
+        sizer = BatchSizer(5, min_size=10, max_size=1000)
+        self.assertEqual(sizer.min_size, 5)
+        sizer = BatchSizer(5000, min_size=10, max_size=1000)
+        self.assertEqual(sizer.max_size, 5000)
+
+    def test_size_is_capped_by_the_rows_per_batch(self):
+        sizer = BatchSizer(100, min_size=10, max_size=1000, target_seconds=1.0, max_rows=1000)
+        sizer.update(100, 2000, 0.01)
+        self.assertEqual(sizer(), 50)
+
+    def test_empty_batch_keeps_the_size(self):
+        sizer = BatchSizer(100, min_size=10, max_size=1000)
+        sizer.update(0, 0, 0.0)
+        self.assertEqual(sizer(), 100)
+
+
+@override_settings(IMPORT_WORKERS=2, IMPORT_SPLIT_SIZE=16)
+class TestLoadDataset(TestCase):
+    def setUp(self):
+        self.project = prepare_project(ProjectType.DOCUMENT_CLASSIFICATION)
+        self.dirpath = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dirpath)
+
+    def load(self, file_format, content, files=1):
+        filenames = []
+        for i in range(files):
+            path = os.path.join(self.dirpath, f"{i}.txt")
+            with open(path, "w") as f:
+                f.write(content)
+            filenames.append(FileName(full_path=path, generated_name=f"{i}.txt", upload_name=f"{i}.txt"))
+        return load_dataset(ProjectType.DOCUMENT_CLASSIFICATION, file_format, filenames, self.project.item)
+
+    def test_file_split_into_ranges_is_parsed_in_parallel(self):
+        dataset = self.load(JSONL, '{"text": "a"}\n' * 4)
+        self.assertIsInstance(dataset.reader, ParallelReader)
+        self.assertEqual(dataset.reader.workers, 2)
+
+    def test_file_is_split_once(self):
+        with patch.object(JSONLParser, "split", autospec=True, side_effect=JSONLParser.split) as split:
+            dataset = self.load(JSONL, '{"text": "a"}\n' * 4)
+            records = [record["text"] for record in dataset.reader]
+        split.assert_called_once()
+        self.assertEqual(records, ["a"] * 4)
+
+    def test_file_not_split_is_read_in_process(self):
+        dataset = self.load(JSON, '[{"text": "a"}, {"text": "b"}]')
+        self.assertNotIsInstance(dataset.reader, ParallelReader)
+
+    def test_files_are_parsed_in_parallel(self):
+        dataset = self.load(JSON, '[{"text": "a"}, {"text": "b"}]', files=2)
+        self.assertIsInstance(dataset.reader, ParallelReader)
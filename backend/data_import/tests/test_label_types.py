@@ -27,3 +27,29 @@ class TestCategoryLabel(TestCase):
         label_types.update(self.project.item)
         category_type = label_types["A"]
         self.assertEqual(category_type.text, "A")
+
+    def test_save_skips_the_known_types(self):
+        label_types = LabelTypes(CategoryType)
+        label_types.save([CategoryType(text="A", project=self.project.item)])
+        label_types.update(self.project.item)
+        with self.assertNumQueries(1):
+            label_types.save([CategoryType(text=text, project=self.project.item) for text in ["A", "B", "B"]])
+        self.assertEqual(sorted(CategoryType.objects.values_list("text", flat=True)), ["A", "B"])
+
+    def test_update_reads_only_the_new_types(self):
+        label_types = LabelTypes(CategoryType)
+        label_types.save([CategoryType(text="A", project=self.project.item)])
+        label_types.update(self.project.item)
+        with self.assertNumQueries(0):
+            label_types.save([CategoryType(text="A", project=self.project.item)])
+            label_types.update(self.project.item)
+        label_types.save([CategoryType(text="B", project=self.project.item)])
+        label_types.update(self.project.item)
+        self.assertEqual(label_types["B"].text, "B")
+        self.assertEqual(label_types["A"].text, "A")
+
+    def test_update_reads_the_existing_types_first(self):
+        mommy.make("CategoryType", text="existing", project=self.project.item)
+        label_types = LabelTypes(CategoryType)
+        label_types.update(self.project.item)
+        self.assertIn("existing", label_types)
@@ -0,0 +1,70 @@
+from unittest.mock import MagicMock, patch
+
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from data_import.pipeline.loaders import bulk_load, format_value
+from examples.models import Example
+from projects.models import ProjectType
+from projects.tests.utils import prepare_project
+
+
+class TestFormatValue(SimpleTestCase):
+    def test_null(self):
+        self.assertEqual(format_value(Example._meta.get_field("text"), None, connection), "\\N")
+
+    def test_special_characters_are_escaped(self):
+        value = format_value(Example._meta.get_field("text"), "a\tb\nc\rd\\e", connection)
+        self.assertEqual(value, "a\\tb\\nc\\rd\\\\e")
+
+    def test_json(self):
+        value = format_value(Example._meta.get_field("meta"), {"a": "b\nc"}, connection)
+        self.assertEqual(value, '{"a": "b\\\\nc"}')
+
+
+class FakeConnection:
+    vendor = "postgresql"
+
+    def __init__(self, cursor):
+        self.ops = connection.ops
+        self.features = connection.features
+        self.cursor = MagicMock()
+        self.cursor.return_value.__enter__.return_value = cursor
+
+
+class TestBulkLoad(TestCase):
+    def setUp(self):
+        self.project = prepare_project(ProjectType.DOCUMENT_CLASSIFICATION)
+
+    def make_examples(self):
+        return [Example(project=self.project.item, text=f"text{i}", upload_name="upload") for i in range(2)]
+
+    def test_bulk_create_is_used_by_default(self):
+        examples = bulk_load(Example, self.make_examples())
+        self.assertTrue(all(example.pk is not None for example in examples))
+        self.assertEqual(Example.objects.count(), 2)
+
+    @override_settings(IMPORT_POSTGRES_COPY=True)
+    def test_bulk_create_is_used_except_on_postgresql(self):
+        bulk_load(Example, self.make_examples())
+        self.assertEqual(Example.objects.count(), 2)
+
+    @override_settings(IMPORT_POSTGRES_COPY=True)
+    def test_copy_on_postgresql(self):
+        cursor = MagicMock(spec=["execute", "fetchall", "copy_expert"])
+        cursor.fetchall.return_value = [(10,), (11,)]
+        rows = []
+        cursor.copy_expert.side_effect = lambda sql, f: rows.extend(f.read().splitlines())
+        with patch("data_import.pipeline.loaders.connections", {"default": FakeConnection(cursor)}):
+            examples = bulk_load(Example, self.make_examples())
+        self.assertEqual([example.pk for example in examples], [10, 11])
+        self.assertFalse(any(example._state.adding for example in examples))
+        sql = cursor.copy_expert.call_args[0][0]
+        self.assertTrue(sql.startswith('COPY "examples_example" ("id", "uuid", "meta"'))
+        columns = [field.column for field in Example._meta.concrete_fields]
+        self.assertEqual(len(rows), 2)
+        for example, row in zip(examples, rows):
+            values = dict(zip(columns, row.split("\t")))
+            self.assertEqual(values["id"], str(example.pk))
+            self.assertEqual(values["text"], example.text)
+            self.assertEqual(values["annotations_approved_by_id"], "\\N")
@@ -1,6 +1,5 @@
 import uuid
 
-import pandas as pd
 from django.test import TestCase
 
 from data_import.pipeline.data import TextData
@@ -11,6 +10,7 @@ from data_import.pipeline.readers import (
     LINE_NUMBER_COLUMN,
     UPLOAD_NAME_COLUMN,
     UUID_COLUMN,
+    RecordBatch,
 )
 from projects.tests.utils import prepare_project
 
@@ -31,21 +31,33 @@ class TestExamplesMaker(TestCase):
         self.maker = ExampleMaker(self.project.item, TextData, self.text_column, [self.label_column])
 
     def test_make_examples(self):
-        df = pd.DataFrame([self.record])
-        examples = self.maker.make(df)
+        batch = RecordBatch([self.record])
+        examples = self.maker.make(batch)
         self.assertEqual(len(examples), 1)
 
     def test_check_column_existence(self):
         self.record.pop(self.text_column)
-        df = pd.DataFrame([self.record])
-        examples = self.maker.make(df)
+        batch = RecordBatch([self.record])
+        examples = self.maker.make(batch)
         self.assertEqual(len(examples), 0)
         self.assertEqual(len(self.maker.errors), 1)
 
+    def test_missing_text_raises_error(self):
+        record = {**self.record, LINE_NUMBER_COLUMN: 2}
+        record.pop(self.text_column)
+        examples = self.maker.make(RecordBatch([self.record, record]))
+        self.assertEqual(len(examples), 1)
+        self.assertEqual([(error.filename, error.line_num) for error in self.maker.errors], [("upload1", 2)])
+
+    def test_meta_has_only_columns_of_record(self):
+        record = {**self.record, UUID_COLUMN: uuid.uuid4(), "extra": 1}
+        examples = self.maker.make(RecordBatch([self.record, record]))
+        self.assertEqual([example.meta for example in examples], [{}, {"extra": 1}])
+
     def test_empty_text_raises_error(self):
         self.record[self.text_column] = ""
-        df = pd.DataFrame([self.record])
-        examples = self.maker.make(df)
+        batch = RecordBatch([self.record])
+        examples = self.maker.make(batch)
         self.assertEqual(len(examples), 0)
         self.assertEqual(len(self.maker.errors), 1)
 
@@ -54,7 +66,7 @@ class TestLabelFormatter(TestCase):
     def setUp(self):
         self.label_column = "label"
         self.label_class = CategoryLabel
-        self.df = pd.DataFrame(
+        self.batch = RecordBatch(
             [
                 {LINE_NUMBER_COLUMN: 1, UUID_COLUMN: uuid.uuid4(), self.label_column: ["A"]},
                 {LINE_NUMBER_COLUMN: 2, UUID_COLUMN: uuid.uuid4(), self.label_column: ["B", "C"]},
@@ -63,7 +75,7 @@ class TestLabelFormatter(TestCase):
 
     def test_make(self):
         label_maker = LabelMaker(column=self.label_column, label_class=self.label_class)
-        labels = label_maker.make(self.df)
+        labels = label_maker.make(self.batch)
         self.assertEqual(len(labels), 3)
         with self.subTest():
             for label, expected in zip(labels, ["A", "B", "C"]):
@@ -72,11 +84,11 @@ class TestLabelFormatter(TestCase):
     def test_format_without_specified_column(self):
         label_maker = LabelMaker(column="invalid_column", label_class=self.label_class)
         with self.assertRaises(KeyError):
-            label_maker.make(self.df)
+            label_maker.make(self.batch)
 
     def test_format_with_partially_correct_column(self):
         label_maker = LabelMaker(column=self.label_column, label_class=self.label_class)
-        df = pd.DataFrame(
+        batch = RecordBatch(
             [
                 {LINE_NUMBER_COLUMN: 1, UUID_COLUMN: uuid.uuid4(), self.label_column: ["A"]},
                 {LINE_NUMBER_COLUMN: 2, UUID_COLUMN: uuid.uuid4(), "invalid_column": ["B"]},
@@ -84,5 +96,5 @@ class TestLabelFormatter(TestCase):
                 {LINE_NUMBER_COLUMN: 3, UUID_COLUMN: uuid.uuid4(), self.label_column: [{}]},
             ]
         )
-        labels = label_maker.make(df)
+        labels = label_maker.make(batch)
         self.assertEqual(len(labels), 1)
@@ -1,11 +1,17 @@
+import io
 import json
 import os
 import shutil
 import tempfile
 import unittest
+from unittest.mock import patch
+
+import openpyxl
+import pyexcel
+from seqeval.scheme import IOB2, Tokens
 
 from data_import.pipeline import parsers
-from data_import.pipeline.readers import LINE_NUMBER_COLUMN
+from data_import.pipeline.readers import LINE_NUMBER_COLUMN, FileRange
 
 
 class TestParser(unittest.TestCase):
@@ -31,6 +37,53 @@ class TestParser(unittest.TestCase):
             next(it)
 
 
+class TestDetectEncoding(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.test_file = os.path.join(self.test_dir, "test_file.txt")
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def detect(self, content: bytes) -> str:
+        with open(self.test_file, "wb") as f:
+            f.write(content)
+        return parsers.detect_encoding(self.test_file)
+
+    def test_byte_order_mark(self):
+        self.assertEqual(self.detect("text,label\n".encode("utf-16")), "utf-16")
+        self.assertEqual(self.detect("text,label\n".encode("utf-32")), "utf-32")
+        self.assertEqual(self.detect("text,label\n".encode("utf-8-sig")), "utf-8-sig")
+
+    def test_utf8(self):
+        self.assertEqual(self.detect("text\n".encode("utf-8")), "utf-8")
+        self.assertEqual(self.detect("日本語のテキスト\n".encode("utf-8")), "utf-8")
+
+    def test_utf8_cut_in_the_sampled_chunks(self):
+        content = "日本語のテキストです。" * 100000
+        self.assertEqual(self.detect(content.encode("utf-8")), "utf-8")
+
+    def test_other_encoding(self):
+        content = "日本語のテキストです。文字コードを判定します。\n" * 10
+        encoding = self.detect(content.encode("shift_jis"))
+        self.assertEqual(content.encode("shift_jis").decode(encoding), content)
+
+    def test_non_utf8_after_the_head_is_sampled(self):
+        content = "a" * parsers.DETECTION_HEAD_SIZE * 2 + "é" * 1000
+        encoding = self.detect(content.encode("latin-1"))
+        self.assertNotEqual(encoding, "utf-8")
+
+    def test_result_is_cached_until_the_file_changes(self):
+        self.detect(b"text\n")
+        with patch("data_import.pipeline.parsers.read_sample") as read_sample:
+            parsers.detect_encoding(self.test_file)
+            read_sample.assert_not_called()
+        os.utime(self.test_file, ns=(0, 0))
+        with patch("data_import.pipeline.parsers.read_sample", return_value=[b"text"]) as read_sample:
+            parsers.detect_encoding(self.test_file)
+            read_sample.assert_called_once()
+
+
 class TestPlainParser(TestParser):
     def test_read(self):
         content = "example"
@@ -82,6 +135,226 @@ class TestJSONParser(TestParser):
         expected = json.loads(content)
         self.assert_record(content, parser, expected)
 
+    def test_can_read_empty_array(self):
+        parser = parsers.JSONParser()
+        self.assert_record(" [ ] ", parser, [])
+        self.assertEqual(parser.errors, [])
+
+    def test_reports_error_line(self):
+        parser = parsers.JSONParser()
+        self.assert_record('[\n{"text": "a"},\n{"text": }\n]', parser, [{"text": "a"}])
+        self.assertEqual(len(parser.errors), 1)
+        self.assertEqual(parser.errors[0].line_num, 3)
+
+    def test_reports_error_if_not_array(self):
+        parser = parsers.JSONParser()
+        self.assert_record('{"text": "a"}', parser, [])
+        self.assertEqual(len(parser.errors), 1)
+
+
+class TestLineReader(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.test_file = os.path.join(self.test_dir, "test_file.txt")
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def assert_lines(self, content: bytes, encoding: str, chunk_size: int = 4):
+        with open(self.test_file, "wb") as f:
+            f.write(content)
+        with open(self.test_file, encoding=encoding) as f:
+            expected = [line.rstrip() for line in f]
+        reader = parsers.LineReader(self.test_file, encoding, chunk_size=chunk_size)
+        self.assertEqual(list(reader), expected)
+
+    def test_mapped_lines_are_the_same_as_text_mode(self):
+        contents = [
+            "",
+            "\n",
+            "a",
+            "a\nb\n",
+            "a\n\nb",
+            "a\r\nb\r\n",
+            "a\rb\r\rc",
+            "a \u3000\nb\t\n",
+            "日本語\nのテキスト\n" * 10,
+            "a" * 100 + "\nb",
+        ]
+        for content in contents:
+            for encoding in ["utf-8", "utf-8-sig"]:
+                with self.subTest(content=content, encoding=encoding):
+                    self.assert_lines(content.encode(encoding), encoding)
+                    self.assert_lines(content.encode(encoding), encoding, chunk_size=1 << 20)
+
+    def test_byte_order_mark_is_kept_in_utf8(self):
+        self.assert_lines("a\nb".encode("utf-8-sig"), "utf-8")
+
+    def test_ascii(self):
+        self.assert_lines(b"a\nb\n", "ascii")
+        with self.assertRaises(UnicodeDecodeError):
+            self.assert_lines("é".encode("utf-8"), "ascii")
+
+    def test_other_encodings_are_read_in_text_mode(self):
+        self.assert_lines("a\r\nb\n".encode("utf-16"), "utf-16")
+        self.assert_lines("日本語\nテキスト\n".encode("shift_jis"), "shift_jis")
+
+
+class TestSplitLines(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.test_file = os.path.join(self.test_dir, "test_file.txt")
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def create_file(self, content: str):
+        with open(self.test_file, "w", encoding="utf-8", newline="") as f:
+            f.write(content)
+
+    def parse_ranges(self, parser, size):
+        ranges = parser.split(self.test_file, size)
+        rows = [row for file_range in ranges for row in parser.parse_range(self.test_file, file_range)]
+        return ranges, rows
+
+    def assert_same_as_parse(self, content, parser_class, size=8):
+        self.create_file(content)
+        parser = parser_class()
+        expected = list(parser.parse(self.test_file))
+        expected_errors = [(error.line_num, error.message) for error in parser.errors]
+        parser = parser_class()
+        ranges, rows = self.parse_ranges(parser, size)
+        self.assertGreater(len(ranges), 1)
+        self.assertEqual(rows, expected)
+        self.assertEqual([(error.line_num, error.message) for error in parser.errors], expected_errors)
+
+    def test_ranges_cover_the_file(self):
+        self.create_file("a\nbb\nccc\ndddd\n")
+        ranges = parsers.split_lines(self.test_file, 3)
+        self.assertEqual([(r.start, r.end, r.line_num) for r in ranges], [(0, 5, 1), (5, 9, 3), (9, 14, 4)])
+
+    def test_small_file_is_a_range(self):
+        self.create_file("a\nb\n")
+        self.assertEqual(parsers.split_lines(self.test_file, 100), [FileRange(0, 4, 1)])
+
+    def test_ranges_end_after_blank_lines(self):
+        self.create_file("a\nb\n\nc\nd\n\ne\n")
+        ranges = parsers.split_lines(self.test_file, 1, at_blank_lines=True)
+        self.assertEqual([(r.start, r.end, r.line_num) for r in ranges], [(0, 5, 1), (5, 10, 4), (10, 12, 7)])
+
+    def test_line_parser(self):
+        self.assert_same_as_parse("a\r\nbb\rccc\n\ndddd\r\reeeee\nf", parsers.LineParser)
+
+    def test_jsonl_parser(self):
+        content = '{"text": "a"}\n{"text": \n\n{"text": "日本語"}\n{"text": "c"}\n'
+        self.assert_same_as_parse("\ufeff" + content, parsers.JSONLParser)
+
+    def test_fasttext_parser(self):
+        self.assert_same_as_parse("__label__a text\n__label__b other text\n__label__c\n", parsers.FastTextParser)
+
+    def test_conll_parser(self):
+        content = "EU\tB-ORG\nrejects\tO\n\nPeter\tB-PER\nBlackburn\tI-PER\n\n\nBritish\tB-MISC\n"
+        self.assert_same_as_parse(content, parsers.CoNLLParser)
+
+    def test_other_encodings_are_not_split(self):
+        with open(self.test_file, "w", encoding="utf-16") as f:
+            f.write("a\nb\nc\n")
+        self.assertEqual(parsers.LineParser(encoding="utf-16").split(self.test_file, 1), [])
+
+
+class TestJSONStream(unittest.TestCase):
+    def items(self, content, buffer_size=2, container="[{"):
+        return list(parsers.JSONStream(io.StringIO(content), buffer_size=buffer_size).items(container))
+
+    def test_reads_array_across_buffers(self):
+        rows = [{"text": "Hello, World!", "label": ["a", "b"]}, 12345, -1.5e10, "こんにちは", None, []]
+        self.assertEqual(self.items(json.dumps(rows, indent=2)), list(enumerate(rows)))
+
+    def test_reads_object_across_buffers(self):
+        data = {"a.txt": {"text": "a"}, "b.txt": [1, 2], "c.txt": 123}
+        self.assertEqual(self.items(json.dumps(data)), list(data.items()))
+
+    def test_does_not_split_numbers(self):
+        self.assertEqual(self.items("[12345,67890]", buffer_size=3), [(0, 12345), (1, 67890)])
+
+    def test_error_location_is_absolute(self):
+        content = '[\n  1,\n  2,\n  {"a" 1}\n]'
+        with self.assertRaises(json.JSONDecodeError) as cm:
+            self.items(content)
+        self.assertEqual((cm.exception.lineno, cm.exception.colno), (4, 8))
+        self.assertEqual(cm.exception.pos, content.index("1}"))
+
+    def test_raises_error_on_extra_data(self):
+        with self.assertRaises(json.JSONDecodeError):
+            self.items("[1] 2")
+
+    def test_raises_error_on_unexpected_container(self):
+        with self.assertRaises(json.JSONDecodeError):
+            self.items("[1]", container="{")
+
+    def test_raises_error_on_truncated_file(self):
+        with self.assertRaises(json.JSONDecodeError):
+            self.items('[{"text": "a"}, {"text": ')
+
+    def test_reads_values_cut_off_by_buffer(self):
+        content = '["\\u3042", -Infinity, true, 1.5e-10, "abcdefghijklmnopqrstuvwxyz"]'
+        for buffer_size in range(1, len(content)):
+            with self.subTest(buffer_size=buffer_size):
+                items = self.items(content, buffer_size=buffer_size)
+                self.assertEqual([item for _, item in items][2:], [True, 1.5e-10, "abcdefghijklmnopqrstuvwxyz"])
+
+    def test_syntax_error_does_not_read_rest_of_file(self):
+        items = [json.dumps({"text": "a" * 100})] * 1000
+        content = "[" + ",".join(items[:10] + ['{"text": x}'] + items) + "]"
+        f = io.StringIO(content)
+        stream = parsers.JSONStream(f, buffer_size=256)
+        with self.assertRaises(json.JSONDecodeError) as cm:
+            list(stream.items())
+        self.assertEqual(cm.exception.pos, content.index("x}"))
+        self.assertLess(len(stream.buffer), 1024)
+        self.assertLess(f.tell(), 4096)
+
+
+class TestJSONFParser(TestParser):
+    def test_read(self):
+        annotation = {
+            "category": "food",
+            "aspect": {"term": "pasta", "location": [4, 9]},
+            "sentiment": {"term": "good", "location": [13, 17]},
+            "polarity": "positive",
+        }
+        data = {
+            "a.txt": {"text": "The pasta was good", "annotations": [annotation, {"polarity": "neutral"}]},
+            "b.txt": {"text": 1},
+        }
+        parser = parsers.JSONFParser()
+        expected = [
+            {
+                "text": "The pasta was good",
+                "category": "food",
+                "aspect": "pasta",
+                "aspect_start": 4,
+                "aspect_end": 9,
+                "opinion": "good",
+                "opinion_start": 13,
+                "opinion_end": 17,
+                "polarity": "positive",
+            },
+            {
+                "text": "The pasta was good",
+                "category": None,
+                "aspect": None,
+                "aspect_start": None,
+                "aspect_end": None,
+                "opinion": None,
+                "opinion_start": None,
+                "opinion_end": None,
+                "polarity": "neutral",
+            },
+        ]
+        self.assert_record(json.dumps(data), parser, expected)
+        self.assertEqual(parser.errors, [])
+
 
 class TestJSONLParser(TestParser):
     def test_read(self):
@@ -101,6 +374,68 @@ class TestFastTextParser(TestParser):
         self.assert_record(content, parser, expected)
 
 
+class TestExcelParser(TestParser):
+    def setUp(self):
+        super().setUp()
+        self.test_file = os.path.join(self.test_dir, "test_file.xlsx")
+        self.data_dir = os.path.join(os.path.dirname(__file__), "data", "text_classification")
+
+    def create_workbook(self, rows, hidden_first_sheet=False):
+        workbook = openpyxl.Workbook()
+        if hidden_first_sheet:
+            workbook.active.append(["hidden"])
+            workbook.active.sheet_state = "hidden"
+            workbook.active = workbook.create_sheet()
+        for row in rows:
+            workbook.active.append(row)
+        workbook.save(self.test_file)
+
+    def test_reads_as_pyexcel(self):
+        for name in ["example.xlsx", "example_one_column_no_header.xlsx"]:
+            with self.subTest(name=name):
+                filename = os.path.join(self.data_dir, name)
+                expected = [
+                    {LINE_NUMBER_COLUMN: line_num, **row}
+                    for line_num, row in enumerate(pyexcel.iget_records(file_name=filename), start=1)
+                ]
+                pyexcel.free_resources()
+                parser = parsers.ExcelParser()
+                self.assertEqual(list(parser.parse(filename)), expected)
+                self.assertEqual(parser.errors, [])
+
+    def test_fills_empty_cells(self):
+        self.create_workbook([["text", "label", None], ["a", None, None, "extra"], ["b"], [None, 1]])
+        parser = parsers.ExcelParser()
+        expected = [
+            {"text": "a", "label": "", "": "extra"},
+            {"text": "b", "label": ""},
+            {"text": "", "label": 1},
+        ]
+        self.assert_record_of_file(parser, expected)
+
+    def test_skips_hidden_sheet(self):
+        self.create_workbook([["text"], ["a"]], hidden_first_sheet=True)
+        self.assert_record_of_file(parsers.ExcelParser(), [{"text": "a"}])
+
+    def test_reads_csv_with_xlsx_extension(self):
+        self.create_file("text;label\na;positive\n")
+        self.assert_record_of_file(parsers.ExcelParser(), [{"text": "a", "label": "positive"}])
+
+    def test_reports_broken_file(self):
+        with open(self.test_file, "wb") as f:
+            f.write(b"PK\x03\x04broken")
+        parser = parsers.ExcelParser()
+        self.assertEqual(list(parser.parse(self.test_file)), [])
+        self.assertEqual(len(parser.errors), 1)
+        self.assertEqual(parser.errors[0].line_num, 1)
+
+    def assert_record_of_file(self, parser, expected):
+        rows = list(parser.parse(self.test_file))
+        self.assertEqual([row.pop(LINE_NUMBER_COLUMN) for row in rows], list(range(1, len(expected) + 1)))
+        self.assertEqual(rows, expected)
+        self.assertEqual(parser.errors, [])
+
+
 class TestCoNLLParser(TestParser):
     def test_can_read(self):
         content = """EU\tB-ORG
@@ -126,3 +461,19 @@ Blackburn\tI-PER
             {"text": "Peter Blackburn", "label": [(0, 15, "PER")]},
         ]
         self.assert_record(content, parser, expected)
+
+    def test_align_span_is_the_same_as_joining_the_words(self):
+        def align_span(words, tags, delimiter):
+            labels = []
+            for entity in Tokens(tags, IOB2).entities:
+                text = delimiter.join(words[: entity.start])
+                start = len(text) + len(delimiter) if text else len(text)
+                labels.append((start, start + len(delimiter.join(words[entity.start : entity.end])), entity.tag))
+            return labels
+
+        tags = ["B-A", "B-ORG", "O", "B-MISC", "I-MISC", "B-B"]
+        for words in [["EU", "rejects", "German", "call", "to", "boycott"], ["", "EU", "", "German", "call", ""]]:
+            for delimiter in [" ", "", "  "]:
+                with self.subTest(words=words, delimiter=delimiter):
+                    parser = parsers.CoNLLParser(delimiter=delimiter)
+                    self.assertEqual(parser.align_span(words, tags), align_span(words, tags, delimiter))
@@ -1,14 +1,22 @@
+import os
+import shutil
+import tempfile
 import unittest
 from unittest.mock import MagicMock, patch
 
-import pandas as pd
-from pandas.testing import assert_frame_equal
-
+from data_import.pipeline.parsers import CoNLLParser, JSONLParser
 from data_import.pipeline.readers import (
     FILE_NAME_COLUMN,
+    LINE_NUMBER_COLUMN,
     UPLOAD_NAME_COLUMN,
     UUID_COLUMN,
+    Cursor,
+    FileName,
+    ParallelReader,
     Reader,
+    RecordBatch,
+    dump_rows,
+    load_rows,
 )
 
 
@@ -47,5 +55,123 @@ class TestReader(unittest.TestCase):
         mock.return_value = "uuid"
         reader = Reader(self.filenames, self.parser)
         batch = next(reader.batch(2))
-        expected_df = pd.DataFrame(self.rows)
-        assert_frame_equal(batch, expected_df)
+        self.assertEqual(batch.records, self.rows)
+        self.assertEqual(batch.columns, [UUID_COLUMN, FILE_NAME_COLUMN, UPLOAD_NAME_COLUMN, "a"])
+
+    @patch("data_import.pipeline.readers.uuid.uuid4")
+    def test_batch_with_size_function(self, mock):
+        mock.return_value = "uuid"
+        sizes = iter([1, 5, 5])
+        reader = Reader(self.filenames, self.parser)
+        batches = [batch.records for batch in reader.batch(lambda: next(sizes))]
+        self.assertEqual(batches, [self.rows[:1], self.rows[1:]])
+
+
+class TestRecordBatch(unittest.TestCase):
+    def setUp(self):
+        self.batch = RecordBatch([{"a": 1}, {"a": 2, "b": 3}])
+
+    def test_columns(self):
+        self.assertEqual(self.batch.columns, ["a", "b"])
+        self.assertEqual(self.batch.column("b"), [None, 3])
+
+    def test_assign(self):
+        batch = self.batch.assign(c=[4, 5])
+        self.assertEqual(batch.records, [{"a": 1, "c": 4}, {"a": 2, "b": 3, "c": 5}])
+        self.assertEqual(self.batch.columns, ["a", "b"])
+
+
+def split_files(parser, filenames):
+    return {file_index: parser.split(filename.full_path, 1) for file_index, filename in enumerate(filenames)}
+
+
+class TestParallelReader(unittest.TestCase):
+    def setUp(self):
+        self.dirpath = tempfile.mkdtemp()
+        self.filenames = []
+        for i, content in enumerate(['{"text": "a"}\n{"text": "b"}\n', '{"text": "c"}\n{"text": \n']):
+            path = os.path.join(self.dirpath, f"{i}.jsonl")
+            with open(path, "w") as f:
+                f.write(content)
+            self.filenames.append(FileName(full_path=path, generated_name=f"{i}.jsonl", upload_name=f"{i}.jsonl"))
+
+    def tearDown(self):
+        shutil.rmtree(self.dirpath)
+
+    def test_records_are_yielded_in_file_order(self):
+        reader = ParallelReader(self.filenames, JSONLParser(), workers=2)
+        records = [(record[UPLOAD_NAME_COLUMN], record["text"]) for record in reader]
+        self.assertEqual(records, [("0.jsonl", "a"), ("0.jsonl", "b"), ("1.jsonl", "c")])
+        errors = [(error.filename, error.line_num) for error in reader.errors]
+        self.assertEqual(errors, [(self.filenames[1].full_path, 2)])
+
+    def test_split_files_are_yielded_in_order(self):
+        parser = JSONLParser()
+        reader = ParallelReader(self.filenames, parser, workers=2, ranges=split_files(parser, self.filenames))
+        records = [(record[UPLOAD_NAME_COLUMN], record["text"], record[LINE_NUMBER_COLUMN]) for record in reader]
+        self.assertEqual(records, [("0.jsonl", "a", 1), ("0.jsonl", "b", 2), ("1.jsonl", "c", 1)])
+        errors = [(error.filename, error.line_num) for error in reader.errors]
+        self.assertEqual(errors, [(self.filenames[1].full_path, 2)])
+
+    def test_split_file_stops_at_error_like_whole_file(self):
+        path = os.path.join(self.dirpath, "2.conll")
+        with open(path, "w") as f:
+            f.write("EU\tB-ORG\n\nPeter\tB-PER\nBlackburn I-PER\n\nBritish\tB-MISC\n\nlamb\tO\tO\n")
+        filenames = [FileName(full_path=path, generated_name="2.conll", upload_name="2.conll")]
+        results = []
+        readers = [
+            Reader(filenames, CoNLLParser()),
+            ParallelReader(filenames, CoNLLParser(), workers=2, ranges=split_files(CoNLLParser(), filenames)),
+        ]
+        for reader in readers:
+            records = [record["text"] for record in reader]
+            results.append((records, [(error.line_num, error.message) for error in reader.errors]))
+        self.assertEqual(results[0][0], ["EU"])
+        self.assertEqual(results[1], results[0])
+
+    def test_bytes_read_are_told(self):
+        sizes = [os.path.getsize(filename.full_path) for filename in self.filenames]
+        parser = JSONLParser()
+        readers = [
+            # A small file is read in a chunk.
+            (Reader(self.filenames, parser), [(0, sizes[0]), (0, sizes[0]), (1, sizes[1])]),
+            # The position is the end of the range being read.
+            (
+                ParallelReader(self.filenames, parser, workers=2, ranges=split_files(parser, self.filenames)),
+                [(0, 14), (0, 28), (1, 14)],
+            ),
+        ]
+        for reader, expected in readers:
+            with self.subTest(reader=reader.__class__.__name__):
+                self.assertEqual([reader.tell_bytes() for _ in reader], expected)
+
+    def test_rows_are_passed_back_in_chunks(self):
+        rows = [{"text": str(i)} for i in range(5)]
+        path = dump_rows(iter(rows), chunk_size=2)
+        self.assertEqual(list(load_rows(path)), rows)
+        self.assertFalse(os.path.exists(path))
+
+    def test_rows_are_removed_when_the_reading_stops(self):
+        with patch("data_import.pipeline.readers.tempfile.tempdir", self.dirpath):
+            reader = ParallelReader(self.filenames, JSONLParser(), workers=2)
+            records = iter(reader)
+            next(records)
+            records.close()
+        self.assertEqual(sorted(os.listdir(self.dirpath)), ["0.jsonl", "1.jsonl"])
+
+    def test_seek(self):
+        for reader in [Reader(self.filenames, JSONLParser()), ParallelReader(self.filenames, JSONLParser(), workers=2)]:
+            with self.subTest(reader=reader.__class__.__name__):
+                reader.seek(Cursor(0, 1))
+                records = []
+                for record in reader:
+                    records.append(record["text"])
+                    if record["text"] == "b":
+                        self.assertEqual(reader.tell(), Cursor(0, 2))
+                self.assertEqual(records, ["b", "c"])
+                self.assertEqual(reader.tell(), Cursor(1, 1))
+
+    def test_seek_skips_the_files_before(self):
+        reader = Reader(self.filenames, JSONLParser())
+        reader.seek(Cursor(1, 0))
+        self.assertEqual([record["text"] for record in reader], ["c"])
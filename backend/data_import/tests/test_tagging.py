@@ -0,0 +1,35 @@
+import random
+import unittest
+
+from seqeval.scheme import BILOU, IOB2, IOBES, IOE2, Tokens
+
+from data_import.pipeline.tagging import TagDecoder
+
+
+class TestTagDecoder(unittest.TestCase):
+    def assert_same_as_seqeval(self, tags, scheme):
+        expected = [(entity.start, entity.end, entity.tag) for entity in Tokens(tags, scheme).entities]
+        self.assertEqual(TagDecoder(scheme).entities(tags), expected, tags)
+
+    def test_entities(self):
+        decoder = TagDecoder(IOB2)
+        tags = ["B-PER", "I-PER", "O", "B-LOC", "B-LOC", "I-ORG", "I-LOC"]
+        self.assertEqual(decoder.entities(tags), [(0, 2, "PER"), (3, 4, "LOC"), (4, 5, "LOC")])
+
+    def test_same_as_seqeval(self):
+        rng = random.Random(0)
+        schemes = {IOB2: "IOB", IOE2: "IOE", IOBES: "IOBES", BILOU: "BILOU"}
+        for scheme, prefixes in schemes.items():
+            with self.subTest(scheme=scheme.__name__):
+                for _ in range(1000):
+                    tags = [
+                        "O" if prefix == "O" else f"{prefix}-{rng.choice('XY')}"
+                        for prefix in rng.choices(prefixes, k=rng.randint(0, 8))
+                    ]
+                    self.assert_same_as_seqeval(tags, scheme)
+
+    def test_invalid_prefix(self):
+        with self.assertRaises(ValueError):
+            TagDecoder(IOB2).entities(["E-PER"])
+        with self.assertRaises(KeyError):
+            TagDecoder(IOB2).entities(["X-PER"])
@@ -1,23 +1,26 @@
 import os
 import pathlib
 import shutil
+from unittest.mock import patch
 
+import billiard
 from django.core.files import File
-from django.test import TestCase, override_settings
+from django.test import TestCase, TransactionTestCase, override_settings
 from django_drf_filepond.models import StoredUpload, TemporaryUpload
 from django_drf_filepond.utils import _get_file_id
 
 from data_import.celery_tasks import import_dataset
+from data_import.datasets import TextClassificationDataset
+from data_import.models import ImportCheckpoint
 from data_import.pipeline.catalog import RELATION_EXTRACTION
 from examples.models import Example
-from label_types.models import SpanType
+from label_types.models import CategoryType, SpanType
 from labels.models import Category, Span
 from projects.models import ProjectType
 from projects.tests.utils import prepare_project
 
 
-@override_settings(MEDIA_ROOT=os.path.join(os.path.dirname(__file__), "data"))
-class TestImportData(TestCase):
+class ImportDataMixin:
     task = "Any"
     annotation_class = Category
 
@@ -35,7 +38,7 @@ class TestImportData(TestCase):
         except StoredUpload.DoesNotExist:
             pass
 
-    def import_dataset(self, filename, file_format, task, kwargs=None):
+    def upload(self, filename):
         file_path = str(self.data_path / filename)
         TemporaryUpload.objects.create(
             upload_id=self.upload_id,
@@ -44,11 +47,19 @@ class TestImportData(TestCase):
             upload_name=filename,
             upload_type="F",
         )
-        upload_ids = [self.upload_id]
+        return [self.upload_id]
+
+    def import_dataset(self, filename, file_format, task, kwargs=None):
+        upload_ids = self.upload(filename)
         kwargs = kwargs or {}
         return import_dataset(self.user.id, self.project.item.id, file_format, upload_ids, task, **kwargs)
 
 
+@override_settings(MEDIA_ROOT=os.path.join(os.path.dirname(__file__), "data"))
+class TestImportData(ImportDataMixin, TestCase):
+    pass
+
+
 @override_settings(MAX_UPLOAD_SIZE=0)
 class TestMaxFileSize(TestImportData):
     task = ProjectType.DOCUMENT_CLASSIFICATION
@@ -173,6 +184,119 @@ class TestImportClassificationData(TestImportData):
         self.assert_parse_error(response)
 
 
+@override_settings(IMPORT_BATCH_SIZE=1, IMPORT_BATCH_SIZE_MAX=1)
+class TestResumeImport(TestImportData):
+    task = ProjectType.DOCUMENT_CLASSIFICATION
+
+    def import_with_failure(self, fail_at):
+        """Import with the batch `fail_at` raising an error once. The task is retried as in a worker."""
+        save_batch = TextClassificationDataset.save_batch
+        calls = []
+
+        def flaky_save_batch(dataset, user, records):
+            calls.append(records)
+            if len(calls) == fail_at:
+                raise RuntimeError("The worker crashed.")
+            return save_batch(dataset, user, records)
+
+        upload_ids = self.upload("text_classification/example.jsonl")
+        args = (self.user.id, self.project.item.id, "JSONL", upload_ids, self.task)
+        with patch.object(TextClassificationDataset, "save_batch", flaky_save_batch):
+            result = import_dataset.apply(args=args, kwargs={"column_label": "labels"}, task_id="task-id")
+        return result.get(), calls
+
+    def test_retry_resumes_after_the_saved_batches(self):
+        response, calls = self.import_with_failure(fail_at=2)
+        self.assertEqual(response["error"], [])
+        # The first batch isn't saved twice, and the failed one is saved again.
+        texts = [records.column("text") for records in calls]
+        self.assertEqual(texts, [["exampleA"], ["exampleB"], ["exampleB"], ["exampleC"]])
+        self.assertEqual(sorted(Example.objects.values_list("text", flat=True)), ["exampleA", "exampleB", "exampleC"])
+        self.assertEqual(Category.objects.count(), 3)
+        self.assertFalse(ImportCheckpoint.objects.exists())
+
+    def test_progress_is_reported(self):
+        upload_ids = self.upload("text_classification/example.jsonl")
+        args = (self.user.id, self.project.item.id, "JSONL", upload_ids, self.task)
+        with patch.object(import_dataset, "update_state") as update_state:
+            import_dataset.apply(args=args, kwargs={"column_label": "labels"}, task_id="task-id")
+        # The batches follow each other faster than the reporting interval.
+        update_state.assert_called_once()
+        self.assertEqual(update_state.call_args.kwargs["state"], "PROGRESS")
+        progress = update_state.call_args.kwargs["meta"]
+        self.assertEqual((progress["records"], progress["examples"], progress["labels"]), (1, 1, 1))
+        self.assertEqual(progress["errors"], 0)
+        # The single file is read in a chunk.
+        size = (self.data_path / "text_classification/example.jsonl").stat().st_size
+        self.assertEqual((progress["bytes_read"], progress["bytes_total"]), (size, size))
+
+    def test_errors_are_added_to_checkpoint_once(self):
+        advance = ImportCheckpoint.advance
+        added = []
+
+        def spy_advance(checkpoint, cursor, errors):
+            added.extend(errors)
+            advance(checkpoint, cursor, errors)
+
+        upload_ids = self.upload("text_classification/example.invalid.jsonl")
+        args = (self.user.id, self.project.item.id, "JSONL", upload_ids, self.task)
+        with patch.object(ImportCheckpoint, "advance", spy_advance):
+            result = import_dataset.apply(args=args, kwargs={"column_label": "labels"}, task_id="task-id")
+        errors = result.get()["error"]
+        self.assertEqual([error["line"] for error in errors], [2, 4])
+        self.assertEqual(added, errors)
+
+    def test_failed_batch_is_rolled_back(self):
+        save_batch = TextClassificationDataset.save_batch
+
+        def failing_save_batch(dataset, user, records):
+            save_batch(dataset, user, records)
+            raise RuntimeError("The worker crashed.")
+
+        upload_ids = self.upload("text_classification/example.jsonl")
+        args = (self.user.id, self.project.item.id, "JSONL", upload_ids, self.task)
+        with patch.object(TextClassificationDataset, "save_batch", failing_save_batch):
+            result = import_dataset.apply(args=args, kwargs={"column_label": "labels"}, task_id="task-id")
+        self.assertTrue(result.failed())
+        self.assertEqual(Example.objects.count(), 0)
+        checkpoint = ImportCheckpoint.objects.get(task_id="task-id")
+        self.assertEqual((checkpoint.file_index, checkpoint.record_offset), (0, 0))
+
+
+def import_and_list_examples(*args, **kwargs):
+    """Run the import task and return its response with the texts of the examples and the number of categories.
+
+    The examples are listed by the process which imported them, as the test database is an in-memory one.
+    """
+    response = import_dataset(*args, **kwargs)
+    return response, sorted(Example.objects.values_list("text", flat=True)), Category.objects.count()
+
+
+def import_in_worker(*args, **kwargs):
+    """Run the import task in a pool process of billiard, which is what a prefork Celery worker runs tasks in."""
+    with billiard.Pool(processes=1) as pool:
+        return pool.apply(import_and_list_examples, args, kwargs)
+
+
+@override_settings(MEDIA_ROOT=os.path.join(os.path.dirname(__file__), "data"), IMPORT_WORKERS=2, IMPORT_SPLIT_SIZE=16)
+class TestImportInProcessPool(ImportDataMixin, TransactionTestCase):
+    """Runs the import across a real process pool, whose workers set up Django and connect to the database again.
+
+    The task runs outside the transaction of a test case, as it would in a worker.
+    """
+
+    task = ProjectType.DOCUMENT_CLASSIFICATION
+
+    def test_file_is_parsed_inside_celery_worker(self):
+        # A prefork worker is a daemonic process, which may not start a pool of the multiprocessing module.
+        upload_ids = self.upload("text_classification/example.jsonl")
+        args = (self.user.id, self.project.item.id, "JSONL", upload_ids, self.task)
+        response, texts, categories = import_in_worker(*args, column_label="labels")
+        self.assertEqual(response["error"], [])
+        self.assertEqual(texts, ["exampleA", "exampleB", "exampleC"])
+        self.assertEqual(categories, 3)
+
+
 class TestImportSequenceLabelingData(TestImportData):
     task = ProjectType.SEQUENCE_LABELING
 
@@ -252,6 +376,47 @@ class TestImportRelationExtractionData(TestImportData):
         self.assert_examples(dataset)
 
 
+class TestImportAspectBasedSentimentAnalysisData(TestImportData):
+    task = ProjectType.ASPECT_BASED_SENTIMENT_ANALYSIS
+
+    def assert_examples(self, dataset):
+        self.assertEqual(Example.objects.count(), len(dataset))
+        for text, expected_spans, expected_relations in dataset:
+            example = Example.objects.get(text=text)
+            spans = [[span.start_offset, span.end_offset, span.label.text] for span in example.spans.order_by("id")]
+            self.assertEqual(spans, expected_spans)
+            relations = [
+                [relation.from_id.label.text, relation.to_id.label.text, relation.type.text]
+                for relation in example.relations.all()
+            ]
+            self.assertEqual(relations, expected_relations)
+
+    def test_csv(self):
+        filename = "aspect_based_sentiment_analysis/example.csv"
+        dataset = [
+            ("The food was great", [[4, 8, "aspect"], [13, 18, "opinion"]], [["aspect", "opinion", "positive"]]),
+            ("Service is slow", [[0, 7, "aspect"], [11, 15, "opinion"]], [["aspect", "opinion", "negative"]]),
+            ("Nice place", [[0, 4, "opinion"]], []),
+        ]
+        self.import_dataset(filename, "CSV", self.task)
+        self.assert_examples(dataset)
+        self.assertEqual(Category.objects.count(), 0)
+        colors = SpanType.objects.filter(project=self.project.item).values_list("text", "background_color")
+        self.assertEqual(dict(colors), {"aspect": "#11a4ed", "opinion": "#c83936"})
+
+    @override_settings(IMPORT_BATCH_SIZE=2, IMPORT_BATCH_SIZE_MAX=2)
+    def test_csv_with_quadruples(self):
+        self.project.item.type_extraction = "quadruple"
+        self.project.item.save()
+        self.import_dataset("aspect_based_sentiment_analysis/example.csv", "CSV", self.task)
+        categories = Category.objects.order_by("example__text").values_list("example__text", "label__text")
+        self.assertEqual(
+            list(categories), [("Service is slow", "SERVICE#GENERAL"), ("The food was great", "FOOD#QUALITY")]
+        )
+        colors = CategoryType.objects.filter(project=self.project.item).values_list("background_color", flat=True)
+        self.assertEqual(set(colors), {"#0d7781"})
+
+
 class TestImportSeq2seqData(TestImportData):
     task = ProjectType.SEQ2SEQ
 
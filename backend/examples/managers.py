@@ -1,15 +1,33 @@
-from django.db.models import Count, Manager
+from django.db.models import Count, Manager, QuerySet
 
+from .signals import pre_bulk_delete
 
-class ExampleManager(Manager):
+
+class BulkDeleteQuerySet(QuerySet):
+    def delete(self):
+        pre_bulk_delete.send(sender=self.model, queryset=self)
+        return super().delete()
+
+
+class BulkDeleteManager(Manager):
+    """Sends `pre_bulk_delete` before the rows of a queryset are deleted."""
+
+    def get_queryset(self):
+        return BulkDeleteQuerySet(self.model, using=self._db)
+
+
+class ExampleManager(BulkDeleteManager):
     def bulk_create(self, objs, batch_size=None, ignore_conflicts=False):
-        super().bulk_create(objs, batch_size=batch_size, ignore_conflicts=ignore_conflicts)
+        examples = super().bulk_create(objs, batch_size=batch_size, ignore_conflicts=ignore_conflicts)
+        if all(example.pk is not None for example in examples):
+            # The database returned the primary keys by `INSERT ... RETURNING`, e.g. PostgreSQL and SQLite 3.35+.
+            return examples
         uuids = [data.uuid for data in objs]
         examples = self.in_bulk(uuids, field_name="uuid")
         return [examples[uid] for uid in uuids]
 
 
-class ExampleStateManager(Manager):
+class ExampleStateManager(BulkDeleteManager):
     def count_done(self, examples, user=None):
         if user:
             queryset = self.filter(example_id__in=examples, confirmed_by=user)
@@ -5,11 +5,25 @@ from django.core.exceptions import ValidationError
 from django.db import models
 from django_drf_filepond.models import DrfFilePondStoredStorage
 
-from .managers import ExampleManager, ExampleStateManager
+from .managers import BulkDeleteManager, ExampleManager, ExampleStateManager
+from .signals import pre_bulk_delete
 from projects.models import Project
 
 
-class Example(models.Model):
+class BulkDeleteModel(models.Model):
+    """Sends `pre_bulk_delete` before an instance is deleted, as `BulkDeleteManager` does for querysets."""
+
+    objects = BulkDeleteManager()
+
+    def delete(self, *args, **kwargs):
+        pre_bulk_delete.send(sender=type(self), queryset=type(self)._default_manager.filter(pk=self.pk))
+        return super().delete(*args, **kwargs)
+
+    class Meta:
+        abstract = True
+
+
+class Example(BulkDeleteModel):
     objects = ExampleManager()
 
     uuid = models.UUIDField(default=uuid.uuid4, editable=False, db_index=True, unique=True)
@@ -61,7 +75,7 @@ class Assignment(models.Model):
         return super().clean()
 
 
-class ExampleState(models.Model):
+class ExampleState(BulkDeleteModel):
     objects = ExampleStateManager()
     example = models.ForeignKey(to=Example, on_delete=models.CASCADE, related_name="states")
     confirmed_by = models.ForeignKey(to=User, on_delete=models.CASCADE)
@@ -71,7 +85,7 @@ class ExampleState(models.Model):
         unique_together = (("example", "confirmed_by"),)
 
 
-class Comment(models.Model):
+class Comment(BulkDeleteModel):
     text = models.TextField()
     example = models.ForeignKey(to=Example, on_delete=models.CASCADE, related_name="comments")
     user = models.ForeignKey(to=User, on_delete=models.CASCADE, null=True)
@@ -0,0 +1,6 @@
+from django.dispatch import Signal
+
+# Sent with the queryset of the rows about to be deleted from the querysets or instances of the examples,
+# their labels, comments and states. Unlike `pre_delete`, it is sent once per deletion instead of once per row,
+# so its receivers don't prevent Django from deleting the rows of a cascade in bulk.
+pre_bulk_delete = Signal()
@@ -1,7 +1,9 @@
-from django.db.models import Count, Manager
+from django.db.models import Count
 
+from examples.managers import BulkDeleteManager
 
-class LabelManager(Manager):
+
+class LabelManager(BulkDeleteManager):
     label_type_field = "label"
 
     def calc_label_distribution(self, examples, members, labels):
@@ -13,11 +13,11 @@ from .managers import (
     SpanManager,
     TextLabelManager,
 )
-from examples.models import Example
+from examples.models import BulkDeleteModel, Example
 from label_types.models import CategoryType, RelationType, SpanType
 
 
-class Label(models.Model):
+class Label(BulkDeleteModel):
     objects = LabelManager()
 
     uuid = models.UUIDField(default=uuid.uuid4, unique=True)
@@ -62,6 +62,7 @@ def make_project(task: str, users: List[str], roles: List[str], collaborative_an
         ProjectType.BOUNDING_BOX: "BoundingBoxProject",
         ProjectType.SEGMENTATION: "SegmentationProject",
         ProjectType.IMAGE_CAPTIONING: "ImageCaptioningProject",
+        ProjectType.ASPECT_BASED_SENTIMENT_ANALYSIS: "AspectBasedSentimentAnalysisProject",
     }.get(task, "Project")
     project = mommy.make(
         _model=project_model,